@@ -0,0 +1,110 @@
+"""Throughput of hot JSON routes: default FastAPI rendering vs FastJSONResponse.
+
+Builds a large job (many steps with long prompts and devlog entries) in a
+throwaway database, then compares:
+
+- before: the ui-state dict returned through FastAPI's default path
+  (response-model validation + stdlib JSON), no compression
+- after:  GET /api/jobs/{id}/ui-state as served (FastJSONResponse, orjson when
+  installed), with and without `Accept-Encoding: gzip`
+
+plus the serialization step alone (FastAPI's pydantic dump for `dict[str, Any]`
+routes, jsonable_encoder + stdlib json, and `fastjson.dumps`), since the
+end-to-end numbers are dominated by the store queries behind ui-state.
+
+Runs in-process through Starlette's TestClient, so numbers are server-side
+CPU cost per request, not network transfer time.
+
+Usage: python scripts/bench_json_responses.py [--steps N] [--iterations N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from vibedev_mcp import fastjson
+from vibedev_mcp.http_server import create_app
+
+
+def _run(client: TestClient, path: str, iterations: int, headers: dict[str, str]) -> tuple[float, int]:
+    wire = 0
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        resp = client.get(path, headers=headers)
+        resp.raise_for_status()
+        wire = int(resp.headers.get("content-length") or len(resp.content))
+    return iterations / (time.perf_counter() - t0), wire
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="bench_json_responses")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "bench.sqlite3"))
+
+        @app.get("/bench/ui-state-default/{job_id}")
+        async def ui_state_default(job_id: str, request: Request) -> dict[str, Any]:
+            return await request.app.state.store.get_ui_state(job_id)
+
+        with TestClient(app) as client:
+            job_id = client.post("/api/jobs", json={"title": "bench", "goal": "bench"}).json()["job_id"]
+            steps = [
+                {
+                    "title": f"Step {i}",
+                    "instruction_prompt": f"Implement part {i}. " + "Follow the plan carefully. " * 40,
+                    "acceptance_criteria": [f"criterion {i}.{j}" for j in range(5)],
+                }
+                for i in range(args.steps)
+            ]
+            client.post(f"/api/jobs/{job_id}/steps", json={"steps": steps}).raise_for_status()
+            for i in range(50):
+                client.post(f"/api/jobs/{job_id}/devlog", json={"content": f"entry {i} " * 20})
+
+            identity = {"Accept-Encoding": "identity"}
+            gzip = {"Accept-Encoding": "gzip"}
+            rows = [
+                ("before  default response path, identity", f"/bench/ui-state-default/{job_id}", identity),
+                (f"after   FastJSON ({fastjson.BACKEND}), identity", f"/api/jobs/{job_id}/ui-state", identity),
+                (f"after   FastJSON ({fastjson.BACKEND}), gzip", f"/api/jobs/{job_id}/ui-state", gzip),
+            ]
+            for _, path, headers in rows:
+                _run(client, path, 5, headers)  # warm up
+            for label, path, headers in rows:
+                rps, wire = _run(client, path, args.iterations, headers)
+                print(f"{label:<40} {rps:8.1f} req/s   {wire / 1024:8.1f} KiB on the wire")
+
+            state = client.get(f"/api/jobs/{job_id}/ui-state").json()
+            adapter = TypeAdapter(dict[str, Any])
+            for label, encode in (
+                ("serialize  pydantic dict[str, Any]", lambda: adapter.dump_json(adapter.validate_python(state))),
+                ("serialize  jsonable_encoder + json", lambda: json.dumps(jsonable_encoder(state)).encode()),
+                (f"serialize  fastjson.dumps ({fastjson.BACKEND})", lambda: fastjson.dumps(state)),
+            ):
+                t0 = time.perf_counter()
+                for _ in range(args.iterations):
+                    encode()
+                per_call = (time.perf_counter() - t0) / args.iterations
+                print(f"{label:<40} {per_call * 1000:8.2f} ms per ui-state")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark SSE publish fan-out against subscriber count.
+
+Compares the serialize-once path (`SSEEventManager.publish` + shared
+`to_sse_bytes`) with re-encoding the event for every subscriber, which is what
+the per-subscriber generators used to do.
+
+Usage: python scripts/bench_sse_fanout.py [--events N] [--subscribers 1,10,100,1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from vibedev_mcp.events import SSEEventManager, create_job_event
+
+
+def _legacy_frame(event) -> bytes:
+    payload = {"type": event.event_type, "data": event.data, "timestamp": event.timestamp, "job_id": event.job_id}
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+async def _run(subscriber_count: int, event_count: int, *, shared: bool) -> float:
+    manager = SSEEventManager(max_queue_size=event_count + 1)
+    subscriptions = [await manager.subscribe("BENCH") for _ in range(subscriber_count)]
+    data = {"step_id": "S1", "summary": "x" * 200, "tags": ["a", "b", "c"]}
+
+    start = time.perf_counter()
+    for i in range(event_count):
+        await manager.publish(create_job_event("job_updated", "BENCH", seq=i, **data))
+        for sub in subscriptions:
+            event = sub.get_nowait()
+            event.to_sse_bytes() if shared else _legacy_frame(event)
+    return time.perf_counter() - start
+
+
+async def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="bench_sse_fanout")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--subscribers", default="1,10,100,1000")
+    args = parser.parse_args(argv)
+
+    print(f"{'subscribers':>11} {'shared ev/s':>12} {'per-sub ev/s':>13} {'speedup':>8}")
+    for count in (int(x) for x in args.subscribers.split(",")):
+        shared = await _run(count, args.events, shared=True)
+        legacy = await _run(count, args.events, shared=False)
+        print(
+            f"{count:>11} {args.events / shared:>12.0f} {args.events / legacy:>13.0f} {legacy / shared:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Cold start time of the HTTP server: fresh interpreter to first `/health` 200.
+
+For each `VIBEDEV_MCP_MOUNT` mode, starts `vibedev-mcp serve` as a subprocess
+on a throwaway database and polls `/health` until it answers, reporting the
+wall time from process spawn. With "lazy" (the default) the MCP server is not
+imported until the first `/mcp` request; "eager" is the previous behaviour.
+
+Usage: python scripts/bench_startup.py [--runs 5] [--modes lazy,eager,off]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _cold_start(mode: str, timeout: float = 60.0) -> float:
+    tmp_dir = tempfile.mkdtemp()
+    port = _free_port()
+    env = {
+        **os.environ,
+        "VIBEDEV_DB_PATH": os.path.join(tmp_dir, "startup.sqlite3"),
+        "VIBEDEV_MCP_MOUNT": mode,
+    }
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-c", "from vibedev_mcp.http_server import serve_main; serve_main()", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = t0 + timeout
+        while time.perf_counter() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - t0
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"server ({mode}) did not become ready")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="bench_startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="lazy,eager,off")
+    args = parser.parse_args(argv)
+
+    for mode in args.modes.split(","):
+        times = [_cold_start(mode) for _ in range(args.runs)]
+        print(f"{mode:<6} median {statistics.median(times) * 1000:7.0f} ms   min {min(times) * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Latency comparison: REST round trips vs RPC over the `/api/ws` WebSocket.
+
+Runs in-process through Starlette's TestClient against a throwaway database, so
+absolute numbers exclude real network cost (which favours the WebSocket path
+further: no per-request connection/headers). Measures:
+
+- read:   GET /api/jobs/{id}            vs  {"op": "call", "method": "get_job"}
+- action: POST /api/jobs/{id}/devlog    vs  devlog_append call + its pushed event
+
+Usage: python scripts/bench_ws_vs_rest.py [--iterations N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from vibedev_mcp.http_server import create_app
+
+
+def _summary(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    return f"median {statistics.median(ms):6.2f} ms   p95 {p95:6.2f} ms"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="bench_ws_vs_rest")
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "bench.sqlite3"))
+        with TestClient(app) as client:
+            job_id = client.post("/api/jobs", json={"title": "bench", "goal": "bench"}).json()["job_id"]
+
+            rest_read, rest_action = [], []
+            for _ in range(args.iterations):
+                t0 = time.perf_counter()
+                client.get(f"/api/jobs/{job_id}").raise_for_status()
+                rest_read.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                client.post(f"/api/jobs/{job_id}/devlog", json={"content": "x"}).raise_for_status()
+                rest_action.append(time.perf_counter() - t0)
+
+            ws_read, ws_action = [], []
+            with client.websocket_connect("/api/ws") as ws:
+                ws.send_json({"id": 0, "op": "subscribe", "job_id": job_id, "types": ["devlog_appended"]})
+                ws.receive_json()
+                for i in range(args.iterations):
+                    t0 = time.perf_counter()
+                    ws.send_json({"id": i, "op": "call", "method": "get_job", "params": {"job_id": job_id}})
+                    ws.receive_json()
+                    ws_read.append(time.perf_counter() - t0)
+
+                    t0 = time.perf_counter()
+                    ws.send_json({
+                        "id": i,
+                        "op": "call",
+                        "method": "devlog_append",
+                        "params": {"job_id": job_id, "content": "x"},
+                    })
+                    pending = {"reply", "event"}
+                    while pending:
+                        frame = ws.receive_json()
+                        pending.discard("event" if frame.get("type") == "event" else "reply")
+                    ws_action.append(time.perf_counter() - t0)
+
+        print(f"read    REST {_summary(rest_read)}")
+        print(f"read    WS   {_summary(ws_read)}")
+        print(f"action  REST {_summary(rest_action)}   (no push notification)")
+        print(f"action  WS   {_summary(ws_action)}   (reply + pushed event)")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
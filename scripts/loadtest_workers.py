@@ -0,0 +1,131 @@
+"""Read-heavy load test for `vibedev-mcp serve --workers N`.
+
+For each worker count, starts a real server (uvicorn, separate processes) on a
+throwaway database, seeds one job with a handful of steps, then drives
+concurrent GETs against the read endpoints the Studio polls and reports
+throughput. Read scaling should be close to linear up to the number of cores
+(SQLite WAL readers do not block each other); on a single-core machine every
+worker count tops out at the same rate.
+
+The load generator uses `--clients` asyncio connections from one process. If
+it saturates a core itself, run several copies against one `--port` with
+`--workers-list` set to a single value.
+
+Usage: python scripts/loadtest_workers.py [--workers-list 1,2,4] [--seconds 10] [--clients 64]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+READ_PATHS = ("/api/jobs/{job_id}", "/api/jobs/{job_id}/status", "/api/jobs/{job_id}/ui-state")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(base: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base} did not become ready")
+
+
+async def _drive(base: str, seconds: float, clients: int) -> tuple[int, int]:
+    async with httpx.AsyncClient(base_url=base, timeout=30.0) as client:
+        job = await client.post("/api/jobs", json={"title": "load", "goal": "load"})
+        job_id = job.json()["job_id"]
+        steps = [{"title": f"S{i}", "instruction_prompt": "Do the thing. " * 20} for i in range(10)]
+        await client.post(f"/api/jobs/{job_id}/steps", json={"steps": steps})
+        paths = [p.format(job_id=job_id) for p in READ_PATHS]
+
+        done = 0
+        errors = 0
+        stop = time.monotonic() + seconds
+
+        async def worker(offset: int) -> None:
+            nonlocal done, errors
+            i = offset
+            while time.monotonic() < stop:
+                resp = await client.get(paths[i % len(paths)])
+                i += 1
+                if resp.status_code == 200:
+                    done += 1
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        return done, errors
+
+
+def _run_one(workers: int, seconds: float, clients: int) -> tuple[float, int]:
+    tmp_dir = tempfile.mkdtemp()
+    port = _free_port()
+    env = {**os.environ, "VIBEDEV_DB_PATH": os.path.join(tmp_dir, "load.sqlite3")}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "from vibedev_mcp.http_server import serve_main; serve_main()",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(_wait_ready(base))
+        # Let every worker finish its lifespan startup before measuring.
+        time.sleep(1.0 + 0.25 * workers)
+        t0 = time.perf_counter()
+        done, errors = asyncio.run(_drive(base, seconds, clients))
+        return done / (time.perf_counter() - t0), errors
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="loadtest_workers")
+    parser.add_argument("--workers-list", default="1,2,4")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    print(f"cores: {os.cpu_count()}   endpoints: {', '.join(READ_PATHS)}")
+    baseline: float | None = None
+    for workers in (int(w) for w in args.workers_list.split(",")):
+        rps, errors = _run_one(workers, args.seconds, args.clients)
+        baseline = baseline or rps
+        print(f"workers {workers:>2}: {rps:8.1f} req/s   x{rps / baseline:4.2f}   errors {errors}")
+
+
+if __name__ == "__main__":
+    main()
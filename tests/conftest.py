@@ -5,6 +5,8 @@ Handles async test cleanup to avoid Windows SQLite file locking issues.
 
 import asyncio
 import gc
+import os
+
 import pytest
 
 
@@ -19,6 +21,19 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture
+def write_file():
+    """Return a helper that writes a UTF-8 file under `root`, creating parent dirs."""
+
+    def _write(root: str, rel: str, text: str) -> None:
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    return _write
+
+
 def pytest_configure(config):
     """Configure pytest-asyncio mode."""
     config.addinivalue_line(
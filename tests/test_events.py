@@ -0,0 +1,625 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def _drain(queue: asyncio.Queue) -> list[str]:
+    types: list[str] = []
+    while not queue.empty():
+        types.append(queue.get_nowait().event_type)
+    return types
+
+
+def _decode(chunk: bytes) -> dict:
+    assert chunk.startswith(b"data: ")
+    return json.loads(chunk[len(b"data: "):])
+
+
+@pytest.mark.asyncio
+async def test_store_mutations_emit_typed_events():
+    from vibedev_mcp.events import get_event_manager
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        firehose = await get_event_manager().subscribe(None)
+        try:
+            job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+            created = firehose.get_nowait()
+            assert (created.event_type, created.job_id) == ("job_created", job_id)
+            assert created.data["status"] == "PLANNING"
+
+            queue = await get_event_manager().subscribe(job_id)
+            try:
+                await store.job_update_policies(job_id=job_id, update={"x": 1})
+                context_id = await store.context_add_block(
+                    job_id=job_id, block_type="NOTE", content="c", tags=["t"]
+                )
+                await store.context_update_block(job_id=job_id, context_id=context_id, content="d")
+                await store.context_delete_block(job_id=job_id, context_id=context_id)
+                await store.devlog_append(job_id=job_id, content="log")
+                await store.plan_set_deliverables(job_id, ["d"])
+                await store.job_archive(job_id=job_id)
+
+                assert _drain(queue) == [
+                    "job_updated",
+                    "context_added",
+                    "context_updated",
+                    "context_deleted",
+                    "devlog_appended",
+                    "job_updated",
+                    "job_status_changed",
+                ]
+            finally:
+                await get_event_manager().unsubscribe(queue, job_id)
+        finally:
+            await get_event_manager().unsubscribe(firehose, None)
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_job_change_stream_queries_only_on_relevant_events(monkeypatch):
+    from vibedev_mcp.http_server import _job_change_stream
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+
+        calls: dict[str, int] = {}
+
+        def counting(name):
+            original = getattr(store, name)
+
+            async def wrapper(*args, **kwargs):
+                calls[name] = calls.get(name, 0) + 1
+                return await original(*args, **kwargs)
+
+            monkeypatch.setattr(store, name, wrapper)
+
+        for name in ("get_ui_state", "get_job", "get_attempts", "mistake_list", "devlog_list"):
+            counting(name)
+
+        stream = _job_change_stream(store, job_id)
+        try:
+            first = _decode(await stream.__anext__())
+            assert first["type"] == "job_updated"
+            assert first["data"]["job_id"] == job_id
+
+            next_chunk = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)
+            assert not next_chunk.done()
+            baseline = dict(calls)
+            await asyncio.sleep(0.1)
+            assert calls == baseline  # idle stream: no queries
+
+            log_id = await store.devlog_append(job_id=job_id, content="hello")
+            event = _decode(await asyncio.wait_for(next_chunk, timeout=2))
+            assert event == {"type": "devlog_appended", "data": event["data"]}
+            assert event["data"]["log_id"] == log_id
+
+            # Only the devlog query ran for a devlog event; no UI-state rebuild.
+            assert calls["devlog_list"] == baseline["devlog_list"] + 1
+            assert calls["get_ui_state"] == 1
+            for name in ("get_job", "get_attempts", "mistake_list"):
+                assert calls[name] == baseline[name]
+
+            await store.plan_set_invariants(job_id, ["keep tests green"])
+            event = _decode(await asyncio.wait_for(stream.__anext__(), timeout=2))
+            assert event["type"] == "job_updated"
+            assert event["data"]["invariants"] == ["keep tests green"]
+        finally:
+            await stream.aclose()
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_job_change_stream_reconcile_tick_catches_unannounced_writes():
+    from vibedev_mcp.http_server import _job_change_stream
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+
+        stream = _job_change_stream(store, job_id, reconcile_s=0.05)
+        try:
+            assert _decode(await stream.__anext__())["type"] == "job_updated"
+
+            # A write that bypasses the store methods (e.g. another process).
+            await store._conn.execute(
+                "INSERT INTO logs (log_id, job_id, log_type, content, created_at) VALUES (?, ?, ?, ?, ?);",
+                ("LOG-EXTERN", job_id, "DEVLOG", "x", "2999-01-01T00:00:00+00:00"),
+            )
+            await store._conn.commit()
+
+            event = _decode(await asyncio.wait_for(stream.__anext__(), timeout=2))
+            assert event["type"] == "devlog_appended"
+            assert event["data"]["log_id"] == "LOG-EXTERN"
+        finally:
+            await stream.aclose()
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_subscription_overflow_policies():
+    from vibedev_mcp.events import SSEEventManager, SubscriptionClosed, create_job_event
+
+    manager = SSEEventManager(max_queue_size=3)
+    oldest = await manager.subscribe("J")
+    coalesce = await manager.subscribe("J", overflow_policy="coalesce")
+    disconnect = await manager.subscribe("J", overflow_policy="disconnect")
+
+    for i, event_type in enumerate(["job_updated", "devlog_appended", "step_started", "job_updated"]):
+        await manager.publish(create_job_event(event_type, "J", seq=i))
+
+    # drop_oldest: newest three survive.
+    assert [oldest.get_nowait().data["seq"] for _ in range(3)] == [1, 2, 3]
+    assert (oldest.dropped, oldest.max_lag) == (1, 3)
+
+    # coalesce: the older job_updated was superseded, nothing else lost.
+    assert [(e.event_type, e.data["seq"]) for e in (coalesce.get_nowait() for _ in range(3))] == [
+        ("devlog_appended", 1),
+        ("step_started", 2),
+        ("job_updated", 3),
+    ]
+    assert (coalesce.dropped, coalesce.coalesced) == (0, 1)
+
+    # disconnect: closed, removed from fan-out, queued events discarded.
+    assert disconnect.closed
+    with pytest.raises(SubscriptionClosed):
+        await disconnect.get()
+    stats = manager.stats()
+    assert stats["subscribers"] == 2
+    assert stats["disconnected_total"] == 1
+    assert stats["dropped_total"] == 1 + 4
+    assert stats["coalesced_total"] == 1
+
+    await manager.unsubscribe(disconnect, "J")  # already gone: no double counting
+    assert manager.stats()["dropped_total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_idle_subscriber_memory_soak():
+    import gc
+    import tracemalloc
+
+    from vibedev_mcp.events import SSEEventManager, create_job_event
+
+    manager = SSEEventManager(max_queue_size=16)
+    subscriptions = [await manager.subscribe("SOAK") for _ in range(1000)]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(300):
+            await manager.publish(create_job_event("job_updated", "SOAK", seq=i, pad="x" * 256))
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    # 1000 idle tabs hold at most 16 shared events each (unbounded: ~2.4 MB of refs alone).
+    assert growth < 1024 * 1024
+    assert all(sub.lag == 16 and sub.dropped == 284 for sub in subscriptions)
+    assert manager.stats()["dropped_total"] == 1000 * 284
+
+    for sub in subscriptions:
+        await manager.unsubscribe(sub, "SOAK")
+    assert manager.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_publish_serializes_once_and_shares_bytes(monkeypatch):
+    from vibedev_mcp import events
+    from vibedev_mcp.events import SSEEventManager, create_job_event
+
+    dumps_calls = 0
+    real_dumps = json.dumps
+
+    def counting_dumps(*args, **kwargs):
+        nonlocal dumps_calls
+        dumps_calls += 1
+        return real_dumps(*args, **kwargs)
+
+    monkeypatch.setattr(events.json, "dumps", counting_dumps)
+
+    manager = SSEEventManager()
+    subscriptions = [await manager.subscribe("J") for _ in range(50)]
+    subscriptions.append(await manager.subscribe(None))
+
+    await manager.publish(create_job_event("job_updated", "J", n=1))
+    frames = [sub.get_nowait().to_sse_bytes() for sub in subscriptions]
+
+    assert dumps_calls == 1
+    assert all(frame is frames[0] for frame in frames)
+    assert json.loads(frames[0][len(b"data: "):]) == {
+        "type": "job_updated",
+        "data": {"job_id": "J", "n": 1},
+        "timestamp": json.loads(frames[0][len(b"data: "):])["timestamp"],
+        "job_id": "J",
+    }
+
+    # Subscribing while a publish snapshot is live never mutates that snapshot.
+    snapshot = manager._subscribers["J"]
+    late = await manager.subscribe("J")
+    assert late not in snapshot and late in manager._subscribers["J"]
+
+
+@pytest.mark.asyncio
+async def test_event_log_replay_and_retention():
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp_dir, "vibedev.sqlite3")
+        store = await VibeDevStore.open(db_path)
+        job_a = await store.create_job(title="A", goal="G", repo_root=None, policies={})
+        job_b = await store.create_job(title="B", goal="G", repo_root=None, policies={})
+        await store.devlog_append(job_id=job_a, content="one")
+        await store.devlog_append(job_id=job_b, content="two")
+        await store.close()
+
+        # Ids survive a restart and replay is per job.
+        store = await VibeDevStore.open(db_path)
+        replay = await store.events_replay(after_id=0, job_id=job_a)
+        assert [e.event_type for e in replay["events"]] == ["job_created", "devlog_appended"]
+        first_id = replay["events"][0].event_id
+        assert replay["events"][1].event_id > first_id
+        assert replay["events"][0].to_sse_bytes().startswith(f"id: {first_id}\ndata: ".encode())
+        assert replay["truncated"] is False
+
+        everything = await store.events_replay(after_id=0)
+        assert len(everything["events"]) == 4
+
+        removed = await store.events_prune(keep=2)
+        assert removed == 2
+        replay = await store.events_replay(after_id=first_id)
+        assert replay["truncated"] is True
+        assert len(replay["events"]) == 2
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_mutation_event_and_revision_commit_together(monkeypatch):
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+        revision = await store.job_revision(job_id)
+
+        commits = 0
+        commit = store._conn.commit
+
+        async def counting_commit() -> None:
+            nonlocal commits
+            commits += 1
+            await commit()
+
+        monkeypatch.setattr(store._conn, "commit", counting_commit)
+        await store.devlog_append(job_id=job_id, content="one")
+        assert commits == 1
+        assert await store.job_revision(job_id) == revision + 1
+
+        # If the event cannot be recorded, the change it describes is not kept either.
+        async def failing_commit() -> None:
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(store._conn, "commit", failing_commit)
+        with pytest.raises(RuntimeError):
+            await store.devlog_append(job_id=job_id, content="two")
+        monkeypatch.setattr(store._conn, "commit", commit)
+        assert [log["content"] for log in await store.devlog_list(job_id=job_id)] == ["one"]
+        replay = await store.events_replay(after_id=0, job_id=job_id)
+        assert [e.event_type for e in replay["events"]] == ["job_created", "devlog_appended"]
+        assert await store.job_revision(job_id) == revision + 1
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_event_stream_replays_after_last_event_id_then_goes_live():
+    from vibedev_mcp.http_server import _event_stream
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+        await store.devlog_append(job_id=job_id, content="seen")
+        seen_id = (await store.events_replay(after_id=0, job_id=job_id))["events"][-1].event_id
+        await store.devlog_append(job_id=job_id, content="missed")
+
+        stream = _event_stream(store, job_id, last_event_id=seen_id)
+        try:
+            missed = await stream.__anext__()
+            assert missed.startswith(f"id: {seen_id + 1}\n".encode())
+
+            await store.context_add_block(job_id=job_id, block_type="NOTE", content="c", tags=[])
+            live = await asyncio.wait_for(stream.__anext__(), timeout=2)
+            assert b'"type": "context_added"' in live
+
+            # Pruned past the client's position: tell it to resync before replaying.
+            await store.events_prune(keep=1)
+            resync_stream = _event_stream(store, job_id, last_event_id=seen_id)
+            try:
+                first = await resync_stream.__anext__()
+                assert b'"type": "resync"' in first
+            finally:
+                await resync_stream.aclose()
+        finally:
+            await stream.aclose()
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_events_tail_relays_other_process_writes():
+    from vibedev_mcp.events import SSEEventManager, get_event_manager
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp_dir, "vibedev.sqlite3")
+        http_store = await VibeDevStore.open(db_path)
+        # Stand-in for the stdio MCP process: own connection, origin and bus.
+        mcp_store = await VibeDevStore.open(db_path)
+        mcp_store.origin = "other-process"
+        mcp_store.events = SSEEventManager()
+
+        job_id = await http_store.create_job(title="T", goal="G", repo_root=None, policies={})
+        queue = await get_event_manager().subscribe(job_id)
+        tail = asyncio.create_task(http_store.events_tail(poll_interval=0.005))
+        try:
+            await asyncio.sleep(0.02)
+            log_id = await mcp_store.devlog_append(job_id=job_id, content="from mcp")
+            relayed = await asyncio.wait_for(queue.get(), timeout=2)
+            assert relayed.event_type == "devlog_appended"
+            assert relayed.data["log_id"] == log_id
+            assert relayed.event_id is not None
+
+            # Local writes are published once, not echoed back by the tailer.
+            await http_store.devlog_append(job_id=job_id, content="local")
+            await asyncio.sleep(0.05)
+            assert _drain(queue) == ["devlog_appended"]
+        finally:
+            tail.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await tail
+            await get_event_manager().unsubscribe(queue, job_id)
+            await mcp_store.close()
+            await http_store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_event_filters_drop_at_publish_and_project_fields():
+    from vibedev_mcp.events import EventFilter, SSEEventManager, create_job_event, create_step_event
+
+    assert EventFilter.from_params(types=" ", steps=None, fields="") is None
+    with pytest.raises(ValueError):
+        EventFilter(types=["not_an_event"])
+
+    manager = SSEEventManager()
+    status_bar = await manager.subscribe(
+        "J",
+        event_filter=EventFilter.from_params(
+            types="step_completed,job_status_changed", steps="S2", fields="step_id,status"
+        ),
+    )
+    everything = await manager.subscribe("J")
+
+    await manager.publish(create_job_event("devlog_appended", "J", log_id="L1"))
+    await manager.publish(create_step_event("step_completed", "J", "S1", next_step_id="S2"))
+    await manager.publish(create_step_event("step_completed", "J", "S2", next_step_id="S3"))
+    await manager.publish(create_job_event("job_status_changed", "J", status="COMPLETE"))
+
+    assert everything.qsize() == 4
+    assert status_bar.qsize() == 2
+    assert status_bar.filtered == 2
+
+    frames = [status_bar.get_nowait().to_sse_bytes(status_bar.fields) for _ in range(2)]
+    payloads = [json.loads(f[len(b"data: "):]) for f in frames]
+    assert [p["data"] for p in payloads] == [{"step_id": "S2"}, {"status": "COMPLETE"}]
+    assert payloads[0]["type"] == "step_completed" and payloads[0]["job_id"] == "J"
+
+
+def test_event_stream_rejects_unknown_type_filter():
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            resp = client.get("/api/events", params={"types": "step_completed,bogus"})
+            assert resp.status_code == 400
+            assert "bogus" in resp.json()["detail"]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_event_stream_batching_window_collapses_job_updates():
+    from vibedev_mcp.events import collapse_superseded, create_job_event
+    from vibedev_mcp.http_server import _event_stream
+    from vibedev_mcp.store import VibeDevStore
+
+    events = [
+        create_job_event("job_updated", "A", n=1),
+        create_job_event("job_updated", "B", n=1),
+        create_job_event("devlog_appended", "A"),
+        create_job_event("job_updated", "A", n=2),
+    ]
+    assert [(e.job_id, e.event_type) for e in collapse_superseded(events)] == [
+        ("B", "job_updated"),
+        ("A", "devlog_appended"),
+        ("A", "job_updated"),
+    ]
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+
+        stream = _event_stream(store, job_id, batch_s=0.1)
+        try:
+            first_frame = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.02)
+            await store.job_update_policies(job_id=job_id, update={"a": 1})
+            await store.devlog_append(job_id=job_id, content="x")
+            await store.plan_set_deliverables(job_id, ["d"])
+            await store.context_add_block(job_id=job_id, block_type="NOTE", content="c", tags=[])
+
+            frame = await asyncio.wait_for(first_frame, timeout=2)
+            id_line, data_line = frame.decode().strip().split("\n")
+            batch = json.loads(data_line[len("data: "):])
+            assert batch["type"] == "batch"
+            assert [e["type"] for e in batch["events"]] == ["devlog_appended", "job_updated", "context_added"]
+            assert batch["events"][1]["data"]["change"] == "deliverables"
+            last_id = (await store.events_replay(after_id=0, job_id=job_id))["events"][-1].event_id
+            assert id_line == f"id: {last_id}"
+        finally:
+            await stream.aclose()
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_subscriber_caps_and_idle_reaping():
+    from vibedev_mcp.events import (
+        SSEEventManager,
+        SubscriberLimitExceeded,
+        SubscriptionClosed,
+        create_job_event,
+    )
+
+    manager = SSEEventManager(max_subscribers=3, max_per_job=2, idle_timeout=60)
+    first = await manager.subscribe("A", label="sse")
+    second = await manager.subscribe("A")
+    with pytest.raises(SubscriberLimitExceeded):
+        await manager.subscribe("A")
+    firehose = await manager.subscribe(None)
+    with pytest.raises(SubscriberLimitExceeded):
+        await manager.subscribe("B")
+    assert manager.stats()["rejected_total"] == 2
+
+    await manager.publish(create_job_event("job_updated", "A"))
+    first.get_nowait()
+    first.sent(100)
+    # `second` and the firehose never drained their event; `first` did.
+    now = first.last_active + 61
+    second.last_active = firehose.last_active = first.last_active - 1
+    assert manager.reap_idle(now=now - 1) == 2
+    assert manager.reap_idle(now=now) == 1
+
+    with pytest.raises(SubscriptionClosed):
+        await second.get()
+    stats = manager.stats()
+    assert stats["subscribers"] == 0 and stats["reaped_total"] == 3
+    assert stats["bytes_sent_total"] == 100
+    assert (await manager.subscribe("A")).label is None
+
+
+def test_events_stats_endpoint_and_subscriber_limit():
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.events import get_event_manager
+    from vibedev_mcp.http_server import create_app
+
+    manager = get_event_manager()
+    saved = manager.max_subscribers
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            stats = client.get("/api/events/stats").json()
+            for key in ("subscribers", "queue_depth_total", "bytes_sent_total", "max_lag", "limits", "subscriptions"):
+                assert key in stats
+
+            manager.max_subscribers = manager.subscriber_count()
+            resp = client.get("/api/events")
+            assert resp.status_code == 503
+            assert resp.headers["Retry-After"] == "5"
+            assert resp.json()["error"] == "too_many_subscribers"
+    finally:
+        manager.max_subscribers = saved
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_event_stream_accounts_bytes_sent():
+    from vibedev_mcp.events import get_event_manager
+    from vibedev_mcp.http_server import _event_stream
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+        await store.devlog_append(job_id=job_id, content="x")
+
+        stream = _event_stream(store, job_id, last_event_id=0)
+        try:
+            frames = [await stream.__anext__(), await stream.__anext__()]
+            subs = [s for s in get_event_manager().stats()["subscriptions"] if s["job_id"] == job_id]
+            assert len(subs) == 1 and subs[0]["label"] == "sse"
+            assert subs[0]["bytes_sent"] == sum(len(f) for f in frames)
+        finally:
+            await stream.aclose()
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_store_transaction_publishes_only_after_commit():
+    from vibedev_mcp.events import get_event_manager
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+        queue = await get_event_manager().subscribe(job_id)
+        try:
+            async with store.transaction() as tx:
+                await tx.devlog_append(job_id=job_id, content="a")
+                await tx.job_update_policies(job_id=job_id, update={"x": 1})
+                assert queue.empty()
+            assert _drain(queue) == ["devlog_appended", "job_updated"]
+
+            with pytest.raises(RuntimeError):
+                async with store.transaction() as tx:
+                    await tx.devlog_append(job_id=job_id, content="b")
+                    raise RuntimeError("abort")
+            assert queue.empty()
+            logs = await store.devlog_list(job_id=job_id, limit=10)
+            assert [entry["content"] for entry in logs] == ["a"]
+            assert (await store.get_job(job_id))["policies"] == {"x": 1}
+        finally:
+            await get_event_manager().unsubscribe(queue, job_id)
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
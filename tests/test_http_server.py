@@ -1,7 +1,12 @@
+import datetime
+import json
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
 
+import pytest
 from fastapi.testclient import TestClient
 
 
@@ -236,3 +241,401 @@ def test_http_step_gates_retry_exhaustion_pauses_job():
             assert ui["job"]["status"] == "PAUSED"
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_conditional_get_with_etags(monkeypatch):
+    from vibedev_mcp.http_server import create_app
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp_dir, "vibedev.sqlite3")
+        with TestClient(create_app(db_path=db_path)) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+
+            builds = 0
+            original = VibeDevStore.get_ui_state
+
+            async def counting_get_ui_state(self, job_id, **kwargs):
+                nonlocal builds
+                builds += 1
+                return await original(self, job_id, **kwargs)
+
+            monkeypatch.setattr(VibeDevStore, "get_ui_state", counting_get_ui_state)
+
+            for path in (f"/api/jobs/{job_id}", f"/api/jobs/{job_id}/status", f"/api/jobs/{job_id}/ui-state"):
+                first = client.get(path)
+                etag = first.headers["ETag"]
+                assert etag.startswith('"') and not etag.startswith("W/")
+
+                cached = client.get(path, headers={"If-None-Match": etag})
+                assert cached.status_code == 304
+                assert cached.headers["ETag"] == etag
+                assert cached.content == b""
+                assert client.get(path, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+            assert builds == 1
+            assert client.get(f"/api/jobs/{job_id}/ui-state").json()["job"]["revision"] >= 1
+
+            client.patch(f"/api/jobs/{job_id}/policies", json={"update": {"lint": True}})
+            fresh = client.get(f"/api/jobs/{job_id}/ui-state", headers={"If-None-Match": etag})
+            assert fresh.status_code == 200
+            assert fresh.headers["ETag"] != etag
+            assert fresh.json()["job"]["policies"]["lint"] is True
+
+            assert client.get("/api/jobs/NOPE", headers={"If-None-Match": "*"}).status_code == 404
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_ui_state_etag_reuses_one_git_status(tmp_path):
+    from vibedev_mcp import metrics
+    from vibedev_mcp.http_server import create_app
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    (repo / "a.py").write_text("x = 1\n")
+    spawns = metrics.SUBPROCESS_SPAWNS.labels("git")
+
+    with TestClient(create_app(db_path=str(tmp_path / "vibedev.sqlite3"))) as client:
+        job_id = client.post("/api/jobs", json={"title": "T", "goal": "G", "repo_root": str(repo)}).json()["job_id"]
+        before = spawns.value
+        first = client.get(f"/api/jobs/{job_id}/ui-state")
+        assert first.json()["git_status"]["added"] == ["a.py"]
+        etag = first.headers["ETag"]
+        assert "-g" in etag
+        for _ in range(3):
+            assert client.get(f"/api/jobs/{job_id}/ui-state", headers={"If-None-Match": etag}).status_code == 304
+        # One `git status` served the tag, the body and the revalidations.
+        assert spawns.value - before == 1
+
+
+def test_http_fast_json_and_gzip():
+    from vibedev_mcp import fastjson
+    from vibedev_mcp.http_server import create_app
+
+    content = {"a": [1, 2.5, None, True], "é": "ü", "when": datetime.date(2024, 1, 2)}
+    expected = {"a": [1, 2.5, None, True], "é": "ü", "when": "2024-01-02"}
+    assert json.loads(fastjson._stdlib_dumps(content)) == expected
+    assert json.loads(fastjson.dumps(content)) == expected
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            steps = [{"title": f"S{i}", "instruction_prompt": "Do it. " * 50} for i in range(10)]
+            client.post(f"/api/jobs/{job_id}/steps", json={"steps": steps})
+
+            big = client.get(f"/api/jobs/{job_id}/ui-state", headers={"Accept-Encoding": "gzip"})
+            assert big.headers["content-encoding"] == "gzip"
+            total = len(big.json()["steps"])
+            assert total >= 10
+
+            small = client.get(f"/api/jobs/{job_id}/status", headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in small.headers
+            assert small.headers["content-type"] == "application/json"
+            assert small.json()["total_steps"] == total
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_batch_runs_operations_in_order():
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+
+            resp = client.post(
+                "/api/batch",
+                json={
+                    "operations": [
+                        {"method": "GET", "path": f"/api/jobs/{job_id}/status"},
+                        {"method": "PATCH", "path": f"/api/jobs/{job_id}/policies", "body": {"update": {"x": 1}}},
+                        {"method": "GET", "path": "/api/jobs?status=PLANNING&limit=5"},
+                        {"method": "GET", "path": "/api/jobs/NOPE"},
+                        {"method": "GET", "path": f"/api/jobs/{job_id}"},
+                    ]
+                },
+            )
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["ok"] is False and data["transaction"] is False
+            statuses = [r["status"] for r in data["results"]]
+            assert statuses == [200, 200, 200, 404, None]
+            assert data["results"][0]["body"]["status"] == "PLANNING"
+            assert data["results"][0]["etag"].startswith('"status-')
+            assert data["results"][1]["body"]["job"]["policies"]["x"] == 1
+            assert data["results"][2]["body"]["count"] == 1
+            assert data["results"][4]["skipped"] is True
+
+            resp = client.post(
+                "/api/batch",
+                json={
+                    "operations": [
+                        {"method": "GET", "path": "/api/jobs/NOPE"},
+                        {"method": "GET", "path": f"/api/jobs/{job_id}"},
+                    ],
+                    "stop_on_error": False,
+                },
+            )
+            assert [r["status"] for r in resp.json()["results"]] == [404, 200]
+
+            resp = client.post("/api/batch", json={"operations": [{"path": f"/api/jobs/{job_id}/events"}]})
+            assert resp.json()["results"][0]["status"] == 400
+            assert client.post("/api/batch", json={"operations": []}).status_code == 422
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_batch_transaction_commits_or_rolls_back():
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            policies = f"/api/jobs/{job_id}/policies"
+
+            resp = client.post(
+                "/api/batch",
+                json={
+                    "transaction": True,
+                    "operations": [
+                        {"method": "PATCH", "path": policies, "body": {"update": {"a": 1}}},
+                        {"method": "POST", "path": f"/api/jobs/{job_id}/devlog", "body": {"content": "in tx"}},
+                        {"method": "GET", "path": f"/api/jobs/{job_id}"},
+                    ],
+                },
+            ).json()
+            assert resp["committed"] is True
+            # Reads inside the transaction see its own writes.
+            assert resp["results"][2]["body"]["policies"]["a"] == 1
+            assert client.get(f"/api/jobs/{job_id}").json()["policies"]["a"] == 1
+
+            before = client.get(f"/api/jobs/{job_id}/devlog").json()
+            resp = client.post(
+                "/api/batch",
+                json={
+                    "transaction": True,
+                    "stop_on_error": False,
+                    "operations": [
+                        {"method": "PATCH", "path": policies, "body": {"update": {"b": 2}}},
+                        {"method": "POST", "path": f"/api/jobs/{job_id}/devlog", "body": {"content": "rolled back"}},
+                        {"method": "GET", "path": "/api/jobs/NOPE"},
+                        {"method": "GET", "path": f"/api/jobs/{job_id}"},
+                    ],
+                },
+            ).json()
+            assert resp["committed"] is False
+            assert [r["status"] for r in resp["results"]] == [200, 200, 404, None]
+            assert "b" not in client.get(f"/api/jobs/{job_id}").json()["policies"]
+            assert client.get(f"/api/jobs/{job_id}/devlog").json() == before
+
+            # Subprocess-spawning routes would hold the write lock while gates/git run.
+            resp = client.post(
+                "/api/batch",
+                json={
+                    "transaction": True,
+                    "operations": [
+                        {"method": "POST", "path": f"/api/jobs/{job_id}/devlog", "body": {"content": "x"}},
+                        {"method": "GET", "path": f"/api/jobs/{job_id}/git/status"},
+                    ],
+                },
+            ).json()
+            assert resp["committed"] is False
+            assert resp["results"][1]["status"] == 400
+            assert "transactional batch" in resp["results"][1]["body"]["detail"]
+            assert client.get(f"/api/jobs/{job_id}/devlog").json() == before
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_mcp_mount_is_lazy(monkeypatch):
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        with TestClient(app) as client:
+            assert client.get("/health").status_code == 200
+            assert app.state.mcp.app is None
+
+            init = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}
+            resp = client.post("/mcp/", json=init, headers={"Accept": "application/json, text/event-stream"})
+            # Reached the MCP transport (which may still reject the test client's Host header).
+            assert resp.status_code != 404
+            assert app.state.mcp.app is not None
+
+        monkeypatch.setenv("VIBEDEV_MCP_MOUNT", "off")
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            assert client.post("/mcp/", json=init).status_code == 404
+
+        monkeypatch.setenv("VIBEDEV_MCP_MOUNT", "sometimes")
+        with pytest.raises(ValueError):
+            create_app()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_mcp_start_failure_is_logged_and_503(monkeypatch, caplog):
+    import importlib
+
+    from vibedev_mcp.http_server import create_app
+
+    real_import = importlib.import_module
+
+    def broken_import(name, *args, **kwargs):
+        if name == "vibedev_mcp.server":
+            raise ImportError("mcp extra is broken")
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(importlib, "import_module", broken_import)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        with TestClient(app) as client, caplog.at_level("ERROR", logger="vibedev_mcp.http_server"):
+            for _ in range(2):
+                resp = client.post("/mcp/", json={"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+                assert resp.status_code == 503
+                assert "mcp extra is broken" in resp.json()["detail"]
+            assert app.state.mcp.error == "ImportError: mcp extra is broken"
+        # Logged once, with the traceback.
+        failures = [r for r in caplog.records if r.name == "vibedev_mcp.http_server"]
+        assert len(failures) == 1 and failures[0].exc_info is not None
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+_COLD_START = """
+import json, os, sys, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+import vibedev_mcp.http_server as http_server
+with TestClient(http_server.app) as client:
+    ok = client.get("/health").status_code == 200
+print(json.dumps({
+    "ok": ok,
+    "seconds": time.perf_counter() - t0,
+    "mcp_imported": "vibedev_mcp.server" in sys.modules,
+}))
+"""
+
+
+def test_http_cold_start_to_first_health():
+    """Cold import to first /health 200 in a fresh interpreter (scripts/bench_startup.py for real numbers)."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        env = {**os.environ, "VIBEDEV_DB_PATH": os.path.join(tmp_dir, "vibedev.sqlite3")}
+        env.pop("VIBEDEV_MCP_MOUNT", None)
+        out = subprocess.run(
+            [sys.executable, "-c", _COLD_START], env=env, capture_output=True, text=True, timeout=120, check=True
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        assert result["ok"] is True
+        assert result["mcp_imported"] is False
+        # Generous bound for slow CI machines; a regression back to eager MCP setup roughly doubles it.
+        assert result["seconds"] < 15
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_listings_paginate_project_and_stream():
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            for i in range(12):
+                client.post(f"/api/jobs/{job_id}/devlog", json={"content": f"entry {i}"})
+                client.post(
+                    f"/api/jobs/{job_id}/mistakes",
+                    json={
+                        "title": f"M{i}",
+                        "what_happened": "x",
+                        "why": "y",
+                        "lesson": "z",
+                        "avoid_next_time": "w",
+                    },
+                )
+
+            first = client.get(f"/api/jobs/{job_id}/devlog", params={"limit": 5}).json()
+            assert first["count"] == 5 and first["next_cursor"]
+            second = client.get(
+                f"/api/jobs/{job_id}/devlog", params={"limit": 5, "cursor": first["next_cursor"]}
+            ).json()
+            assert {e["log_id"] for e in first["entries"]}.isdisjoint(e["log_id"] for e in second["entries"])
+
+            mistakes = client.get(f"/api/jobs/{job_id}/mistakes", params={"fields": "title,why"}).json()
+            assert mistakes["entries"][0] == {"title": "M11", "why": "y"}
+            assert mistakes["next_cursor"] is None
+
+            resp = client.get(f"/api/jobs/{job_id}/devlog", params={"format": "ndjson", "fields": "content"})
+            assert resp.headers["content-type"] == "application/x-ndjson"
+            rows = [json.loads(line) for line in resp.text.splitlines()]
+            assert len(rows) == 12 and rows[0] == {"content": "entry 11"}
+
+            export = client.get(f"/api/jobs/{job_id}/devlog/export", params={"stream": "true"})
+            assert export.headers["content-type"].startswith("text/markdown")
+            assert export.text.splitlines()[2].endswith("entry 0")
+
+            attempts = client.get(f"/api/jobs/{job_id}/attempts", params={"fields": "attempt_id,outcome"})
+            assert attempts.json() == {"count": 0, "entries": [], "next_cursor": None}
+
+            assert client.get(f"/api/jobs/{job_id}/devlog", params={"cursor": "%%%"}).status_code == 400
+            assert client.get(f"/api/jobs/{job_id}/attempts", params={"fields": "nope"}).status_code == 400
+            assert client.get("/api/jobs/NOPE/mistakes", params={"format": "ndjson"}).status_code == 404
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_http_job_export_bundle_streams_and_imports():
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "source.sqlite3"))) as source:
+            job_id = source.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            for i in range(3):
+                source.post(f"/api/jobs/{job_id}/devlog", json={"content": f"entry {i}"})
+
+            ndjson = source.get(f"/api/jobs/{job_id}/export", params={"format": "ndjson"})
+            assert ndjson.headers["content-type"] == "application/x-ndjson"
+            assert f'filename="{job_id}.ndjson"' in ndjson.headers["content-disposition"]
+            records = [json.loads(line) for line in ndjson.text.splitlines()]
+            assert records[-1] == {"type": "end", "counts": {"jobs": 1, "logs": 3}}
+
+            archive = source.get(f"/api/jobs/{job_id}/export", params={"format": "tar.gz"})
+            assert archive.headers["content-type"] == "application/gzip"
+            assert "content-encoding" not in archive.headers
+
+            markdown = source.get(f"/api/jobs/{job_id}/export-legacy", params={"stream": "true"})
+            assert markdown.status_code == 200 and markdown.text.startswith("# Job Report: T")
+            assert source.get(f"/api/jobs/{job_id}/export-legacy").json()["content"] == markdown.text.rstrip("\n")
+
+            assert source.get("/api/jobs/NOPE/export", params={"format": "ndjson"}).status_code == 404
+
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "target.sqlite3"))) as target:
+            imported = target.post(
+                "/api/jobs/import", content=archive.content, headers={"content-type": "application/gzip"}
+            )
+            assert imported.status_code == 200 and imported.json()["job_id"] == job_id
+            assert target.get(f"/api/jobs/{job_id}/devlog").json()["count"] == 3
+
+            again = target.post(
+                "/api/jobs/import", content=ndjson.content, headers={"content-type": "application/x-ndjson"}
+            )
+            assert again.status_code == 400
+
+            truncated = b"\n".join(ndjson.content.splitlines()[:-1]).replace(job_id.encode(), b"JOB-COPY")
+            resp = target.post(
+                "/api/jobs/import", content=truncated, headers={"content-type": "application/x-ndjson"}
+            )
+            assert resp.status_code == 400
+            assert target.get("/api/jobs/JOB-COPY").status_code == 404
+            assert target.post("/api/jobs/import", content=b"not an archive").status_code == 400
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def test_make_patch_round_trips_nested_changes():
+    from vibedev_mcp.jsonpatch import apply_patch, make_patch
+
+    old = {
+        "job": {"status": "READY", "title": "T"},
+        "steps": [{"step_id": "S1", "status": "PENDING"}, {"step_id": "S2", "status": "PENDING"}],
+        "a/b": 1,
+        "gone": True,
+    }
+    new = {
+        "job": {"status": "EXECUTING", "title": "T"},
+        "steps": [{"step_id": "S1", "status": "ACTIVE"}],
+        "a/b": 2,
+        "logs": ["x"],
+    }
+
+    patch = make_patch(old, new)
+    assert {"op": "replace", "path": "/job/status", "value": "EXECUTING"} in patch
+    assert {"op": "replace", "path": "/a~1b", "value": 2} in patch
+    assert {"op": "remove", "path": "/steps/1"} in patch
+    assert {"op": "remove", "path": "/gone"} in patch
+    assert apply_patch(old, patch) == new
+    assert old["job"]["status"] == "READY"
+
+    assert make_patch(new, new) == []
+    grown = {**new, "steps": new["steps"] + [{"step_id": "S3"}, {"step_id": "S4"}]}
+    assert apply_patch(new, make_patch(new, grown)) == grown
+
+
+def test_apply_patch_rejects_bad_paths():
+    from vibedev_mcp.jsonpatch import JsonPatchError, apply_patch
+
+    with pytest.raises(JsonPatchError):
+        apply_patch({"a": 1}, [{"op": "remove", "path": "/b"}])
+    with pytest.raises(JsonPatchError):
+        apply_patch({"a": [1]}, [{"op": "replace", "path": "/a/5", "value": 2}])
+    with pytest.raises(JsonPatchError):
+        apply_patch({"a": 1}, [{"op": "move", "from": "/a", "path": "/b"}])
+
+
+def test_snapshot_history_versions_and_ages_out():
+    from vibedev_mcp.jsonpatch import SnapshotHistory
+
+    history = SnapshotHistory(depth=2, max_keys=2)
+    v1 = history.record("J", {"n": 1})
+    assert history.record("J", {"n": 1}) == v1
+    v2 = history.record("J", {"n": 2})
+    assert v2 != v1
+
+    delta = history.delta("J", {"n": 3}, since=v2)
+    assert delta["base"] == v2 and delta["patch"] == [{"op": "replace", "path": "/n", "value": 3}]
+
+    # v1 fell out of the two-deep window, so the caller gets a full snapshot.
+    full = history.delta("J", {"n": 3}, since=v1)
+    assert full["base"] is None and full["state"] == {"n": 3}
+    assert full["version"] == delta["version"]
+
+    history.record("K", {})
+    history.record("L", {})
+    assert history.get("J", delta["version"]) is None
+
+
+def test_ui_state_delta_endpoint_returns_patches():
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+    from vibedev_mcp.jsonpatch import apply_patch
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+
+            first = client.get(f"/api/jobs/{job_id}/ui-state/delta").json()
+            assert first["base"] is None
+            state = first["state"]
+
+            same = client.get(f"/api/jobs/{job_id}/ui-state/delta", params={"since": first["version"]}).json()
+            assert same == {"version": first["version"], "base": first["version"], "patch": []}
+
+            client.patch(f"/api/jobs/{job_id}/policies", json={"update": {"lint": True}})
+            delta = client.get(f"/api/jobs/{job_id}/ui-state/delta", params={"since": first["version"]}).json()
+            assert delta["version"] != first["version"]
+            assert delta["patch"]
+            state = apply_patch(state, delta["patch"])
+            assert state == client.get(f"/api/jobs/{job_id}/ui-state").json()
+
+            stale = client.get(f"/api/jobs/{job_id}/ui-state/delta", params={"since": "other.1"}).json()
+            assert stale["base"] is None and "state" in stale
+
+            assert client.get("/api/jobs/NOPE/ui-state/delta").status_code == 404
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
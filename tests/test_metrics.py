@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    from vibedev_mcp.metrics import Counter, Histogram, Registry
+
+    registry = Registry()
+    hist = registry.register(Histogram("t_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("t_total", "Test count.", ("kind",)))
+    plain = registry.register(Counter("t_plain_total", "No labels."))
+
+    child = hist.labels('/a/"b"')
+    assert hist.labels('/a/"b"') is child
+    for value in (0.05, 0.5, 5.0):
+        child.observe(value)
+    counter.labels("x").inc()
+    counter.labels("x").inc(2)
+    plain.inc()
+
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{route="/a/\\"b\\"",le="0.1"} 1' in text
+    assert 't_seconds_bucket{route="/a/\\"b\\"",le="1"} 2' in text
+    assert 't_seconds_bucket{route="/a/\\"b\\"",le="+Inf"} 3' in text
+    assert 't_seconds_count{route="/a/\\"b\\""} 3' in text
+    assert 't_seconds_sum{route="/a/\\"b\\""} 5.55' in text
+    assert 't_total{kind="x"} 3' in text
+    assert "t_plain_total 1" in text
+
+
+def test_gate_timer_records_outcome_per_gate():
+    from vibedev_mcp import metrics
+
+    before_pass = metrics.GATE_SECONDS.labels("file_exists", "true").count
+    before_fail = metrics.GATE_SECONDS.labels("tests_passed", "false").count
+    before_other = metrics.GATE_SECONDS.labels("other", "true").count
+
+    timer = metrics.GateTimer()
+    timer.start("file_exists", 0)
+    timer.start("tests_passed", 0)  # closes file_exists with no new failures
+    timer.stop(1)
+    timer.stop(1)  # no-op once stopped
+    # Gate types come from user config; unknown ones share one label value.
+    timer.start("made_up_gate_0123456789", 1)
+    timer.stop(1)
+
+    assert metrics.GATE_SECONDS.labels("file_exists", "true").count == before_pass + 1
+    assert metrics.GATE_SECONDS.labels("tests_passed", "false").count == before_fail + 1
+    assert metrics.GATE_SECONDS.labels("other", "true").count == before_other + 1
+    assert ("made_up_gate_0123456789", "true") not in metrics.GATE_SECONDS._children
+
+
+def test_metrics_endpoint_reports_requests_store_and_events():
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            client.get(f"/api/jobs/{job_id}")
+            client.get("/no/such/route")
+
+            resp = client.get("/metrics")
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+            text = resp.text
+
+            assert (
+                'vibedev_http_request_duration_seconds_count{method="GET",route="/api/jobs/{job_id}",status="200"}'
+                in text
+            )
+            assert 'route="unmatched",status="404"' in text
+            assert job_id not in text
+            assert 'vibedev_store_call_duration_seconds_count{method="create_job"}' in text
+            assert 'vibedev_sqlite_queries_total{kind="insert"}' in text
+            assert 'vibedev_events_published_total{event_type="job_created"}' in text
+            assert "# TYPE vibedev_sse_subscribers gauge" in text
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
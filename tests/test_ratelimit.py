@@ -0,0 +1,115 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def test_rate_limiter_refills_and_reports_wait():
+    from vibedev_mcp.ratelimit import RateLimiter
+
+    limiter = RateLimiter(rate=2.0, burst=3, max_keys=2)
+    assert [limiter.check("a", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.check("a", now=0.0) == pytest.approx(0.5)
+    assert limiter.check("b", now=0.0) == 0.0  # buckets are per key
+    assert limiter.check("a", now=0.5) == 0.0  # one token back after 1/rate seconds
+    assert limiter.stats()["rejected_total"] == 1
+
+    limiter.check("c", now=0.5)
+    assert limiter.stats()["tracked_keys"] == 2  # least recently used key forgotten
+
+    assert RateLimiter(rate=0, burst=1).check("a") == 0.0  # disabled
+
+
+@pytest.mark.asyncio
+async def test_subprocess_slots_cap_concurrency_and_time_out():
+    from vibedev_mcp.ratelimit import AdmissionController, RateLimited
+
+    limits = AdmissionController(subprocess_concurrency=1, subprocess_wait=0.05)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limits.subprocess_slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    assert limits.stats()["subprocess"]["running"] == 1
+    with pytest.raises(RateLimited) as exc_info:
+        async with limits.subprocess_slot():
+            pass
+    assert exc_info.value.scope == "subprocess"
+    release.set()
+    await holder
+    async with limits.subprocess_slot():
+        assert limits.subprocess_running == 1
+    assert limits.stats()["subprocess"] == {
+        "concurrency": 1,
+        "wait_s": 0.05,
+        "running": 0,
+        "waiting": 0,
+        "rejected_total": 1,
+    }
+
+
+def test_http_expensive_routes_return_429_with_retry_after(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    monkeypatch.setenv("VIBEDEV_RATE_JOB", "0.1")
+    monkeypatch.setenv("VIBEDEV_RATE_JOB_BURST", "2")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with TestClient(create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))) as client:
+            job_a = client.post("/api/jobs", json={"title": "A", "goal": "G"}).json()["job_id"]
+            job_b = client.post("/api/jobs", json={"title": "B", "goal": "G"}).json()["job_id"]
+
+            assert client.get(f"/api/jobs/{job_a}/export").status_code == 200
+            # Charged before the handler runs, even when it then fails (no repo_root here).
+            assert client.get(f"/api/jobs/{job_a}/git/log").status_code == 400
+            limited = client.get(f"/api/jobs/{job_a}/export")
+            assert limited.status_code == 429
+            assert limited.json()["scope"] == "job"
+            assert int(limited.headers["Retry-After"]) >= 1
+
+            # Other jobs and cheap routes are unaffected.
+            assert client.get(f"/api/jobs/{job_b}/export").status_code == 200
+            assert client.get(f"/api/jobs/{job_a}").status_code == 200
+
+            stats = client.get("/api/limits/stats").json()
+            assert stats["job"]["rejected_total"] == 1
+            assert stats["client"]["allowed_total"] == 4
+            assert 'vibedev_rate_limited_total{scope="job"}' in client.get("/metrics").text
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_ws_calls_share_the_http_admission_control(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    monkeypatch.setenv("VIBEDEV_RATE_JOB", "0.1")
+    monkeypatch.setenv("VIBEDEV_RATE_JOB_BURST", "1")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        with TestClient(app) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            with client.websocket_connect("/api/ws") as ws:
+                # Not READY, so the call fails, but it is charged first.
+                ws.send_json({"id": 1, "op": "call", "method": "job_start", "params": {"job_id": job_id}})
+                assert ws.receive_json()["error"]["error"] == "bad_request"
+                ws.send_json({"id": 2, "op": "call", "method": "job_start", "params": {"job_id": job_id}})
+                error = ws.receive_json()["error"]
+                assert error["error"] == "rate_limited" and error["retry_after"] > 0
+                # Cheap reads are not charged.
+                ws.send_json({"id": 3, "op": "call", "method": "get_job", "params": {"job_id": job_id}})
+                assert ws.receive_json()["ok"] is True
+
+            # The same bucket now refuses the HTTP route for this job.
+            assert client.get(f"/api/jobs/{job_id}/export").status_code == 429
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def test_stale_candidates_match_whole_tokens(write_file):
+    from vibedev_mcp.repo import find_stale_candidates
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for name in ["folder.py", "bold.css", "old_config.py", "main.py.bak", "fooCopy.ts", "notes.txt~"]:
+            write_file(tmp_dir, name, "x")
+        flagged = {item["path"] for item in find_stale_candidates(tmp_dir)}
+        assert flagged == {"old_config.py", "main.py.bak", "fooCopy.ts", "notes.txt~"}
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_scan_file_health_hashes_only_on_collision(write_file, monkeypatch):
+    from vibedev_mcp import repo
+    from vibedev_mcp.repo import scan_file_health
+
+    heads_read: list[str] = []
+    read_head = repo._read_head
+    monkeypatch.setattr(repo, "_read_head", lambda path, size: heads_read.append(path.name) or read_head(path, size))
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        big = "a" * 40_000
+        write_file(tmp_dir, "one.txt", big)
+        write_file(tmp_dir, "nested/two.txt", big)
+        write_file(tmp_dir, "same_size.txt", big[:-1] + "b")
+        write_file(tmp_dir, "unique.txt", "only me")
+        with open(os.path.join(tmp_dir, "blob.bin"), "wb") as f:
+            f.write(b"\x00\x01" * 10)
+
+        result = scan_file_health(tmp_dir, large_file_bytes=30_000)
+        assert result["complete"] is True
+        assert result["duplicates"] == [["nested/two.txt", "one.txt"]]
+        assert {item["path"] for item in result["large_files"]} == {"one.txt", "nested/two.txt", "same_size.txt"}
+        assert result["binary_files"] == ["blob.bin"]
+        records = result["records"]
+        # Unique sizes never get hashed; a same-size file with a different tail
+        # shares the partial hash but not the full one.
+        assert records["unique.txt"]["partial_hash"] is None
+        assert records["same_size.txt"]["partial_hash"] == records["one.txt"]["partial_hash"]
+        assert records["same_size.txt"]["content_hash"] != records["one.txt"]["content_hash"]
+        # Only size collisions are opened at all; the rest is stat-only.
+        assert sorted(heads_read) == ["one.txt", "same_size.txt", "two.txt"]
+        assert result["stale"] == []
+
+        # Unchanged files reuse their cached records.
+        heads_read.clear()
+        write_file(tmp_dir, "one.txt.bak", "x")
+        cached = scan_file_health(tmp_dir, cache=records, large_file_bytes=30_000)
+        assert cached["duplicates"] == result["duplicates"]
+        assert heads_read == []
+        assert cached["stale"] == [{"path": "one.txt.bak", "reason": "Backup extension."}]
+
+        # The budget bounds the walk too, not just the hashing.
+        exhausted = scan_file_health(tmp_dir, time_budget_s=0)
+        assert exhausted["complete"] is False and exhausted["records"] == {}
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_repo_hygiene_reports_duplicates_and_caches_hashes(write_file):
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "src/util.py", "def helper():\n    return 1\n")
+        write_file(repo, "scripts/util.py", "def helper():\n    return 1\n")
+        write_file(repo, "folder.py", "")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+        result = await store.repo_hygiene_suggest(job_id=job_id)
+
+        dupes = [s for s in result["suggestions"] if s["type"] == "duplicate_file"]
+        assert dupes == [
+            {
+                "type": "duplicate_file",
+                "path": "src/util.py",
+                "suggestion": "Identical content to `scripts/util.py`; consider removing or deduplicating",
+            }
+        ]
+        assert not any(s["path"] == "folder.py" for s in result["suggestions"] if s["type"] == "stale_file")
+        assert result["scan"]["complete"] is True
+
+        async with store._conn.execute(
+            "SELECT COUNT(*) AS n FROM repo_file_hashes WHERE job_id = ? AND content_hash IS NOT NULL;",
+            (job_id,),
+        ) as cursor:
+            assert (await cursor.fetchone())["n"] == 2
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
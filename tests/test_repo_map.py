@@ -26,3 +26,194 @@ async def test_repo_map_update_and_export():
         await store.close()
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_rank_repo_files_prefers_import_centrality():
+    from vibedev_mcp.repo import rank_repo_files
+
+    deps = {
+        "pkg/a.py": ["pkg.core"],
+        "pkg/b.py": ["pkg.core", "pkg.util"],
+        "web/app.ts": ["./lib", "react"],
+    }
+    files = ["pkg/core.py", "pkg/util.py", "pkg/a.py", "pkg/b.py", "web/app.ts", "web/lib.ts"]
+    ranked = rank_repo_files(files, deps)
+
+    by_path = {item["path"]: item for item in ranked}
+    assert ranked[0]["path"] == "pkg/core.py"
+    assert by_path["pkg/core.py"]["importers"] == 2
+    assert by_path["web/lib.ts"]["importers"] == 1
+
+    # Recent churn lifts util above the other single-importer file.
+    order = [item["path"] for item in rank_repo_files(files, deps, {"pkg/util.py": 5})]
+    assert order.index("pkg/util.py") < order.index("web/lib.ts")
+
+
+@pytest.mark.asyncio
+async def test_repo_map_render_respects_budget_and_caches(write_file):
+    from vibedev_mcp.repo import estimate_tokens
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "pkg/__init__.py", "")
+        write_file(repo, "pkg/core.py", "def run(x: int) -> int:\n    return x\n\nclass Engine:\n    pass\n")
+        for i in range(30):
+            write_file(repo, f"pkg/mod{i}.py", f"from pkg.core import run\n\ndef handler_{i}():\n    return run({i})\n")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+        snap = await store.repo_snapshot(job_id=job_id, repo_root=repo)
+
+        small = await store.repo_map_render(job_id=job_id, token_budget=120)
+        assert small["snapshot_id"] == snap["snapshot_id"]
+        assert small["cached"] is False
+        assert estimate_tokens(small["content"]) <= 120
+        first_entry = small["content"].splitlines()[2]
+        assert "pkg/core.py" in first_entry
+        assert "def run(x: int) -> int" in small["content"]
+
+        large = await store.repo_map_render(job_id=job_id, token_budget=4000)
+        assert large["files_included"] > small["files_included"]
+
+        again = await store.repo_map_render(job_id=job_id, token_budget=120)
+        assert again["cached"] is True
+        assert again["content"] == small["content"]
+
+        # Description edits invalidate the cached render.
+        await store.repo_file_descriptions_update(job_id=job_id, updates={"pkg/core.py": "engine core"})
+        fresh = await store.repo_map_render(job_id=job_id, token_budget=120)
+        assert fresh["cached"] is False
+        assert "engine core" in fresh["content"]
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_repo_map_render_requires_snapshot():
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+        with pytest.raises(ValueError):
+            await store.repo_map_render(job_id=job_id, token_budget=500)
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_repo_map_render_ignores_described_non_files(write_file):
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "src/app.py", "def main():\n    pass\n")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+        await store.repo_snapshot(job_id=job_id, repo_root=repo)
+        await store.repo_file_descriptions_update(
+            job_id=job_id,
+            updates={"src": "sources", "gone.py": "deleted file", "src/app.py": "entry"},
+        )
+
+        rendered = await store.repo_map_render(job_id=job_id, token_budget=500)
+        assert rendered["files_ranked"] == 1
+        assert "- `src/app.py` — entry" in rendered["content"]
+        assert "`src`" not in rendered["content"]
+        assert "gone.py" not in rendered["content"]
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_repo_map_bulk_update_validates_against_snapshot(write_file):
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "src/app.py", "")
+        write_file(repo, "README.md", "")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+        snap = await store.repo_snapshot(job_id=job_id, repo_root=repo)
+
+        await store.repo_file_descriptions_update(job_id=job_id, updates={"README.md": "docs"})
+        result = await store.repo_file_descriptions_update(
+            job_id=job_id,
+            validate_paths=True,
+            updates={
+                "./src/app.py": "entry point",
+                "src/": "sources",
+                "README.md": "docs",
+                "ghost.py": "does not exist",
+                "": "empty path",
+            },
+        )
+        assert result["validated_against"] == snap["snapshot_id"]
+        statuses = {item["path"]: item["status"] for item in result["results"]}
+        assert statuses == {
+            "src/app.py": "inserted",
+            "src": "inserted",
+            "README.md": "unchanged",
+            "ghost.py": "unknown_path",
+            "": "invalid",
+        }
+        # `updated` keeps counting every accepted path, including ones already up to date.
+        assert result["updated"] == 3
+        assert result["counts"] == {"inserted": 2, "unchanged": 1, "unknown_path": 1, "invalid": 1}
+
+        # Validation is opt-in; the default keeps the historical always-write behavior.
+        forced = await store.repo_file_descriptions_update(job_id=job_id, updates={"ghost.py": "planned"})
+        assert forced["validated_against"] is None
+        assert forced["results"] == [{"path": "ghost.py", "status": "inserted"}]
+
+        # Empty descriptions are still stored (they clear an entry's text).
+        cleared = await store.repo_file_descriptions_update(job_id=job_id, updates={"README.md": ""})
+        assert cleared["results"] == [{"path": "README.md", "status": "updated"}]
+        entries = (await store.repo_map_export(job_id=job_id, format="json"))["entries"]
+        assert {e["path"]: e["description"] for e in entries}["README.md"] == ""
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_repo_map_ndjson_stream_endpoint():
+    import json
+
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        with TestClient(app) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            lines = [json.dumps({"path": f"f{i}.py", "description": f"file {i}"}) for i in range(1200)]
+            lines.insert(5, "{not json")
+            resp = client.patch(
+                f"/api/jobs/{job_id}/repo/map/stream",
+                content="\n".join(lines).encode("utf-8"),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            assert resp.status_code == 200
+            out = [json.loads(line) for line in resp.text.splitlines()]
+            assert out[-1] == {"summary": {"inserted": 1200, "invalid": 1}}
+            assert sum(1 for item in out if item.get("status") == "inserted") == 1200
+
+            exported = client.get(f"/api/jobs/{job_id}/repo/map").json()
+            assert len(exported["entries"]) == 1200
+
+            assert client.patch("/api/jobs/JOB-NOPE/repo/map/stream", content=b"").status_code == 404
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def test_diff_manifests_linear_merge():
+    from vibedev_mcp.repo import diff_dependency_edges, diff_manifests
+
+    old = [["a.py", 10, 1], ["b.py", 5, 1], ["d.py", 1, 1]]
+    new = [["a.py", 10, 1], ["b.py", 6, 2], ["c.py", 3, 1]]
+    assert diff_manifests(old, new) == {"added": ["c.py"], "removed": ["d.py"], "modified": ["b.py"]}
+    # Path-only (legacy) entries never report modifications.
+    assert diff_manifests([["a.py"]], [["a.py"], ["b.py"]])["modified"] == []
+
+    edges = diff_dependency_edges({"a.py": ["os", "b"]}, {"a.py": ["b", "c"], "c.py": ["os"]})
+    assert edges == {
+        "gained": [{"from": "a.py", "to": "c"}, {"from": "c.py", "to": "os"}],
+        "lost": [{"from": "a.py", "to": "os"}],
+    }
+
+
+def test_scan_manifest_cap_keeps_path_ordered_prefix(write_file):
+    from vibedev_mcp.repo import diff_manifests, scan_manifest
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for rel in ("a.txt", "a/b.py", "a0.py", "b/c/d.py", "b/c.py", "z.py"):
+            write_file(tmp_dir, rel, "")
+        full = scan_manifest(tmp_dir)
+        paths = [entry[0] for entry in full]
+        assert paths == sorted(paths) == ["a.txt", "a/b.py", "a0.py", "b/c.py", "b/c/d.py", "z.py"]
+        assert [entry[0] for entry in scan_manifest(tmp_dir, max_entries=3)] == paths[:3]
+
+        # A file added before the cap pushes another one out; comparing only up
+        # to the shorter prefix keeps that from showing up as a removal.
+        write_file(tmp_dir, "a/a.py", "")
+        capped = scan_manifest(tmp_dir, max_entries=3)
+        old = full[:3]
+        upto = min(old[-1][0], capped[-1][0])
+        assert diff_manifests(old, capped, upto=upto) == {"added": ["a/a.py"], "removed": [], "modified": []}
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_repo_snapshot_diff_between_checkpoints(write_file):
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "keep.py", "import os\n")
+        write_file(repo, "edit.py", "x = 1\n")
+        write_file(repo, "drop.py", "")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+        first = await store.repo_snapshot(job_id=job_id, repo_root=repo)
+
+        with pytest.raises(ValueError):
+            await store.repo_snapshot_diff(job_id=job_id)
+
+        write_file(repo, "edit.py", "import json\nx = 12345\n")
+        write_file(repo, "pkg/new.py", "")
+        os.remove(os.path.join(repo, "drop.py"))
+        second = await store.repo_snapshot(job_id=job_id, repo_root=repo)
+
+        diff = await store.repo_snapshot_diff(job_id=job_id)
+        assert diff["from_snapshot_id"] == first["snapshot_id"]
+        assert diff["to_snapshot_id"] == second["snapshot_id"]
+        assert diff["modified_tracked"] is True
+        assert diff["files"] == {"added": ["pkg/new.py"], "removed": ["drop.py"], "modified": ["edit.py"]}
+        assert diff["dependencies"] == {"gained": [{"from": "edit.py", "to": "json"}], "lost": []}
+
+        md = await store.repo_snapshot_diff(
+            job_id=job_id,
+            from_snapshot_id=first["snapshot_id"],
+            to_snapshot_id=second["snapshot_id"],
+            format="md",
+        )
+        assert "1 added, 1 removed, 1 modified" in md["content"]
+        assert "- `pkg/new.py`" in md["content"]
+
+        with pytest.raises(KeyError):
+            await store.repo_snapshot_diff(job_id=job_id, from_snapshot_id="SNP-NOPE")
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+def test_extract_python_symbols():
+    from vibedev_mcp.repo import extract_symbols
+
+    text = (
+        "LIMIT = 10\n"
+        "\n"
+        "async def fetch(url: str, *, timeout: float = 1.0) -> bytes:\n"
+        "    pass\n"
+        "\n"
+        "class Client(Base):\n"
+        "    def get(self, key):\n"
+        "        def inner():\n"
+        "            pass\n"
+    )
+    symbols = {(s["kind"], s["name"]): s for s in extract_symbols("m.py", text)}
+    assert symbols[("variable", "LIMIT")]["line"] == 1
+    assert symbols[("function", "fetch")]["signature"] == (
+        "async def fetch(url: str, *, timeout: float=1.0) -> bytes"
+    )
+    assert symbols[("class", "Client")]["signature"] == "class Client(Base)"
+    assert symbols[("method", "get")]["parent"] == "Client"
+    assert ("function", "inner") not in symbols
+
+
+def test_extract_js_symbols():
+    from vibedev_mcp.repo import extract_symbols
+
+    text = (
+        "import { x } from './x';\n"
+        "export interface Props { id: string }\n"
+        "export type Mode = 'a' | 'b';\n"
+        "export const useThing = (id: string) => {\n"
+        "  const local = 1;\n"
+        "  return local;\n"
+        "};\n"
+        "/* class Fake {} \n"
+        "   still a comment */\n"
+        "export default class Store {\n"
+        "  constructor(private url: string) {}\n"
+        "  async load(id: string): Promise<void> {\n"
+        "    if (id) { console.log('{'); }\n"
+        "  }\n"
+        "}\n"
+        "function helper() {}\n"
+        "export { helper as publicHelper };\n"
+    )
+    symbols = {(s["kind"], s["name"]) for s in extract_symbols("a.ts", text)}
+    assert ("interface", "Props") in symbols
+    assert ("type", "Mode") in symbols
+    assert ("function", "useThing") in symbols
+    assert ("class", "Store") in symbols
+    assert ("method", "load") in symbols
+    assert ("method", "constructor") in symbols
+    assert ("function", "helper") in symbols
+    assert ("export", "publicHelper") in symbols
+    assert ("variable", "local") not in symbols
+    assert ("class", "Fake") not in symbols
+    assert ("method", "if") not in symbols
+
+
+@pytest.mark.asyncio
+async def test_symbol_index_incremental_refresh_and_search(write_file):
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "pkg/store.py", "class VibeStore:\n    def get_job(self):\n        pass\n")
+        write_file(repo, "pkg/util.py", "def get_jobs_page():\n    pass\n")
+        write_file(repo, "web/api.ts", "export function getJob(id: string) {}\n")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+
+        snap = await store.repo_snapshot(job_id=job_id, repo_root=repo)
+        assert snap["symbol_index"]["files_reindexed"] == 3
+
+        prefix = await store.repo_symbol_search(job_id=job_id, query="get_job")
+        names = [item["name"] for item in prefix["items"]]
+        assert names[0] == "get_job"
+        assert "get_jobs_page" in names
+        assert "getJob" not in names
+        # Prefix search is case-insensitive.
+        assert (await store.repo_symbol_search(job_id=job_id, query="getj"))["items"][0]["path"] == "web/api.ts"
+
+        fuzzy = await store.repo_symbol_search(job_id=job_id, query="vstr", fuzzy=True)
+        assert [item["name"] for item in fuzzy["items"]] == ["VibeStore"]
+
+        methods = await store.repo_symbol_search(job_id=job_id, query="get", kind="method")
+        assert [(i["name"], i["parent"]) for i in methods["items"]] == [("get_job", "VibeStore")]
+
+        # Unchanged files are skipped; edited and deleted files are re-synced.
+        unchanged = await store.repo_symbols_refresh(job_id=job_id, repo_root=repo)
+        assert unchanged["files_reindexed"] == 0
+
+        write_file(repo, "pkg/util.py", "def renamed_helper(x, y):\n    return x\n")
+        os.remove(os.path.join(repo, "web", "api.ts"))
+        refreshed = await store.repo_symbols_refresh(job_id=job_id, repo_root=repo)
+        assert refreshed["files_reindexed"] == 1
+        assert refreshed["files_removed"] == 1
+        assert (await store.repo_symbol_search(job_id=job_id, query="getJob"))["count"] == 0
+        hit = (await store.repo_symbol_search(job_id=job_id, query="renamed"))["items"][0]
+        assert hit["signature"] == "def renamed_helper(x, y)"
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_symbol_refresh_retries_unreadable_files(write_file, monkeypatch):
+    from pathlib import Path
+
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        repo = os.path.join(tmp_dir, "repo")
+        write_file(repo, "a.py", "def alpha():\n    pass\n")
+
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=repo, policies={})
+
+        real_read_text = Path.read_text
+
+        def flaky_read_text(self, *args, **kwargs):
+            if self.name == "a.py":
+                raise OSError("locked")
+            return real_read_text(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "read_text", flaky_read_text)
+        first = await store.repo_symbols_refresh(job_id=job_id, repo_root=repo)
+        assert first["files_reindexed"] == 0
+
+        monkeypatch.setattr(Path, "read_text", real_read_text)
+        second = await store.repo_symbols_refresh(job_id=job_id, repo_root=repo)
+        assert second["files_reindexed"] == 1
+        assert (await store.repo_symbol_search(job_id=job_id, query="alpha"))["count"] == 1
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_symbol_search_ranks_before_limit():
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+        # Many scattered matches inserted ahead of the exact one.
+        rows = [(job_id, "noise.py", f"g{i}_e_t", "function", i, f"def g{i}_e_t()", None) for i in range(2000)]
+        rows.append((job_id, "core.py", "get", "function", 1, "def get()", None))
+        await store._conn.executemany(
+            "INSERT INTO repo_symbols (job_id, path, name, kind, line, signature, parent) VALUES (?, ?, ?, ?, ?, ?, ?);",
+            rows,
+        )
+        await store._conn.commit()
+
+        result = await store.repo_symbol_search(job_id=job_id, query="get", fuzzy=True, limit=5)
+        assert result["items"][0]["name"] == "get"
+        assert result["count"] == 5
+        await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_call_per_key():
+    from vibedev_mcp.singleflight import SingleFlight
+
+    flights = SingleFlight()
+    calls: list[str] = []
+    release = asyncio.Event()
+
+    async def compute(name: str) -> dict[str, str]:
+        calls.append(name)
+        await release.wait()
+        return {"name": name}
+
+    waiters = [asyncio.create_task(flights.do(("r", "J1", 1), lambda: compute("a"))) for _ in range(5)]
+    other = asyncio.create_task(flights.do(("r", "J1", 2), lambda: compute("b")))
+    await asyncio.sleep(0)
+    assert len(flights) == 2
+
+    # A cancelled caller does not cancel the shared computation.
+    waiters[0].cancel()
+    release.set()
+    results = await asyncio.gather(*waiters[1:])
+    assert calls == ["a", "b"]
+    assert all(r is results[0] for r in results)
+    assert (await other) == {"name": "b"}
+    assert len(flights) == 0
+
+    # Finished keys are not cached.
+    assert (await flights.do(("r", "J1", 1), lambda: compute("c"))) == {"name": "c"}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_to_every_caller():
+    from vibedev_mcp.singleflight import SingleFlight
+
+    flights = SingleFlight()
+
+    async def boom() -> None:
+        await asyncio.sleep(0.01)
+        raise KeyError("Unknown job_id: J")
+
+    results = await asyncio.gather(*(flights.do(("r", "J"), boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, KeyError) for r in results)
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ui_state_and_status_requests_are_coalesced():
+    import httpx
+
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                job_id = (await client.post("/api/jobs", json={"title": "T", "goal": "G"})).json()["job_id"]
+
+                store = app.state.store
+                real_get_ui_state = store.get_ui_state
+                calls = 0
+
+                async def slow_get_ui_state(jid: str, **kwargs) -> dict:
+                    nonlocal calls
+                    calls += 1
+                    await asyncio.sleep(0.05)
+                    return await real_get_ui_state(jid, **kwargs)
+
+                store.get_ui_state = slow_get_ui_state
+                responses = await asyncio.gather(*(client.get(f"/api/jobs/{job_id}/ui-state") for _ in range(6)))
+                assert calls == 1
+                assert len({r.content for r in responses}) == 1
+                assert len({r.headers["etag"] for r in responses}) == 1
+
+                # A write bumps the revision, so later reads compute afresh.
+                await client.patch(f"/api/jobs/{job_id}/policies", json={"update": {"lint": True}})
+                fresh = await client.get(f"/api/jobs/{job_id}/ui-state")
+                assert calls == 2
+                assert fresh.headers["etag"] != responses[0].headers["etag"]
+
+                statuses = await asyncio.gather(*(client.get(f"/api/jobs/{job_id}/status") for _ in range(4)))
+                assert {r.status_code for r in statuses} == {200}
+                assert statuses[0].json()["job_id"] == job_id
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -11,8 +11,10 @@ Tests cover:
 Uses manual temp directory management to avoid Windows file locking issues.
 """
 
+import asyncio
 import os
 import shutil
+import sqlite3
 import tempfile
 import pytest
 
@@ -640,3 +642,278 @@ async def test_job_export_bundle_markdown():
         await store.close()
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_busy_retry_connection_waits_out_a_held_write_lock():
+    import aiosqlite
+
+    from vibedev_mcp.store import _BusyRetryConnection
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp_dir, "busy.sqlite3")
+        holder = await aiosqlite.connect(db_path)
+        await holder.execute("PRAGMA journal_mode = WAL;")
+        await holder.execute("CREATE TABLE t (x INTEGER);")
+        await holder.commit()
+
+        raw = await aiosqlite.connect(db_path)
+        # No SQLite-level waiting, so every conflict surfaces as BUSY to the proxy.
+        await raw.execute("PRAGMA busy_timeout = 0;")
+        conn = _BusyRetryConnection(raw, retries=8)
+
+        await holder.execute("BEGIN IMMEDIATE;")
+        await holder.execute("INSERT INTO t VALUES (1);")
+
+        async def release() -> None:
+            await asyncio.sleep(0.15)
+            await holder.commit()
+
+        releaser = asyncio.create_task(release())
+        await conn.execute("INSERT INTO t VALUES (2);")
+        await conn.commit()
+        await releaser
+        assert conn.busy_retries > 0
+
+        async with conn.execute("SELECT COUNT(1) FROM t;") as cursor:
+            assert (await cursor.fetchone())[0] == 2
+
+        exhausted = _BusyRetryConnection(raw, retries=0)
+        await holder.execute("BEGIN IMMEDIATE;")
+        with pytest.raises(sqlite3.OperationalError):
+            await exhausted.execute("INSERT INTO t VALUES (3);")
+        await holder.rollback()
+
+        await conn.close()
+        await holder.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_store_opens_share_one_database():
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp_dir, "vibedev.sqlite3")
+        # Like several server workers starting at once on a fresh file.
+        stores = await asyncio.gather(*(VibeDevStore.open(db_path) for _ in range(4)))
+        try:
+            job_ids = await asyncio.gather(
+                *(s.create_job(title=f"T{i}", goal="G", repo_root=None, policies={}) for i, s in enumerate(stores))
+            )
+            listed = await stores[0].job_list(status=None, limit=10, offset=0)
+            assert {j["job_id"] for j in listed["items"]} == set(job_ids)
+        finally:
+            for s in stores:
+                await s.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_listing_cursor_pagination_projection_and_streaming():
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        try:
+            job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+            for i in range(23):
+                await store.devlog_append(job_id=job_id, content=f"entry {i}")
+            # Same timestamp for several rows: the id breaks the tie, nothing is skipped or repeated.
+            await store._conn.execute(
+                "UPDATE logs SET created_at = '2030-01-01T00:00:00+00:00' WHERE content IN (?, ?, ?)",
+                ("entry 3", "entry 4", "entry 5"),
+            )
+            await store._conn.commit()
+
+            seen: list[str] = []
+            cursor = None
+            while True:
+                page = await store.devlog_page(job_id=job_id, limit=5, cursor=cursor, fields=["content"])
+                assert all(set(entry) == {"content"} for entry in page["entries"])
+                seen.extend(entry["content"] for entry in page["entries"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            assert len(seen) == 23 and len(set(seen)) == 23
+            assert set(seen[:3]) == {"entry 3", "entry 4", "entry 5"}
+
+            streamed = [log["content"] async for log in store.iter_devlog(job_id=job_id, chronological=True)]
+            assert sorted(streamed) == sorted(seen)
+            assert set(streamed[-3:]) == {"entry 3", "entry 4", "entry 5"}
+
+            lines = [line async for line in store.devlog_export_stream(job_id=job_id)]
+            assert lines[0].startswith("# Dev Log: T") and len(lines) == 24
+
+            with pytest.raises(ValueError):
+                await store.devlog_page(job_id=job_id, cursor="not-a-cursor")
+            with pytest.raises(ValueError):
+                await store.attempts_page(job_id=job_id, fields=["evidence", "nope"])
+            with pytest.raises(KeyError):
+                await anext(store.iter_mistakes(job_id="JOB-NOPE"))
+        finally:
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_job_bundle_round_trip_into_another_database():
+    import io
+
+    from vibedev_mcp import bundle
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        source = await VibeDevStore.open(os.path.join(tmp_dir, "source.sqlite3"))
+        target = await VibeDevStore.open(os.path.join(tmp_dir, "target.sqlite3"))
+        try:
+            job_id = await source.create_job(title="T", goal="G", repo_root=None, policies={})
+            await source.plan_set_deliverables(job_id, ["D"])
+            await source.plan_set_invariants(job_id, [])
+            await source.plan_set_definition_of_done(job_id, ["All steps done"])
+            await source.plan_propose_steps(
+                job_id,
+                [
+                    {
+                        "title": "Step 1",
+                        "instruction_prompt": "First step",
+                        "acceptance_criteria": ["Done"],
+                        "required_evidence": ["changed_files"],
+                        "remediation_prompt": "Fix",
+                        "context_refs": [],
+                    }
+                ],
+            )
+            await source.job_set_ready(job_id)
+            await source.job_start(job_id)
+            await source.job_submit_step_result(
+                job_id=job_id,
+                step_id="S1",
+                model_claim="MET",
+                summary="done",
+                evidence={"changed_files": ["a.py"]},
+                devlog_line="step 1",
+                commit_hash=None,
+            )
+            for i in range(5):
+                await source.devlog_append(job_id=job_id, content=f"entry {i}")
+
+            records = [r async for r in source.job_export_records(job_id=job_id)]
+            assert records[0]["type"] == "header" and records[-1]["type"] == "end"
+            counts = records[-1]["counts"]
+            assert counts["jobs"] == 1 and counts["steps"] == 1 and counts["attempts"] == 1
+
+            chunks = [c async for c in bundle.archive_chunks(bundle.aiter_records(iter(records)))]
+            from_archive = list(bundle.records_from_archive(io.BytesIO(b"".join(chunks))))
+            assert from_archive == records
+
+            result = await target.job_import_records(bundle.aiter_records(iter(from_archive)))
+            assert result == {"ok": True, "job_id": job_id, "counts": counts}
+            assert (await target.get_job(job_id))["title"] == "T"
+            assert [a["summary"] for a in await target.get_attempts(job_id)] == ["done"]
+            assert "**Attempt 1**" in await target.job_export_markdown(job_id)
+
+            # Importing twice, or a bundle cut short, changes nothing.
+            with pytest.raises(ValueError, match="already exists"):
+                await target.job_import_records(bundle.aiter_records(iter(records)))
+            await target.job_archive(job_id=job_id)
+            truncated = [r for r in records if r["type"] != "end"]
+            other = await VibeDevStore.open(os.path.join(tmp_dir, "other.sqlite3"))
+            try:
+                with pytest.raises(ValueError, match="Truncated"):
+                    await other.job_import_records(bundle.aiter_records(iter(truncated)))
+                with pytest.raises(KeyError):
+                    await other.get_job(job_id)
+            finally:
+                await other.close()
+        finally:
+            await source.close()
+            await target.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_job_export_records_reads_one_snapshot():
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = await VibeDevStore.open(os.path.join(tmp_dir, "vibedev.sqlite3"))
+        try:
+            job_id = await store.create_job(title="T", goal="G", repo_root=None, policies={})
+            await store.devlog_append(job_id=job_id, content="before")
+
+            records = store.job_export_records(job_id=job_id)
+            assert (await anext(records))["type"] == "header"
+            # Writes that land mid-export are not in the bundle.
+            await store.devlog_append(job_id=job_id, content="during")
+            rest = [r async for r in records]
+            assert rest[-1]["counts"]["logs"] == 1
+            assert [r["row"]["content"] for r in rest if r.get("table") == "logs"] == ["before"]
+
+            with pytest.raises(KeyError):
+                await anext(store.job_export_records(job_id="missing"))
+        finally:
+            await store.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_job_import_rejects_malformed_rows_and_keeps_defaults():
+    from vibedev_mcp import bundle
+    from vibedev_mcp.store import VibeDevStore
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        source = await VibeDevStore.open(os.path.join(tmp_dir, "source.sqlite3"))
+        target = await VibeDevStore.open(os.path.join(tmp_dir, "target.sqlite3"))
+        try:
+            job_id = await source.create_job(title="T", goal="G", repo_root=None, policies={})
+            await source.plan_propose_steps(
+                job_id,
+                [
+                    {"title": f"Step {i}", "instruction_prompt": "x", "acceptance_criteria": ["Done"]}
+                    for i in (1, 2)
+                ],
+            )
+            records = [r async for r in source.job_export_records(job_id=job_id)]
+
+            async def rejects(mutated: list[dict], match: str) -> None:
+                with pytest.raises(ValueError, match=match):
+                    await target.job_import_records(bundle.aiter_records(iter(mutated)))
+                with pytest.raises(KeyError):
+                    await target.get_job(job_id)
+
+            await rejects(
+                [{**r, "row": {"bogus": 1}} if r.get("table") == "jobs" else r for r in records],
+                "no known columns",
+            )
+            foreign = {
+                "type": "row",
+                "table": "gate_results",
+                "row": {"result_id": "G1", "attempt_id": "A-elsewhere", "gate_type": "tests_passed", "passed": 1},
+            }
+            await rejects([*records[:-1], foreign, records[-1]], "outside the bundle")
+
+            # A row that omits a column gets the schema default, not NULL.
+            steps = [r for r in records if r.get("table") == "steps"]
+            steps[1]["row"].pop("human_approved")
+            await target.job_import_records(bundle.aiter_records(iter(records)))
+            async with target._conn.execute(
+                "SELECT human_approved FROM steps WHERE job_id = ? ORDER BY order_index;", (job_id,)
+            ) as cursor:
+                assert [row[0] for row in await cursor.fetchall()] == [0, 0]
+        finally:
+            await source.close()
+            await target.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
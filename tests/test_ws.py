@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+
+
+def _recv_until(ws, predicate, limit=20):
+    for _ in range(limit):
+        frame = ws.receive_json()
+        if predicate(frame):
+            return frame
+    raise AssertionError("expected frame not received")
+
+
+def test_ws_rpc_and_event_subscription():
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        with TestClient(app) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+
+            with client.websocket_connect("/api/ws") as ws:
+                ws.send_json({"id": 1, "op": "ping"})
+                assert ws.receive_json() == {"id": 1, "ok": True, "result": "pong"}
+
+                ws.send_json({"id": 2, "op": "subscribe", "job_id": job_id, "types": ["devlog_appended"]})
+                sub = ws.receive_json()["result"]["sub"]
+
+                ws.send_json({
+                    "id": 3,
+                    "op": "call",
+                    "method": "devlog_append",
+                    "params": {"job_id": job_id, "content": "over ws"},
+                })
+                reply = _recv_until(ws, lambda f: f.get("id") == 3 and "ok" in f)
+                assert reply["ok"] is True
+                event = _recv_until(ws, lambda f: f.get("type") == "event")
+                assert event["sub"] == sub
+                assert event["event"]["type"] == "devlog_appended"
+                assert event["event"]["data"]["log_id"] == reply["result"]
+                assert isinstance(event["id"], int)
+
+                ws.send_json({"id": 4, "op": "call", "method": "get_job", "params": {"job_id": "JOB-NOPE"}})
+                assert _recv_until(ws, lambda f: f.get("id") == 4)["error"]["error"] == "not_found"
+                ws.send_json({"id": 5, "op": "call", "method": "close", "params": {}})
+                assert _recv_until(ws, lambda f: f.get("id") == 5)["error"]["error"] == "bad_request"
+                ws.send_json({"id": 6, "op": "call", "method": "get_job", "params": {"nope": 1}})
+                assert _recv_until(ws, lambda f: f.get("id") == 6)["error"]["error"] == "bad_request"
+
+                # Replay from a known id on (re)subscribe.
+                ws.send_json({"id": 7, "op": "subscribe", "job_id": job_id, "last_event_id": 0})
+                replay_sub = _recv_until(ws, lambda f: f.get("id") == 7)["result"]["sub"]
+                replayed = _recv_until(ws, lambda f: f.get("sub") == replay_sub)
+                assert replayed["event"]["type"] == "job_created"
+
+                ws.send_json({"id": 8, "op": "unsubscribe", "sub": sub})
+                assert _recv_until(ws, lambda f: f.get("id") == 8)["ok"] is True
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_ws_errors_always_get_a_reply(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from vibedev_mcp.http_server import create_app
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        app = create_app(db_path=os.path.join(tmp_dir, "vibedev.sqlite3"))
+        with TestClient(app) as client:
+            job_id = client.post("/api/jobs", json={"title": "T", "goal": "G"}).json()["job_id"]
+            store = app.state.store
+
+            async def broken_list(**kwargs):
+                raise RuntimeError("database is locked")
+
+            async def type_error_inside(*, job_id):
+                raise TypeError("bug in the store, not the caller")
+
+            monkeypatch.setattr(store, "job_list", broken_list)
+            monkeypatch.setattr(store, "get_steps", type_error_inside)
+
+            with client.websocket_connect("/api/ws") as ws:
+                ws.send_json({"id": 1, "op": "call", "method": "job_list", "params": {}})
+                error = _recv_until(ws, lambda f: f.get("id") == 1)["error"]
+                assert error == {"error": "internal_error", "detail": "RuntimeError: database is locked"}
+
+                ws.send_json({"id": 2, "op": "call", "method": "get_steps", "params": {"job_id": job_id}})
+                assert _recv_until(ws, lambda f: f.get("id") == 2)["error"]["error"] == "internal_error"
+
+                # Binary frames are refused without ending the session.
+                ws.send_bytes(b"\x00\x01")
+                assert ws.receive_json()["error"]["error"] == "bad_request"
+                ws.send_json({"id": 3, "op": "ping"})
+                assert ws.receive_json() == {"id": 3, "ok": True, "result": "pong"}
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,172 @@
+"""Job bundle encoding: NDJSON records and compressed tar archives.
+
+A bundle is a sequence of records produced by `VibeDevStore.job_export_records`
+and consumed by `VibeDevStore.job_import_records`:
+
+    {"type": "header", "format": "vibedev-job-bundle", "version": 1, "job_id": ...}
+    {"type": "row", "table": "jobs", "row": {...}}          # raw table rows, parents first
+    ...
+    {"type": "end", "counts": {"jobs": 1, "steps": 12, ...}}
+
+On the wire it is either NDJSON (one record per line) or a tar archive of
+NDJSON parts of at most `ARCHIVE_PART_ROWS` records each, compressed with gzip,
+or with zstd when `zstandard` is installed (`pip install vibedev-mcp[zstd]`).
+Parts are built one at a time, so memory is bounded by the part size rather
+than the job size.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+import time
+from typing import IO, Any, AsyncIterator, Iterator
+
+from vibedev_mcp import fastjson
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    zstandard = None  # type: ignore[assignment]
+
+BUNDLE_FORMAT = "vibedev-job-bundle"
+BUNDLE_VERSION = 1
+ARCHIVE_PART_ROWS = 1000
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# format -> (media type, file extension)
+EXPORT_MEDIA_TYPES = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "tar.gz": ("application/gzip", "tar.gz"),
+    "tar.zst": ("application/zstd", "tar.zst"),
+}
+
+
+def archive_formats() -> tuple[str, ...]:
+    return ("tar.gz", "tar.zst") if zstandard is not None else ("tar.gz",)
+
+
+class _Sink:
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def ndjson_chunks(records: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for record in records:
+        yield fastjson.dumps(record) + b"\n"
+
+
+async def archive_chunks(records: AsyncIterator[dict[str, Any]], format: str = "tar.gz") -> AsyncIterator[bytes]:
+    """Stream `records` as a tar archive of NDJSON parts (`bundle/00000.ndjson`, ...)."""
+    if format not in archive_formats():
+        raise ValueError(f"Unsupported archive format: {format!r} (available: {', '.join(archive_formats())})")
+    sink = _Sink()
+    compressor = None
+    if format == "tar.zst":
+        compressor = zstandard.ZstdCompressor().stream_writer(sink, closefd=False)
+        tar = tarfile.open(fileobj=compressor, mode="w|")
+    else:
+        tar = tarfile.open(fileobj=sink, mode="w|gz")
+
+    part: list[bytes] = []
+    parts = 0
+
+    def add_part() -> None:
+        nonlocal parts
+        data = b"".join(part)
+        info = tarfile.TarInfo(f"bundle/{parts:05d}.ndjson")
+        info.size = len(data)
+        info.mtime = int(time.time())
+        tar.addfile(info, io.BytesIO(data))
+        part.clear()
+        parts += 1
+
+    async for record in records:
+        part.append(fastjson.dumps(record) + b"\n")
+        if len(part) >= ARCHIVE_PART_ROWS:
+            add_part()
+            if chunk := sink.drain():
+                yield chunk
+    if part or not parts:
+        add_part()
+    tar.close()
+    if compressor is not None:
+        compressor.close()
+    yield sink.drain()
+
+
+async def records_from_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, Any]]:
+    """Parse NDJSON records from a byte stream, one line at a time."""
+    buffer = b""
+    line_no = 0
+
+    def parse(raw: bytes) -> dict[str, Any] | None:
+        if not raw.strip():
+            return None
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"Invalid bundle line {line_no}: {e}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Invalid bundle line {line_no}: expected an object")
+        return record
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            if (record := parse(raw)) is not None:
+                yield record
+    line_no += 1
+    if (record := parse(buffer)) is not None:
+        yield record
+
+
+def records_from_archive(fileobj: IO[bytes]) -> Iterator[dict[str, Any]]:
+    """Records from a bundle archive (gzip- or zstd-compressed tar), part by part."""
+    head = fileobj.read(4)
+    fileobj.seek(0)
+    if head == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise ValueError("zstd-compressed bundle, but the zstandard package is not installed")
+        fileobj = zstandard.ZstdDecompressor().stream_reader(fileobj)  # type: ignore[assignment]
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            for member in tar:
+                if not member.isfile() or not member.name.endswith(".ndjson"):
+                    continue
+                data = tar.extractfile(member)
+                if data is None:
+                    continue
+                for line_no, raw in enumerate(data.read().splitlines(), start=1):
+                    if not raw.strip():
+                        continue
+                    try:
+                        record = json.loads(raw)
+                    except ValueError as e:
+                        raise ValueError(f"Invalid record in {member.name} line {line_no}: {e}") from None
+                    yield record
+    except tarfile.TarError as e:
+        raise ValueError(f"Invalid bundle archive: {e}") from None
+
+
+async def aiter_records(records: Iterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    for record in records:
+        yield record
@@ -8,97 +8,528 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Iterable
+
+from vibedev_mcp import metrics
 
 
 @dataclass
 class SSEEvent:
-    """Represents an SSE event."""
+    """Represents an SSE event.
+
+    Events are treated as immutable once published: the wire format is encoded
+    once and the same bytes are shared by every subscriber.
+    """
     event_type: str
     data: dict[str, Any]
     job_id: str | None = None
     timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    
+    # Durable event-log id; emitted as the SSE `id:` line for Last-Event-ID replay.
+    event_id: int | None = None
+    # Encoded forms keyed by (kind, projection); see to_json_bytes / to_sse_bytes.
+    _cache: dict[tuple[str, tuple[str, ...] | None], bytes] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def to_json_bytes(self, fields: tuple[str, ...] | None = None) -> bytes:
+        """The `{type, data, timestamp[, job_id]}` payload, encoded once per projection.
+
+        With `fields`, `data` is projected to those keys.
+        """
+        key = ("json", fields)
+        encoded = self._cache.get(key)
+        if encoded is None:
+            data = self.data if fields is None else {k: self.data[k] for k in fields if k in self.data}
+            payload = {
+                "type": self.event_type,
+                "data": data,
+                "timestamp": self.timestamp,
+            }
+            if self.job_id:
+                payload["job_id"] = self.job_id
+            encoded = json.dumps(payload).encode("utf-8")
+            self._cache[key] = encoded
+        return encoded
+
+    def to_sse_bytes(self, fields: tuple[str, ...] | None = None) -> bytes:
+        """Format as an SSE message, serializing on first use only."""
+        key = ("sse", fields)
+        frame = self._cache.get(key)
+        if frame is None:
+            frame = b"data: " + self.to_json_bytes(fields) + b"\n\n"
+            if self.event_id is not None:
+                frame = b"id: %d\n" % self.event_id + frame
+            self._cache[key] = frame
+        return frame
+
     def to_sse_string(self) -> str:
         """Format as SSE message string."""
-        payload = {
-            "type": self.event_type,
-            "data": self.data,
-            "timestamp": self.timestamp,
+        return self.to_sse_bytes().decode("utf-8")
+
+
+# Overflow policies for a full subscriber queue.
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+DEFAULT_MAX_QUEUE_SIZE = 256
+# Connection limits (0 = unlimited) and idle reaping; see SSEEventManager.
+DEFAULT_MAX_SUBSCRIBERS = 1000
+DEFAULT_MAX_SUBSCRIBERS_PER_JOB = 100
+# Streams touch their subscription at least every 30s keepalive, so this is ~4 missed beats.
+DEFAULT_IDLE_TIMEOUT_S = 120.0
+
+
+def collapse_superseded(events: list[SSEEvent]) -> list[SSEEvent]:
+    """Drop `job_updated` events followed by a later one for the same job."""
+    latest: dict[str | None, int] = {}
+    for i, event in enumerate(events):
+        if event.event_type == EVENT_JOB_UPDATED:
+            latest[event.job_id] = i
+    return [
+        event
+        for i, event in enumerate(events)
+        if event.event_type != EVENT_JOB_UPDATED or latest[event.job_id] == i
+    ]
+
+
+def encode_batch(events: list[SSEEvent], fields: tuple[str, ...] | None = None) -> bytes:
+    """
+    One SSE frame carrying several events: `{"type": "batch", "events": [...]}`.
+
+    Superseded `job_updated` events are collapsed first. Per-event payloads reuse
+    their cached encodings; the `id:` line is the highest event id in the batch.
+    """
+    events = collapse_superseded(events)
+    body = b", ".join(event.to_json_bytes(fields) for event in events)
+    frame = b'data: {"type": "%s", "events": [%s]}\n\n' % (EVENT_BATCH.encode(), body)
+    ids = [event.event_id for event in events if event.event_id is not None]
+    if ids:
+        frame = b"id: %d\n" % max(ids) + frame
+    return frame
+
+
+class EventFilter:
+    """
+    Per-subscriber filter, compiled once at subscribe time.
+
+    - `types`: only these event types.
+    - `steps`: only events about these steps; events without a `step_id`
+      (job-level events) always pass.
+    - `fields`: project `data` to these keys when the event is sent.
+    """
+
+    __slots__ = ("types", "steps", "fields", "matches")
+
+    def __init__(
+        self,
+        *,
+        types: Iterable[str] | None = None,
+        steps: Iterable[str] | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> None:
+        self.types = frozenset(types) if types else None
+        self.steps = frozenset(steps) if steps else None
+        self.fields = tuple(dict.fromkeys(fields)) if fields else None
+        unknown = sorted((self.types or set()) - EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown event types: {', '.join(unknown)}")
+
+        type_set, step_set = self.types, self.steps
+        if type_set is None and step_set is None:
+            self.matches: Callable[[SSEEvent], bool] = lambda event: True
+        elif step_set is None:
+            self.matches = lambda event: event.event_type in type_set
+        else:
+            def matches(event: SSEEvent) -> bool:
+                if type_set is not None and event.event_type not in type_set:
+                    return False
+                step_id = event.data.get("step_id")
+                return step_id is None or step_id in step_set
+
+            self.matches = matches
+
+    @classmethod
+    def from_params(
+        cls,
+        *,
+        types: str | None = None,
+        steps: str | None = None,
+        fields: str | None = None,
+    ) -> "EventFilter | None":
+        """Build from comma-separated query values; None when nothing is filtered."""
+        def split(value: str | None) -> list[str]:
+            return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+        if not (split(types) or split(steps) or split(fields)):
+            return None
+        return cls(types=split(types), steps=split(steps), fields=split(fields))
+
+
+class SubscriptionClosed(Exception):
+    """Raised by `Subscription.get` once the subscription has been closed."""
+
+
+class SubscriberLimitExceeded(Exception):
+    """Raised by `SSEEventManager.subscribe` when a connection cap is reached."""
+
+
+class Subscription:
+    """
+    Bounded per-subscriber event queue.
+
+    Exposes the subset of the `asyncio.Queue` API consumers use (`get`,
+    `get_nowait`, `empty`, `qsize`). When full, `policy` decides what happens:
+
+    - ``drop_oldest``: discard the oldest queued event.
+    - ``coalesce``: replace the oldest queued event of the same type (falling
+      back to drop-oldest when there is none), so a stalled consumer ends up
+      with the latest event of each type.
+    - ``disconnect``: close the subscription; `get` raises `SubscriptionClosed`
+      and the stream ends so the client reconnects and resynchronizes.
+    """
+
+    def __init__(
+        self,
+        job_id: str | None = None,
+        *,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        policy: str = OVERFLOW_DROP_OLDEST,
+        event_filter: EventFilter | None = None,
+        label: str | None = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.job_id = job_id
+        self.max_size = max_size
+        self.policy = policy
+        self.event_filter = event_filter
+        # Projection to use when encoding events for this subscriber.
+        self.fields = event_filter.fields if event_filter else None
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.filtered = 0
+        self.max_lag = 0
+        # Which stream owns this subscription ("sse", "events-poll", "ws"), for stats.
+        self.label = label
+        self.bytes_sent = 0
+        self.created_at = time.monotonic()
+        # Last time the consumer pulled an event or wrote to its client.
+        self.last_active = self.created_at
+        self._items: deque[SSEEvent] = deque()
+        self._ready = asyncio.Event()
+
+    @property
+    def lag(self) -> int:
+        """Events published but not yet consumed."""
+        return len(self._items)
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def touch(self) -> None:
+        """Mark the consumer as alive (it is still draining or writing)."""
+        self.last_active = time.monotonic()
+
+    def sent(self, nbytes: int) -> None:
+        """Record bytes written to the client; counts as activity."""
+        self.bytes_sent += nbytes
+        self.last_active = time.monotonic()
+
+    def idle_for(self, now: float | None = None) -> float:
+        """Seconds since the consumer last pulled an event or wrote to its client."""
+        return (time.monotonic() if now is None else now) - self.last_active
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def offer(self, event: SSEEvent) -> bool:
+        """Enqueue without blocking; returns False if the subscriber was disconnected.
+
+        Events rejected by the subscriber's filter are never enqueued.
+        """
+        if self.closed:
+            return False
+        if self.event_filter is not None and not self.event_filter.matches(event):
+            self.filtered += 1
+            return True
+        if len(self._items) >= self.max_size:
+            if self.policy == OVERFLOW_DISCONNECT:
+                self.dropped += 1
+                self.close()
+                return False
+            if self.policy == OVERFLOW_COALESCE:
+                for i, queued in enumerate(self._items):
+                    if queued.event_type == event.event_type and queued.job_id == event.job_id:
+                        del self._items[i]
+                        self.coalesced += 1
+                        break
+                else:
+                    self._items.popleft()
+                    self.dropped += 1
+            else:
+                self._items.popleft()
+                self.dropped += 1
+        self._items.append(event)
+        self.max_lag = max(self.max_lag, len(self._items))
+        self._ready.set()
+        return True
+
+    def get_nowait(self) -> SSEEvent:
+        if not self._items:
+            if self.closed:
+                raise SubscriptionClosed()
+            raise asyncio.QueueEmpty()
+        self.delivered += 1
+        self.last_active = time.monotonic()
+        return self._items.popleft()
+
+    async def get(self) -> SSEEvent:
+        while not self._items:
+            if self.closed:
+                raise SubscriptionClosed()
+            self._ready.clear()
+            await self._ready.wait()
+        return self.get_nowait()
+
+    def close(self) -> None:
+        """Close the subscription, discarding anything still queued."""
+        if self.closed:
+            return
+        self.closed = True
+        self.dropped += len(self._items)
+        self._items.clear()
+        self._ready.set()
+
+    def stats(self, now: float | None = None) -> dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        idle = self.idle_for(now)
+        return {
+            "job_id": self.job_id,
+            "label": self.label,
+            "policy": self.policy,
+            "max_size": self.max_size,
+            "lag": self.lag,
+            # How long queued events have been waiting on the consumer.
+            "lag_s": round(idle, 3) if self._items else 0.0,
+            "max_lag": self.max_lag,
+            "bytes_sent": self.bytes_sent,
+            "age_s": round(now - self.created_at, 3),
+            "idle_s": round(idle, 3),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "filtered": self.filtered,
+            "closed": self.closed,
         }
-        if self.job_id:
-            payload["job_id"] = self.job_id
-        return f"data: {json.dumps(payload)}\n\n"
 
 
 class SSEEventManager:
-    """Manages SSE connections and event broadcasting."""
-    
-    def __init__(self):
-        # Map of job_id -> set of asyncio.Queue instances
-        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+    """Manages SSE connections and event broadcasting.
+
+    Subscriber sets are copy-on-write frozensets: subscribe/unsubscribe swap in
+    a new set, so `publish` iterates a stable snapshot without taking a lock.
+    All mutation happens synchronously on the event loop, between awaits.
+
+    `max_subscribers` / `max_per_job` cap concurrent subscriptions (0 or None
+    means unlimited). `reap_idle` closes subscriptions whose consumer has not
+    pulled an event or written to its client for `idle_timeout` seconds, which
+    catches streams stuck writing to a dead connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        max_subscribers: int | None = None,
+        max_per_job: int | None = None,
+        idle_timeout: float | None = None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.max_subscribers = max_subscribers or None
+        self.max_per_job = max_per_job or None
+        self.idle_timeout = idle_timeout or None
+        # Map of job_id -> frozenset of Subscription instances
+        self._subscribers: dict[str, frozenset[Subscription]] = {}
         # Global subscribers (receive all events)
-        self._global_subscribers: set[asyncio.Queue] = set()
-        self._lock = asyncio.Lock()
-    
-    async def subscribe(self, job_id: str | None = None) -> asyncio.Queue:
+        self._global_subscribers: frozenset[Subscription] = frozenset()
+        # Counters carried over from subscriptions that have gone away.
+        self._retired_dropped = 0
+        self._retired_coalesced = 0
+        self._retired_bytes = 0
+        self._disconnected = 0
+        self._rejected = 0
+        self._reaped = 0
+
+    def subscriber_count(self) -> int:
+        return len(self._global_subscribers) + sum(len(subs) for subs in self._subscribers.values())
+
+    def check_capacity(self, job_id: str | None = None) -> None:
+        """Raise `SubscriberLimitExceeded` if a new subscription would exceed a cap."""
+        if self.max_subscribers is not None and self.subscriber_count() >= self.max_subscribers:
+            self._rejected += 1
+            raise SubscriberLimitExceeded(f"Subscriber limit reached ({self.max_subscribers})")
+        if (
+            job_id
+            and self.max_per_job is not None
+            and len(self._subscribers.get(job_id, ())) >= self.max_per_job
+        ):
+            self._rejected += 1
+            raise SubscriberLimitExceeded(
+                f"Subscriber limit for job {job_id} reached ({self.max_per_job})"
+            )
+
+    async def subscribe(
+        self,
+        job_id: str | None = None,
+        *,
+        max_queue_size: int | None = None,
+        overflow_policy: str | None = None,
+        event_filter: EventFilter | None = None,
+        label: str | None = None,
+    ) -> Subscription:
         """
         Subscribe to events for a specific job or all events.
-        
+
         Args:
             job_id: If provided, only receive events for this job.
                     If None, receive all events.
-        
+            max_queue_size: Per-subscriber bound (defaults to the manager's).
+            overflow_policy: Per-subscriber overflow policy (defaults to the manager's).
+            event_filter: Types/steps to deliver and `data` fields to send.
+            label: Stream kind shown in `stats()`.
+
         Returns:
-            An asyncio.Queue that will receive SSEEvent objects.
+            A bounded `Subscription` that will receive SSEEvent objects.
+
+        Raises:
+            SubscriberLimitExceeded: A global or per-job cap is reached.
         """
-        queue: asyncio.Queue = asyncio.Queue()
-        
-        async with self._lock:
-            if job_id:
-                if job_id not in self._subscribers:
-                    self._subscribers[job_id] = set()
-                self._subscribers[job_id].add(queue)
-            else:
-                self._global_subscribers.add(queue)
-        
+        self.check_capacity(job_id)
+        queue = Subscription(
+            job_id,
+            max_size=max_queue_size or self.max_queue_size,
+            policy=overflow_policy or self.overflow_policy,
+            event_filter=event_filter,
+            label=label,
+        )
+        if job_id:
+            self._subscribers[job_id] = self._subscribers.get(job_id, frozenset()) | {queue}
+        else:
+            self._global_subscribers = self._global_subscribers | {queue}
         return queue
-    
-    async def unsubscribe(self, queue: asyncio.Queue, job_id: str | None = None) -> None:
-        """Remove a subscription."""
-        async with self._lock:
-            if job_id and job_id in self._subscribers:
-                self._subscribers[job_id].discard(queue)
-                if not self._subscribers[job_id]:
-                    del self._subscribers[job_id]
+
+    def _remove(self, queues: set[Subscription], job_id: str | None) -> None:
+        if job_id:
+            current = self._subscribers.get(job_id, frozenset())
+            gone = current & queues
+            remaining = current - gone
+            if remaining:
+                self._subscribers[job_id] = remaining
             else:
-                self._global_subscribers.discard(queue)
-    
+                self._subscribers.pop(job_id, None)
+        else:
+            gone = self._global_subscribers & queues
+            self._global_subscribers = self._global_subscribers - gone
+        for queue in gone:
+            self._retired_dropped += queue.dropped
+            self._retired_coalesced += queue.coalesced
+            self._retired_bytes += queue.bytes_sent
+
+    async def unsubscribe(self, queue: Subscription, job_id: str | None = None) -> None:
+        """Remove a subscription."""
+        self._remove({queue}, job_id if job_id in self._subscribers else None)
+        queue.close()
+
     async def publish(self, event: SSEEvent) -> None:
         """
         Publish an event to all relevant subscribers.
-        
+
         The event will be sent to:
         - All global subscribers
         - All job-specific subscribers if event.job_id is set
+
+        The event is serialized once here and the bytes are shared by every
+        subscriber. Never blocks: full queues apply their overflow policy, and
+        subscribers using the disconnect policy are removed.
         """
-        async with self._lock:
-            # Global subscribers
-            for queue in self._global_subscribers:
-                try:
-                    queue.put_nowait(event)
-                except asyncio.QueueFull:
-                    pass  # Drop event if queue is full
-            
-            # Job-specific subscribers
-            if event.job_id and event.job_id in self._subscribers:
-                for queue in self._subscribers[event.job_id]:
-                    try:
-                        queue.put_nowait(event)
-                    except asyncio.QueueFull:
-                        pass
+        metrics.EVENTS_PUBLISHED.labels(event.event_type).inc()
+        global_subscribers = self._global_subscribers
+        job_subscribers = self._subscribers.get(event.job_id, frozenset()) if event.job_id else frozenset()
+        if not global_subscribers and not job_subscribers:
+            return
+
+        event.to_sse_bytes()
+        for subscribers, job_id in ((global_subscribers, None), (job_subscribers, event.job_id)):
+            slow = {queue for queue in subscribers if not queue.offer(event)}
+            if slow:
+                self._remove(slow, job_id)
+                self._disconnected += len(slow)
+
+    def reap_idle(self, now: float | None = None) -> int:
+        """Close and remove subscriptions idle longer than `idle_timeout`; returns the count."""
+        if self.idle_timeout is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        reaped = 0
+        groups = [(self._global_subscribers, None), *((subs, job_id) for job_id, subs in self._subscribers.items())]
+        for subscribers, job_id in groups:
+            idle = {queue for queue in subscribers if queue.idle_for(now) > self.idle_timeout}
+            if idle:
+                self._remove(idle, job_id)
+                for queue in idle:
+                    queue.close()
+                reaped += len(idle)
+        self._reaped += reaped
+        return reaped
+
+    async def run_reaper(self, interval: float | None = None) -> None:
+        """Call `reap_idle` periodically until cancelled (no-op without an idle timeout)."""
+        if self.idle_timeout is None:
+            return
+        interval = interval or max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self.reap_idle()
+
+    def stats(self) -> dict[str, Any]:
+        """Aggregate lag/drop/byte counters, limits, and per-subscriber detail."""
+        subscriptions = [q for subs in self._subscribers.values() for q in subs]
+        subscriptions.extend(self._global_subscribers)
+        now = time.monotonic()
+        return {
+            "subscribers": len(subscriptions),
+            "global_subscribers": len(self._global_subscribers),
+            "jobs": len(self._subscribers),
+            "queue_depth_total": sum(q.lag for q in subscriptions),
+            "bytes_sent_total": self._retired_bytes + sum(q.bytes_sent for q in subscriptions),
+            "dropped_total": self._retired_dropped + sum(q.dropped for q in subscriptions),
+            "coalesced_total": self._retired_coalesced + sum(q.coalesced for q in subscriptions),
+            "disconnected_total": self._disconnected,
+            "rejected_total": self._rejected,
+            "reaped_total": self._reaped,
+            "max_lag": max((q.lag for q in subscriptions), default=0),
+            "limits": {
+                "max_subscribers": self.max_subscribers,
+                "max_per_job": self.max_per_job,
+                "idle_timeout_s": self.idle_timeout,
+            },
+            "subscriptions": [q.stats(now) for q in subscriptions],
+        }
 
 
 # Event type constants
@@ -114,6 +545,26 @@ EVENT_DEVLOG_APPENDED = "devlog_appended"
 EVENT_CONTEXT_ADDED = "context_added"
 EVENT_CONTEXT_UPDATED = "context_updated"
 EVENT_CONTEXT_DELETED = "context_deleted"
+# Sent on reconnect when missed events were pruned: refetch full state.
+EVENT_RESYNC = "resync"
+# Frame type used by batching subscribers; wraps several events.
+EVENT_BATCH = "batch"
+
+EVENT_TYPES = frozenset({
+    EVENT_JOB_CREATED,
+    EVENT_JOB_UPDATED,
+    EVENT_JOB_STATUS_CHANGED,
+    EVENT_STEP_STARTED,
+    EVENT_STEP_COMPLETED,
+    EVENT_STEP_FAILED,
+    EVENT_ATTEMPT_SUBMITTED,
+    EVENT_MISTAKE_RECORDED,
+    EVENT_DEVLOG_APPENDED,
+    EVENT_CONTEXT_ADDED,
+    EVENT_CONTEXT_UPDATED,
+    EVENT_CONTEXT_DELETED,
+    EVENT_RESYNC,
+})
 
 
 def create_job_event(event_type: str, job_id: str, **data) -> SSEEvent:
@@ -142,5 +593,13 @@ def get_event_manager() -> SSEEventManager:
     """Get the global event manager instance."""
     global _event_manager
     if _event_manager is None:
-        _event_manager = SSEEventManager()
+        _event_manager = SSEEventManager(
+            max_queue_size=int(os.environ.get("VIBEDEV_SSE_QUEUE_SIZE", str(DEFAULT_MAX_QUEUE_SIZE))),
+            overflow_policy=os.environ.get("VIBEDEV_SSE_OVERFLOW_POLICY", OVERFLOW_DROP_OLDEST),
+            max_subscribers=int(os.environ.get("VIBEDEV_SSE_MAX_SUBSCRIBERS", str(DEFAULT_MAX_SUBSCRIBERS))),
+            max_per_job=int(
+                os.environ.get("VIBEDEV_SSE_MAX_PER_JOB", str(DEFAULT_MAX_SUBSCRIBERS_PER_JOB))
+            ),
+            idle_timeout=float(os.environ.get("VIBEDEV_SSE_IDLE_TIMEOUT", str(DEFAULT_IDLE_TIMEOUT_S))),
+        )
     return _event_manager
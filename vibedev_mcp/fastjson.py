@@ -0,0 +1,52 @@
+"""JSON encoding for hot HTTP responses.
+
+Uses orjson when it is installed (`pip install vibedev-mcp[fast]`) and falls
+back to the stdlib encoder otherwise. Set `VIBEDEV_JSON_BACKEND=stdlib` to
+force the fallback.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    orjson = None  # type: ignore[assignment]
+
+BACKEND = "orjson" if orjson is not None and os.environ.get("VIBEDEV_JSON_BACKEND") != "stdlib" else "stdlib"
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    # Same settings as Starlette's JSONResponse, plus `default=str` for stray
+    # datetimes/paths (orjson handles those natively).
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=str,
+    ).encode("utf-8")
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+dumps: Callable[[Any], bytes] = _orjson_dumps if BACKEND == "orjson" else _stdlib_dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps`.
+
+    Returning one directly from a route skips FastAPI's `jsonable_encoder` and
+    response-model pass; content must already be JSON-shaped (Store output is).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
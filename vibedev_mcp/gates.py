@@ -9,10 +9,13 @@ from __future__ import annotations
 import asyncio
 import fnmatch
 import os
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from vibedev_mcp import metrics
+
 
 @dataclass
 class GateResult:
@@ -94,6 +97,7 @@ async def execute_shell_gate(
 
     try:
         # Run the command
+        metrics.SUBPROCESS_SPAWNS.labels("shell_gate").inc()
         proc = await asyncio.create_subprocess_shell(
             args,
             stdout=asyncio.subprocess.PIPE,
@@ -412,6 +416,7 @@ async def evaluate_gates(
     all_passed = True
 
     for gate in gates:
+        started = time.perf_counter()
         result = await evaluate_gate(
             gate,
             evidence=evidence,
@@ -419,6 +424,9 @@ async def evaluate_gates(
             policies=policies,
             changed_files=changed_files,
         )
+        metrics.GATE_SECONDS.labels(
+            metrics.gate_type_label(result.gate_type), "true" if result.passed else "false"
+        ).observe(time.perf_counter() - started)
         results.append(result)
         if not result.passed:
             all_passed = False
@@ -2,38 +2,52 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
+import importlib
 import json
+import logging
 import os
+import tempfile
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, AsyncIterator
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
 
-from vibedev_mcp.conductor import compute_next_questions
+from vibedev_mcp import bundle, fastjson, metrics
+from vibedev_mcp.conductor import compute_next_questions, get_phase_summary
+from vibedev_mcp.fastjson import FastJSONResponse
 from vibedev_mcp.models import ModelClaim
+from vibedev_mcp.ratelimit import AdmissionController, RateLimited, retry_after_header
+from vibedev_mcp.singleflight import SingleFlight
 from vibedev_mcp.store import VibeDevStore
+from vibedev_mcp.ws import WebSocketSession
 from vibedev_mcp.events import (
     get_event_manager,
-    create_job_event,
-    create_step_event,
+    encode_batch,
+    EventFilter,
+    OVERFLOW_COALESCE,
     SSEEvent,
+    SubscriberLimitExceeded,
+    SubscriptionClosed,
+    EVENT_ATTEMPT_SUBMITTED,
+    EVENT_DEVLOG_APPENDED,
     EVENT_JOB_CREATED,
+    EVENT_JOB_STATUS_CHANGED,
     EVENT_JOB_UPDATED,
-    EVENT_STEP_STARTED,
-    EVENT_STEP_COMPLETED,
-    EVENT_ATTEMPT_SUBMITTED,
     EVENT_MISTAKE_RECORDED,
-    EVENT_DEVLOG_APPENDED,
-    EVENT_CONTEXT_ADDED,
-    EVENT_CONTEXT_UPDATED,
-    EVENT_CONTEXT_DELETED,
+    EVENT_RESYNC,
+    EVENT_STEP_COMPLETED,
+    EVENT_STEP_FAILED,
+    EVENT_STEP_STARTED,
 )
 # from vibedev_mcp.templates import get_template, list_templates # Moved to store
 
+logger = logging.getLogger(__name__)
 
 
 def _default_db_path() -> Path:
@@ -145,6 +159,7 @@ class RepoSnapshotInput(BaseModel):
 class RepoMapUpdateInput(BaseModel):
     model_config = ConfigDict(extra="forbid")
     updates: dict[str, str] = Field(default_factory=dict)
+    validate_paths: bool = False
 
 
 class CreateTemplateInput(BaseModel):
@@ -169,6 +184,533 @@ class UpdatePoliciesInput(BaseModel):
     merge: bool = True
 
 
+class BatchOperation(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    method: str = Field(default="GET", pattern="^(GET|POST|PUT|PATCH|DELETE)$")
+    path: str = Field(min_length=1, description="API path, optionally with a query string")
+    body: Any = None
+    headers: dict[str, str] = Field(default_factory=dict)
+
+
+class BatchInput(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    operations: list[BatchOperation] = Field(min_length=1, max_length=50)
+    # Run every operation in one SQLite transaction: all or nothing.
+    transaction: bool = False
+    # Skip the remaining operations after the first 4xx/5xx (always on in a transaction).
+    stop_on_error: bool = True
+
+
+# Rows fetched per page when replaying the event log after Last-Event-ID.
+_REPLAY_PAGE = 500
+
+# Scope key through which a batch hands its transactional store to the routes.
+_STORE_SCOPE_KEY = "vibedev.store"
+# Streaming or connection-level endpoints that cannot run as a batch operation.
+# (`/api/jobs/import` opens its own transaction, which a batch already holds.)
+_BATCH_EXCLUDED_SUFFIXES = ("/events", "/events-poll", "/api/ws", "/api/batch", "/api/jobs/import")
+# Archive uploads to POST /api/jobs/import stay in memory up to this size, then spill to disk.
+_IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+class _BatchRollback(Exception):
+    """Aborts a transactional batch after a failed operation."""
+
+
+async def _subrequest(
+    app: Any,
+    parent_scope: dict[str, Any],
+    operation: BatchOperation,
+    store: VibeDevStore | None,
+) -> dict[str, Any]:
+    """Run one batch operation through the app in-process and collect its response."""
+    path, _, query = operation.path.partition("?")
+    if not path.startswith("/api/") or path.rstrip("/").endswith(_BATCH_EXCLUDED_SUFFIXES):
+        return {"status": 400, "body": {"error": "bad_request", "detail": f"Path not allowed in a batch: {path}"}}
+
+    body = b"" if operation.body is None else json.dumps(operation.body).encode("utf-8")
+    headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in operation.headers.items()]
+    headers.append((b"content-length", str(len(body)).encode()))
+    if body:
+        headers.append((b"content-type", b"application/json"))
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": parent_scope.get("asgi", {"version": "3.0"}),
+        "http_version": parent_scope.get("http_version", "1.1"),
+        "method": operation.method,
+        "scheme": parent_scope.get("scheme", "http"),
+        "server": parent_scope.get("server"),
+        "client": parent_scope.get("client"),
+        "root_path": parent_scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "headers": headers,
+        "state": dict(parent_scope.get("state") or {}),
+    }
+    if store is not None:
+        scope[_STORE_SCOPE_KEY] = store
+
+    sent_body = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal sent_body
+        if sent_body:
+            return {"type": "http.disconnect"}
+        sent_body = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = 500
+    response_headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((k.decode("latin-1"), v.decode("latin-1")) for k, v in message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        # ServerErrorMiddleware has already produced the 500 and re-raises.
+        return {"status": 500, "body": {"error": "internal_error", "detail": str(e)}}
+
+    raw = b"".join(chunks)
+    result: dict[str, Any] = {"status": status}
+    if "etag" in response_headers:
+        result["etag"] = response_headers["etag"]
+    if not raw:
+        result["body"] = None
+    elif response_headers.get("content-type", "").startswith("application/json"):
+        result["body"] = json.loads(raw)
+    else:
+        result["body"] = raw.decode("utf-8", errors="replace")
+    return result
+
+# How /mcp is set up (VIBEDEV_MCP_MOUNT): "lazy" imports the MCP server on the
+# first /mcp request, "eager" at startup, "off" never (UI-only deployments).
+MCP_MOUNT_MODES = ("lazy", "eager", "off")
+
+
+class _LazyMCPApp:
+    """
+    ASGI app mounted at /mcp that builds the Streamable HTTP MCP app on demand.
+
+    Importing `vibedev_mcp.server` and starting its session manager is the
+    slowest part of startup, and UI-only deployments never need it. The
+    session manager runs in its own task so it can outlive the request that
+    started it; `aclose` (from the lifespan) stops it. The import runs in a
+    worker thread so the first /mcp request does not stall the event loop. A
+    failed start is logged once and remembered in `error`; /mcp then answers
+    503 with that reason rather than retrying on every request.
+    """
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.app: Any = None
+        self.error: str | None = None
+        self._lock = asyncio.Lock()
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> bool:
+        """Build and start the MCP app once; returns whether it is available."""
+        if self.app is not None or self.error is not None or self.mode == "off":
+            return self.app is not None
+        async with self._lock:
+            if self.app is not None or self.error is not None:
+                return self.app is not None
+            try:
+                mcp_server = await asyncio.to_thread(importlib.import_module, "vibedev_mcp.server")
+
+                # When mounted at /mcp, make the MCP server listen at "/" internally.
+                mcp_server.mcp.settings.streamable_http_path = "/"
+                # MCP sessions live in one process; with several workers any of them may get the next request.
+                if int(os.environ.get("VIBEDEV_HTTP_WORKERS", "1")) > 1:
+                    mcp_server.mcp.settings.stateless_http = True
+                mcp_app = mcp_server.mcp.streamable_http_app()
+                ready = asyncio.Event()
+
+                async def run_manager() -> None:
+                    async with mcp_server.mcp.session_manager.run():
+                        ready.set()
+                        await self._stop.wait()
+
+                self._task = asyncio.create_task(run_manager())
+                ready_wait = asyncio.create_task(ready.wait())
+                await asyncio.wait({self._task, ready_wait}, return_when=asyncio.FIRST_COMPLETED)
+                ready_wait.cancel()
+                if not ready.is_set():
+                    self._task.result()  # re-raise the startup error
+                self.app = mcp_app
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                logger.exception("Failed to start the MCP app mounted at /mcp")
+        return self.app is not None
+
+    async def aclose(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await self._task
+        except Exception:
+            pass
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "http" and await self.start():
+            await self.app(scope, receive, send)
+            return
+        if scope["type"] == "http":
+            if self.error is not None:
+                response = JSONResponse(
+                    status_code=503,
+                    content={"error": "service_unavailable", "detail": f"MCP failed to start: {self.error}"},
+                )
+            else:
+                response = JSONResponse(
+                    status_code=404, content={"error": "not_found", "detail": "MCP is not enabled"}
+                )
+            await response(scope, receive, send)
+
+
+# Responses smaller than this go out uncompressed (VIBEDEV_GZIP_MIN_SIZE; 0 disables gzip).
+GZIP_MIN_SIZE = 1024
+# zlib level 5 keeps most of level 9's ratio on JSON at a fraction of the CPU.
+GZIP_LEVEL = 5
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+async def _job_status(store: VibeDevStore, job_id: str) -> dict[str, Any]:
+    """Concise job status (VS Code status bar)."""
+    job = await store.get_job(job_id)
+
+    current_step_title = None
+    if job["status"] == "EXECUTING" and job.get("step_order"):
+        idx = int(job.get("current_step_index") or 0)
+        step_order: list[str] = job["step_order"]
+        if 0 <= idx < len(step_order):
+            step_id = step_order[idx]
+            step = await store._get_step(job_id, step_id)
+            current_step_title = step.get("title")
+
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "title": job.get("title", "Untitled"),
+        "current_step_index": job.get("current_step_index", 0),
+        "total_steps": len(job.get("step_order", [])),
+        "current_step_title": current_step_title,
+    }
+
+
+def _split_fields(fields: str | None) -> list[str] | None:
+    """`?fields=a,b` -> ["a", "b"]; None/empty means the listing's default fields."""
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()] or None
+
+
+async def _primed_stream(
+    chunks: AsyncIterator[Any], media_type: str, headers: dict[str, str] | None = None
+) -> StreamingResponse:
+    """
+    Stream `chunks` (dicts become NDJSON lines, strings and bytes are sent as-is).
+
+    The first chunk is pulled before the response starts, so an unknown job,
+    bad cursor or bad field list still maps to a 404/400 instead of a
+    truncated 200.
+    """
+
+    def encode(chunk: Any) -> bytes:
+        if isinstance(chunk, dict):
+            return fastjson.dumps(chunk) + b"\n"
+        if isinstance(chunk, bytes):
+            return chunk
+        return chunk.encode("utf-8")
+
+    first = await anext(chunks, None)
+
+    async def gen() -> AsyncIterator[bytes]:
+        if first is None:
+            return
+        try:
+            yield encode(first)
+            async for chunk in chunks:
+                yield encode(chunk)
+        finally:
+            await chunks.aclose()  # release the DB cursor if the client went away
+
+    return StreamingResponse(gen(), media_type=media_type, headers=headers)
+
+
+async def _ui_state_etag(
+    store: VibeDevStore, job_id: str, limits: AdmissionController
+) -> tuple[str, dict[str, Any] | None]:
+    """
+    Strong validator for `get_ui_state` without assembling it, plus the git state it covers.
+
+    Store state is covered by the job revision. The embedded git status is not
+    a store write, so jobs with a repo also fingerprint `git status`, taken from
+    the store's short-lived cache (`git_status_cached`) so conditional GETs
+    rarely spawn `git`; when they do, it runs under a subprocess slot. The
+    body is then rendered from this same git state.
+    """
+    job = await store.get_job(job_id)
+    etag = f"ui-{job_id}-r{job.get('revision', 0)}"
+    git_state = None
+    if job.get("repo_root"):
+        git_state = await store.git_status_cached(job_id=job_id, slot=limits.subprocess_slot)
+        digest = hashlib.sha1(json.dumps(git_state, sort_keys=True).encode("utf-8")).hexdigest()
+        etag += f"-g{digest[:12]}"
+    return f'"{etag}"', git_state
+
+
+async def _event_stream(
+    store: VibeDevStore,
+    job_id: str | None = None,
+    last_event_id: int | None = None,
+    event_filter: EventFilter | None = None,
+    batch_s: float = 0.0,
+) -> AsyncIterator[bytes]:
+    """
+    Generate SSE events for a subscriber, replaying the log after `last_event_id`.
+
+    With `batch_s` > 0, events arriving within that window of the first one are
+    sent as a single `batch` frame (superseded `job_updated` events collapsed).
+    """
+    event_manager = get_event_manager()
+    # Subscribe before replaying so nothing falls between the two.
+    try:
+        queue = await event_manager.subscribe(job_id, event_filter=event_filter, label="sse")
+    except SubscriberLimitExceeded:
+        # Lost a race with the route's capacity check; end the stream.
+        return
+    fields = queue.fields
+    loop = asyncio.get_running_loop()
+
+    def out(chunk: bytes) -> bytes:
+        queue.sent(len(chunk))
+        return chunk
+
+    try:
+        replayed_upto = 0
+        if last_event_id is not None:
+            after = last_event_id
+            while True:
+                replay = await store.events_replay(after_id=after, job_id=job_id, limit=_REPLAY_PAGE)
+                if after == last_event_id and replay["truncated"]:
+                    yield out(SSEEvent(
+                        event_type=EVENT_RESYNC,
+                        data={"reason": "event_log_truncated", "last_event_id": last_event_id},
+                        job_id=job_id,
+                    ).to_sse_bytes())
+                page = [
+                    event
+                    for event in replay["events"]
+                    if event_filter is None or event_filter.matches(event)
+                ]
+                if replay["events"]:
+                    after = replayed_upto = replay["events"][-1].event_id or after
+                if page and batch_s > 0:
+                    yield out(encode_batch(page, fields))
+                else:
+                    for event in page:
+                        yield out(event.to_sse_bytes(fields))
+                if len(replay["events"]) < _REPLAY_PAGE:
+                    break
+
+        def fresh(event: SSEEvent) -> bool:
+            # Skip anything already sent during replay.
+            return event.event_id is None or event.event_id > replayed_upto
+
+        while True:
+            try:
+                # Wait for next event with timeout
+                event: SSEEvent = await asyncio.wait_for(
+                    queue.get(), timeout=30.0
+                )
+            except asyncio.TimeoutError:
+                # Send keepalive
+                yield out(b": keepalive\n\n")
+                continue
+            if not fresh(event):
+                continue
+            if batch_s <= 0:
+                yield out(event.to_sse_bytes(fields))
+                continue
+
+            batch = [event]
+            deadline = loop.time() + batch_s
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if fresh(event):
+                    batch.append(event)
+            yield out(encode_batch(batch, fields))
+    except SubscriptionClosed:
+        # Disconnected as a slow consumer (or reaped as idle); the client reconnects and resyncs.
+        return
+    finally:
+        await event_manager.unsubscribe(queue, job_id)
+
+
+# events-poll checks that each store change event can affect.
+_POLL_CHECKS_BY_EVENT: dict[str, frozenset[str]] = {
+    EVENT_JOB_CREATED: frozenset({"job"}),
+    EVENT_JOB_UPDATED: frozenset({"job"}),
+    EVENT_JOB_STATUS_CHANGED: frozenset({"job"}),
+    EVENT_STEP_STARTED: frozenset({"job"}),
+    EVENT_STEP_COMPLETED: frozenset({"job"}),
+    EVENT_STEP_FAILED: frozenset({"job"}),
+    EVENT_ATTEMPT_SUBMITTED: frozenset({"job", "attempts"}),
+    EVENT_MISTAKE_RECORDED: frozenset({"mistakes"}),
+    EVENT_DEVLOG_APPENDED: frozenset({"devlog"}),
+}
+_POLL_ALL_CHECKS = frozenset({"job", "attempts", "mistakes", "devlog"})
+_POLL_KEEPALIVE_S = 30.0
+
+
+async def _job_change_stream(
+    store: VibeDevStore,
+    job_id: str,
+    *,
+    reconcile_s: float = 0.0,
+) -> AsyncIterator[bytes]:
+    """
+    Push-driven replacement for the old 1s events-poll loop.
+
+    Subscribes to the job's store events and, per wake-up, runs only the queries
+    the received events can affect. Bursts are coalesced: everything already
+    queued is drained before querying.
+    """
+    event_manager = get_event_manager()
+    # Only event types matter here, so a stalled reader keeps the latest of each.
+    try:
+        queue = await event_manager.subscribe(job_id, overflow_policy=OVERFLOW_COALESCE, label="events-poll")
+    except SubscriberLimitExceeded:
+        return
+    loop = asyncio.get_running_loop()
+
+    last_job_updated_at: str | None = None
+    last_phase: int | None = None
+    last_current_step_id: str | None = None
+    last_attempt_id: str | None = None
+    last_mistake_id: str | None = None
+    last_log_id: str | None = None
+
+    def emit(evt_type: str, data: Any) -> bytes:
+        payload = json.dumps({"type": evt_type, "data": data}, default=str)
+        chunk = f"data: {payload}\n\n".encode("utf-8")
+        queue.sent(len(chunk))
+        return chunk
+
+    def current_step_of(job: dict[str, Any]) -> str | None:
+        step_order = job.get("step_order") or []
+        idx = int(job.get("current_step_index") or 0)
+        if job.get("status") in {"EXECUTING", "PAUSED"} and 0 <= idx < len(step_order):
+            return step_order[idx]
+        return None
+
+    async def run_checks(checks: frozenset[str] | set[str]) -> AsyncIterator[bytes]:
+        nonlocal last_job_updated_at, last_phase, last_current_step_id
+        nonlocal last_attempt_id, last_mistake_id, last_log_id
+
+        if "job" in checks:
+            job = await store.get_job(job_id)
+            if job.get("updated_at") != last_job_updated_at:
+                last_job_updated_at = job.get("updated_at")
+                yield emit("job_updated", job)
+
+            phase = get_phase_summary(job)
+            phase_now = phase.get("current_phase")
+            if phase_now is not None and phase_now != last_phase:
+                last_phase = phase_now
+                yield emit("phase_changed", phase)
+
+            current_step_id = current_step_of(job)
+            if current_step_id and current_step_id != last_current_step_id:
+                last_current_step_id = current_step_id
+                yield emit("step_started", {"step_id": current_step_id})
+
+        if "attempts" in checks:
+            attempts = await store.get_attempts(job_id, step_id=None, limit=1)
+            if attempts and attempts[0]["attempt_id"] != last_attempt_id:
+                last_attempt_id = attempts[0]["attempt_id"]
+                yield emit("attempt_submitted", attempts[0])
+
+        if "mistakes" in checks:
+            mistakes = await store.mistake_list(job_id=job_id, limit=1)
+            if mistakes and mistakes[0]["mistake_id"] != last_mistake_id:
+                last_mistake_id = mistakes[0]["mistake_id"]
+                yield emit("mistake_recorded", mistakes[0])
+
+        if "devlog" in checks:
+            logs = await store.devlog_list(job_id=job_id, limit=1)
+            if logs and logs[0]["log_id"] != last_log_id:
+                last_log_id = logs[0]["log_id"]
+                yield emit("devlog_appended", logs[0])
+
+    try:
+        # Prime state (the only full UI-state build per connection).
+        ui = await store.get_ui_state(job_id)
+        job = await store.get_job(job_id)
+        last_job_updated_at = job.get("updated_at")
+        last_phase = ui.get("phase", {}).get("current_phase")
+        last_current_step_id = current_step_of(job)
+        yield emit("job_updated", ui.get("job"))
+
+        async for chunk in run_checks(_POLL_ALL_CHECKS):
+            yield chunk
+
+        next_reconcile = loop.time() + reconcile_s if reconcile_s > 0 else None
+        while True:
+            timeout = _POLL_KEEPALIVE_S
+            if next_reconcile is not None:
+                timeout = max(0.0, min(timeout, next_reconcile - loop.time()))
+            try:
+                event: SSEEvent = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if next_reconcile is None or loop.time() < next_reconcile:
+                    queue.sent(len(b": keepalive\n\n"))
+                    yield b": keepalive\n\n"
+                    continue
+                checks: set[str] = set(_POLL_ALL_CHECKS)
+            else:
+                checks = set(_POLL_CHECKS_BY_EVENT.get(event.event_type, ()))
+                while not queue.empty():
+                    checks.update(_POLL_CHECKS_BY_EVENT.get(queue.get_nowait().event_type, ()))
+
+            if next_reconcile is not None and checks == _POLL_ALL_CHECKS:
+                next_reconcile = loop.time() + reconcile_s
+            async for chunk in run_checks(checks):
+                yield chunk
+    except SubscriptionClosed:
+        return
+    finally:
+        await event_manager.unsubscribe(queue, job_id)
+
+
 def create_app(*, db_path: Path | None = None) -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
@@ -179,31 +721,33 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         )
         store = await VibeDevStore.open(effective_db)
         app.state.store = store
+        # Relay events written by other processes (e.g. the stdio MCP server) to SSE subscribers.
+        events_tail = asyncio.create_task(store.events_tail())
+        # Close subscriptions whose streams stopped draining (e.g. stuck on a dead connection).
+        reaper = asyncio.create_task(get_event_manager().run_reaper())
         # Optional: expose the same MCP toolset over Streamable HTTP at /mcp.
         # This enables Claude Code (or other MCP clients) to collaborate with the live UI server.
-        try:
-            import vibedev_mcp.server as mcp_server
-
-            # When mounted at /mcp, make the MCP server listen at "/" internally.
-            mcp_server.mcp.settings.streamable_http_path = "/"
-            app.state.mcp_app = mcp_server.mcp.streamable_http_app()
-            app.mount("/mcp", app.state.mcp_app)
-            app.state.mcp_manager_cm = mcp_server.mcp.session_manager.run()
-            await app.state.mcp_manager_cm.__aenter__()
-        except Exception:
-            app.state.mcp_app = None
-            app.state.mcp_manager_cm = None
+        if mcp.mode == "eager":
+            await mcp.start()
         try:
             yield
         finally:
-            if getattr(app.state, "mcp_manager_cm", None) is not None:
+            await mcp.aclose()
+            for task in (events_tail, reaper):
+                task.cancel()
                 try:
-                    await app.state.mcp_manager_cm.__aexit__(None, None, None)
-                except Exception:
+                    await task
+                except asyncio.CancelledError:
                     pass
             await store.close()
 
     app = FastAPI(title="VibeDev HTTP API", version="0.1.0", lifespan=lifespan)
+    mcp_mode = os.environ.get("VIBEDEV_MCP_MOUNT", "lazy")
+    if mcp_mode not in MCP_MOUNT_MODES:
+        raise ValueError(f"VIBEDEV_MCP_MOUNT must be one of {', '.join(MCP_MOUNT_MODES)}")
+    mcp = app.state.mcp = _LazyMCPApp(mcp_mode)
+    if mcp_mode != "off":
+        app.mount("/mcp", mcp)
 
     allow_origins = [
         "http://localhost:3000",
@@ -216,6 +760,18 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Compress large JSON bodies (ui-state, exports); SSE streams are excluded by Starlette.
+    gzip_min_size = int(os.environ.get("VIBEDEV_GZIP_MIN_SIZE", str(GZIP_MIN_SIZE)))
+    if gzip_min_size > 0:
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=gzip_min_size,
+            compresslevel=GZIP_LEVEL,
+            # Export archives are already compressed.
+            exclude_content_types=("text/event-stream", "application/gzip", "application/zstd"),
+        )
+    # Outermost, so request latency includes compression.
+    app.add_middleware(metrics.MetricsMiddleware)
 
     @app.exception_handler(KeyError)
     async def _handle_key_error(_: Request, exc: KeyError) -> Response:
@@ -225,8 +781,51 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
     async def _handle_value_error(_: Request, exc: ValueError) -> Response:
         return JSONResponse(status_code=400, content={"error": "bad_request", "detail": str(exc)})
 
+    @app.exception_handler(SubscriberLimitExceeded)
+    async def _handle_subscriber_limit(_: Request, exc: SubscriberLimitExceeded) -> Response:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "too_many_subscribers", "detail": str(exc)},
+            headers={"Retry-After": "5"},
+        )
+
+    @app.exception_handler(RateLimited)
+    async def _handle_rate_limited(_: Request, exc: RateLimited) -> Response:
+        return JSONResponse(
+            status_code=429,
+            content={"error": "rate_limited", "scope": exc.scope, "detail": str(exc)},
+            headers={"Retry-After": retry_after_header(exc.retry_after)},
+        )
+
     def store_from(request: Request) -> VibeDevStore:
-        return request.app.state.store
+        # A transactional /api/batch runs its operations against its own store.
+        return request.scope.get(_STORE_SCOPE_KEY) or request.app.state.store
+
+    # Expensive routes (repo scans, git, exports, gate-running submissions) are
+    # charged to per-client and per-job token buckets; those that spawn
+    # subprocesses also take one of a fixed number of slots.
+    limits = app.state.limits = AdmissionController.from_env()
+
+    async def rate_limited(request: Request) -> None:
+        limits.admit(request.client.host if request.client else None, request.path_params.get("job_id"))
+
+    async def spawns_subprocesses(request: Request) -> AsyncIterator[None]:
+        if _STORE_SCOPE_KEY in request.scope:
+            # A transactional batch holds the write lock; gates and git can run
+            # (and queue for a slot) for seconds, stalling every other writer.
+            raise ValueError(f"{request.url.path} runs subprocesses and cannot be part of a transactional batch")
+        await rate_limited(request)
+        async with limits.subprocess_slot():
+            yield
+
+    # Identical concurrent reads (several tabs polling one job) share one computation.
+    flights = app.state.flights = SingleFlight()
+
+    async def coalesced(request: Request, key: tuple[Any, ...], fn: Callable[[], Awaitable[Any]]) -> Any:
+        if _STORE_SCOPE_KEY in request.scope:
+            # Transactional batch reads see uncommitted state; never share them.
+            return await fn()
+        return await flights.do(key, fn)
 
     @app.get("/health", response_model=HealthResponse)
     async def health(request: Request) -> HealthResponse:
@@ -246,50 +845,121 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
     # SSE Events
     # -------------------------------------------------------------------------
 
-    async def _event_generator(job_id: str | None = None):
-        """Generate SSE events for a subscriber."""
-        event_manager = get_event_manager()
-        queue = await event_manager.subscribe(job_id)
+    def _last_event_id(request: Request) -> int | None:
+        raw = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
         try:
-            while True:
-                try:
-                    # Wait for next event with timeout
-                    event: SSEEvent = await asyncio.wait_for(
-                        queue.get(), timeout=30.0
-                    )
-                    yield event.to_sse_string()
-                except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield ": keepalive\n\n"
-        finally:
-            await event_manager.unsubscribe(queue, job_id)
+            return int(raw) if raw is not None else None
+        except ValueError:
+            return None
+
+    _SSE_HEADERS = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+    }
 
     @app.get("/api/jobs/{job_id}/events")
-    async def job_events_stream(job_id: str) -> StreamingResponse:
-        """SSE endpoint for real-time job events."""
+    async def job_events_stream(
+        job_id: str,
+        request: Request,
+        types: str | None = Query(default=None, description="Comma-separated event types"),
+        steps: str | None = Query(default=None, description="Comma-separated step ids"),
+        fields: str | None = Query(default=None, description="Comma-separated data fields to send"),
+        batch_ms: int = Query(default=0, ge=0, le=5000, description="Batching window; 0 = one frame per event"),
+    ) -> StreamingResponse:
+        """SSE endpoint for real-time job events (honors Last-Event-ID)."""
+        event_filter = EventFilter.from_params(types=types, steps=steps, fields=fields)
+        get_event_manager().check_capacity(job_id)
         return StreamingResponse(
-            _event_generator(job_id),
+            _event_stream(
+                store_from(request),
+                job_id,
+                _last_event_id(request),
+                event_filter,
+                batch_s=batch_ms / 1000,
+            ),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-            },
+            headers=_SSE_HEADERS,
         )
 
     @app.get("/api/events")
-    async def all_events_stream() -> StreamingResponse:
-        """SSE endpoint for all job events (global stream)."""
+    async def all_events_stream(
+        request: Request,
+        types: str | None = Query(default=None, description="Comma-separated event types"),
+        steps: str | None = Query(default=None, description="Comma-separated step ids"),
+        fields: str | None = Query(default=None, description="Comma-separated data fields to send"),
+        batch_ms: int = Query(default=0, ge=0, le=5000, description="Batching window; 0 = one frame per event"),
+    ) -> StreamingResponse:
+        """SSE endpoint for all job events (global stream, honors Last-Event-ID)."""
+        event_filter = EventFilter.from_params(types=types, steps=steps, fields=fields)
+        get_event_manager().check_capacity(None)
         return StreamingResponse(
-            _event_generator(None),
+            _event_stream(
+                store_from(request),
+                None,
+                _last_event_id(request),
+                event_filter,
+                batch_s=batch_ms / 1000,
+            ),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-            },
+            headers=_SSE_HEADERS,
         )
 
+    @app.get("/api/events/stats")
+    async def events_stats() -> dict[str, Any]:
+        """Live subscriber counts, queue depth, bytes sent, lag and limits."""
+        return get_event_manager().stats()
+
+    @app.get("/api/limits/stats")
+    async def limits_stats() -> dict[str, Any]:
+        """Rate limiter and subprocess admission counters for this worker."""
+        return limits.stats()
+
+    @app.get("/metrics")
+    async def prometheus_metrics() -> Response:
+        """Prometheus text-format metrics for this worker process."""
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+    @app.post("/api/batch")
+    async def batch(payload: BatchInput, request: Request) -> Response:
+        """
+        Run several API operations in order in one round trip.
+
+        Each operation is dispatched in-process through the normal routes and
+        reports its own status/body. With `transaction`, all store writes commit
+        together or not at all (the first failing operation rolls back the rest);
+        routes that spawn subprocesses (step submission, git, repo snapshot) are
+        refused there, since the write lock would be held while they run.
+        """
+        results: list[dict[str, Any]] = []
+        use_tx = payload.transaction
+
+        async def run(store: VibeDevStore | None) -> bool:
+            for i, operation in enumerate(payload.operations):
+                result = await _subrequest(request.app, request.scope, operation, store)
+                results.append(result)
+                if result["status"] >= 400 and (use_tx or payload.stop_on_error):
+                    results.extend({"status": None, "skipped": True} for _ in payload.operations[i + 1:])
+                    return False
+            return True
+
+        if not use_tx:
+            ok = await run(None)
+            return FastJSONResponse({"ok": ok, "transaction": False, "committed": None, "results": results})
+
+        try:
+            async with store_from(request).transaction() as tx_store:
+                if not await run(tx_store):
+                    raise _BatchRollback()
+        except _BatchRollback:
+            return FastJSONResponse({"ok": False, "transaction": True, "committed": False, "results": results})
+        return FastJSONResponse({"ok": True, "transaction": True, "committed": True, "results": results})
+
+    @app.websocket("/api/ws")
+    async def websocket_endpoint(websocket: WebSocket) -> None:
+        """Multiplexed event subscriptions + store RPC over one socket (see vibedev_mcp.ws)."""
+        await WebSocketSession(websocket, websocket.app.state.store, limits=websocket.app.state.limits).run()
+
     # -------------------------------------------------------------------------
     # Jobs
     # ------------------------------------------------------------------------- 
@@ -355,16 +1025,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         )
         job = await store.get_job(job_id)
         questions = compute_next_questions(job)
-        
-        # Publish SSE event
-        event_manager = get_event_manager()
-        await event_manager.publish(create_job_event(
-            EVENT_JOB_CREATED,
-            job_id,
-            title=job.get("title"),
-            status=job.get("status"),
-        ))
-        
         return {"job_id": job_id, "questions": questions}
 
     @app.get("/api/jobs")
@@ -373,15 +1033,19 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         status: str | None = Query(default=None),
         limit: int = Query(default=50, ge=1, le=200),
         offset: int = Query(default=0, ge=0),
-    ) -> dict[str, Any]:
+    ) -> Response:
         store = store_from(request)
         result = await store.job_list(status=status, limit=limit, offset=offset)
-        return {"count": result["count"], "jobs": result["items"]}
+        return FastJSONResponse({"count": result["count"], "jobs": result["items"]})
 
     @app.get("/api/jobs/{job_id}")
-    async def get_job(job_id: str, request: Request) -> dict[str, Any]:
+    async def get_job(job_id: str, request: Request) -> Response:
         store = store_from(request)
-        return await store.get_job(job_id)
+        # Read the revision first: a write racing the body only makes the tag stale, never too new.
+        etag = f'"job-{job_id}-r{await store.job_revision(job_id)}"'
+        if _not_modified(request, etag):
+            return _not_modified_response(etag)
+        return FastJSONResponse(await store.get_job(job_id), headers={"ETag": etag})
 
     @app.patch("/api/jobs/{job_id}/policies")
     async def update_policies(
@@ -394,22 +1058,35 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             update=payload.update,
             merge=payload.merge,
         )
-
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_job_event(
-                EVENT_JOB_UPDATED,
-                job_id,
-                update=payload.update,
-                policies=job.get("policies"),
-            )
-        )
         return {"ok": True, "job": job}
 
     @app.get("/api/jobs/{job_id}/ui-state")
-    async def get_ui_state(job_id: str, request: Request) -> dict[str, Any]:
+    async def get_ui_state(job_id: str, request: Request) -> Response:
+        """Full UI state; honors If-None-Match so unchanged jobs skip the assembly."""
+        store = store_from(request)
+        revision = await store.job_revision(job_id)
+        etag, git_state = await coalesced(
+            request, ("ui-state/etag", job_id, revision), lambda: _ui_state_etag(store, job_id, limits)
+        )
+        if _not_modified(request, etag):
+            return _not_modified_response(etag)
+
+        async def render() -> bytes:
+            return fastjson.dumps(await store.get_ui_state(job_id, git_state=git_state))
+
+        # The tag carries the revision (and the git fingerprint for repo jobs).
+        body = await coalesced(request, ("ui-state", job_id, etag), render)
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    @app.get("/api/jobs/{job_id}/ui-state/delta")
+    async def get_ui_state_delta(
+        job_id: str,
+        request: Request,
+        since: str | None = Query(default=None, description="Version from a previous response"),
+    ) -> Response:
+        """UI state as a JSON Patch against `since`, or a full snapshot if it aged out."""
         store = store_from(request)
-        return await store.get_ui_state(job_id)
+        return FastJSONResponse(await store.get_ui_state_delta(job_id, since=since))
 
     @app.post("/api/jobs/{job_id}/ui-state")
     async def save_ui_state(job_id: str, payload: dict[str, Any], request: Request) -> dict[str, Any]:
@@ -418,8 +1095,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         graph_state = payload.get("graph_state")
         if graph_state:
             await store.save_flow_state(job_id, graph_state)
-            event_manager = get_event_manager()
-            await event_manager.publish(create_job_event(EVENT_JOB_UPDATED, job_id, graph_state_updated=True))
         return {"ok": True}
 
     # -------------------------------------------------------------------------
@@ -576,10 +1251,15 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         await store.job_archive(job_id=job_id)
         return {"ok": True}
 
-    @app.get("/api/jobs/{job_id}/export-legacy")
-    async def export_job(job_id: str, request: Request, format: str = "markdown") -> dict[str, Any]:
-        """Export the job to a specific format."""
+    @app.get("/api/jobs/{job_id}/export-legacy", dependencies=[Depends(rate_limited)], response_model=None)
+    async def export_job(
+        job_id: str, request: Request, format: str = "markdown", stream: bool = False
+    ) -> Response | dict[str, Any]:
+        """Export the job to a specific format (`stream=true` sends the Markdown itself)."""
         store = store_from(request)
+        if format == "markdown" and stream:
+            lines = (f"{line}\n" async for line in store.job_export_markdown_lines(job_id))
+            return await _primed_stream(lines, "text/markdown; charset=utf-8")
         if format == "markdown":
             content = await store.job_export_markdown(job_id)
             return {"ok": True, "format": "markdown", "content": content}
@@ -588,14 +1268,9 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
     @app.get("/api/jobs/{job_id}/step-prompt")
     async def step_prompt(job_id: str, request: Request) -> dict[str, Any]:
         store = store_from(request)
-        data = await store.job_next_step_prompt(job_id)
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_step_event(EVENT_STEP_STARTED, job_id, str(data.get("step_id")))
-        )
-        return data
+        return await store.job_next_step_prompt(job_id)
 
-    @app.post("/api/jobs/{job_id}/steps/{step_id}/submit")
+    @app.post("/api/jobs/{job_id}/steps/{step_id}/submit", dependencies=[Depends(spawns_subprocesses)])
     async def submit_step_result(
         job_id: str,
         step_id: str,
@@ -612,28 +1287,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             devlog_line=payload.devlog_line,
             commit_hash=payload.commit_hash,
         )
-        
-        # Publish SSE events
-        event_manager = get_event_manager()
-        
-        # Always publish attempt submitted event
-        await event_manager.publish(create_step_event(
-            EVENT_ATTEMPT_SUBMITTED,
-            job_id,
-            step_id,
-            accepted=result.get("accepted", False),
-            summary=payload.summary,
-        ))
-        
-        # If accepted, publish step completed event
-        if result.get("accepted"):
-            await event_manager.publish(create_step_event(
-                EVENT_STEP_COMPLETED,
-                job_id,
-                step_id,
-                next_step_id=result.get("next_step_id"),
-            ))
-            
         return result
 
 
@@ -678,28 +1331,19 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         return {"job_id": None}
 
     @app.get("/api/jobs/{job_id}/status")
-    async def get_job_status(job_id: str, request: Request) -> dict[str, Any]:
+    async def get_job_status(job_id: str, request: Request) -> Response:
         """Get concise job status (for VS Code status bar)."""
         store = store_from(request)
-        job = await store.get_job(job_id)
+        revision = await store.job_revision(job_id)
+        etag = f'"status-{job_id}-r{revision}"'
+        if _not_modified(request, etag):
+            return _not_modified_response(etag)
 
-        current_step_title = None
-        if job["status"] == "EXECUTING" and job.get("step_order"):
-            idx = int(job.get("current_step_index") or 0)
-            step_order: list[str] = job["step_order"]
-            if 0 <= idx < len(step_order):
-                step_id = step_order[idx]
-                step = await store._get_step(job_id, step_id)
-                current_step_title = step.get("title")
+        async def render() -> bytes:
+            return fastjson.dumps(await _job_status(store, job_id))
 
-        return {
-            "job_id": job_id,
-            "status": job["status"],
-            "title": job.get("title", "Untitled"),
-            "current_step_index": job.get("current_step_index", 0),
-            "total_steps": len(job.get("step_order", [])),
-            "current_step_title": current_step_title,
-        }
+        body = await coalesced(request, ("status", job_id, revision), render)
+        return Response(body, media_type="application/json", headers={"ETag": etag})
 
     @app.get("/api/jobs/{job_id}/next-prompt-auto")
     async def get_next_prompt_auto(job_id: str, request: Request) -> dict[str, Any]:
@@ -734,9 +1378,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             prompt = prompt_data.get("prompt", "")
             marker = f"\n\n✓ VD_READY_{job_id}"
 
-            event_manager = get_event_manager()
-            await event_manager.publish(create_step_event(EVENT_STEP_STARTED, job_id, step_id))
-
             # Clear the flag so we don't loop forever.
             await store._conn.execute(
                 "UPDATE jobs SET pending_new_thread = 0 WHERE job_id = ?;",
@@ -785,9 +1426,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
         prompt_data = await store.job_next_step_prompt(job_id)
         prompt = prompt_data.get("prompt", "")
 
-        event_manager = get_event_manager()
-        await event_manager.publish(create_step_event(EVENT_STEP_STARTED, job_id, step_id))
-
         # Add completion marker
         marker = f"\n\n✓ VD_READY_{job_id}"
 
@@ -810,7 +1448,7 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             "attempt": retry_count + 1,
         }
 
-    @app.post("/api/jobs/{job_id}/submit-evidence")
+    @app.post("/api/jobs/{job_id}/submit-evidence", dependencies=[Depends(spawns_subprocesses)])
     async def submit_evidence_simplified(job_id: str, request: Request) -> dict[str, Any]:
         """Simplified evidence submission (for VS Code extension)."""
         body = await request.json()
@@ -872,18 +1510,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             tags=payload.tags,
             step_id=payload.step_id,
         )
-
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_job_event(
-                EVENT_CONTEXT_ADDED,
-                job_id,
-                context_id=context_id,
-                block_type=payload.block_type,
-                tags=payload.tags,
-                step_id=payload.step_id,
-            )
-        )
         return {"context_id": context_id}
 
     @app.get("/api/jobs/{job_id}/context/{context_id}")
@@ -906,17 +1532,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             content=payload.content,
             tags=payload.tags,
         )
-
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_job_event(
-                EVENT_CONTEXT_UPDATED,
-                job_id,
-                context_id=context_id,
-                block_type=block.get("block_type"),
-                tags=block.get("tags", []),
-            )
-        )
         return {"ok": True, "block": block}
 
     @app.delete("/api/jobs/{job_id}/context/{context_id}")
@@ -925,11 +1540,6 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
     ) -> dict[str, Any]:
         store = store_from(request)
         await store.context_delete_block(job_id=job_id, context_id=context_id)
-
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_job_event(EVENT_CONTEXT_DELETED, job_id, context_id=context_id)
-        )
         return {"ok": True}
 
     @app.get("/api/jobs/{job_id}/context/search")
@@ -956,35 +1566,49 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
     ) -> dict[str, Any]:
         store = store_from(request)
         log_id = await store.devlog_append(job_id=job_id, content=content, step_id=step_id)
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_job_event(
-                EVENT_DEVLOG_APPENDED,
-                job_id,
-                log_id=log_id,
-                step_id=step_id,
-            )
-        )
         return {"log_id": log_id}
 
-    @app.get("/api/jobs/{job_id}/devlog")
+    @app.get("/api/jobs/{job_id}/devlog", response_model=None)
     async def list_devlog(
         job_id: str,
         request: Request,
         log_type: str | None = Query(default=None),
         limit: int = Query(default=100, ge=1, le=1000),
-    ) -> dict[str, Any]:
+        cursor: str | None = Query(default=None),
+        fields: str | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    ) -> dict[str, Any] | Response:
+        """
+        Newest-first devlog page; follow `next_cursor` for older entries.
+
+        `format=ndjson` streams every entry after `cursor` instead of one page.
+        """
         store = store_from(request)
-        entries = await store.devlog_list(job_id=job_id, log_type=log_type, limit=limit)
-        return {"count": len(entries), "entries": entries}
+        if format == "ndjson":
+            rows = store.iter_devlog(job_id=job_id, log_type=log_type, cursor=cursor, fields=_split_fields(fields))
+            return await _primed_stream(rows, "application/x-ndjson")
+        page = await store.devlog_page(
+            job_id=job_id, log_type=log_type, limit=limit, cursor=cursor, fields=_split_fields(fields)
+        )
+        return {"count": len(page["entries"]), **page}
 
-    @app.get("/api/jobs/{job_id}/devlog/export")
+    @app.get("/api/jobs/{job_id}/devlog/export", response_model=None)
     async def export_devlog(
         job_id: str,
         request: Request,
         format: str = Query(default="md"),
-    ) -> dict[str, Any]:
+        stream: bool = Query(default=False),
+    ) -> dict[str, Any] | Response:
+        """
+        Devlog export. Without `stream` this is the latest 1000 entries in one
+        JSON body; `stream=true` sends every entry as markdown (`format=md`)
+        or NDJSON (`format=ndjson`/`json`) as it is read.
+        """
         store = store_from(request)
+        if stream:
+            stream_format = "md" if format == "md" else "ndjson"
+            media_type = "text/markdown; charset=utf-8" if stream_format == "md" else "application/x-ndjson"
+            return await _primed_stream(store.devlog_export_stream(job_id=job_id, format=stream_format), media_type)
         return await store.devlog_export(job_id=job_id, format=format)
 
     @app.post("/api/jobs/{job_id}/mistakes")
@@ -1010,49 +1634,71 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             tags=tags,
             related_step_id=related_step_id,
         )
-        event_manager = get_event_manager()
-        await event_manager.publish(
-            create_job_event(
-                EVENT_MISTAKE_RECORDED,
-                job_id,
-                mistake_id=mistake_id,
-                related_step_id=related_step_id,
-                tags=tags,
-                title=title,
-            )
-        )
         return {"mistake_id": mistake_id}
 
-    @app.get("/api/jobs/{job_id}/mistakes")
+    @app.get("/api/jobs/{job_id}/mistakes", response_model=None)
     async def list_mistakes(
         job_id: str,
         request: Request,
         limit: int = Query(default=50, ge=1, le=200),
-    ) -> dict[str, Any]:
+        cursor: str | None = Query(default=None),
+        fields: str | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    ) -> dict[str, Any] | Response:
+        """Newest-first mistakes page (`next_cursor`), or every entry with `format=ndjson`."""
+        store = store_from(request)
+        if format == "ndjson":
+            rows = store.iter_mistakes(job_id=job_id, cursor=cursor, fields=_split_fields(fields))
+            return await _primed_stream(rows, "application/x-ndjson")
+        page = await store.mistakes_page(job_id=job_id, limit=limit, cursor=cursor, fields=_split_fields(fields))
+        return {"count": len(page["entries"]), **page}
+
+    @app.get("/api/jobs/{job_id}/attempts", response_model=None)
+    async def list_attempts(
+        job_id: str,
+        request: Request,
+        step_id: str | None = Query(default=None),
+        limit: int = Query(default=20, ge=1, le=500),
+        cursor: str | None = Query(default=None),
+        fields: str | None = Query(default=None),
+        format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    ) -> dict[str, Any] | Response:
+        """
+        Newest-first attempts page (`next_cursor`), or every attempt with `format=ndjson`.
+
+        Use `fields` (e.g. `attempt_id,step_id,outcome,timestamp`) to leave out
+        the evidence blobs.
+        """
         store = store_from(request)
-        entries = await store.mistake_list(job_id=job_id, limit=limit)
-        return {"count": len(entries), "entries": entries}
+        if format == "ndjson":
+            rows = store.iter_attempts(job_id=job_id, step_id=step_id, cursor=cursor, fields=_split_fields(fields))
+            return await _primed_stream(rows, "application/x-ndjson")
+        page = await store.attempts_page(
+            job_id=job_id, step_id=step_id, limit=limit, cursor=cursor, fields=_split_fields(fields)
+        )
+        return {"count": len(page["entries"]), **page}
 
     # -------------------------------------------------------------------------
     # Git + repo helpers
     # -------------------------------------------------------------------------
 
-    @app.get("/api/jobs/{job_id}/git/status")
+    @app.get("/api/jobs/{job_id}/git/status", dependencies=[Depends(spawns_subprocesses)])
     async def git_status(job_id: str, request: Request) -> dict[str, Any]:
         store = store_from(request)
-        return await store.git_status(job_id=job_id)
+        revision = await store.job_revision(job_id)
+        return await coalesced(request, ("git/status", job_id, revision), lambda: store.git_status(job_id=job_id))
 
-    @app.get("/api/jobs/{job_id}/git/diff")
+    @app.get("/api/jobs/{job_id}/git/diff", dependencies=[Depends(spawns_subprocesses)])
     async def git_diff(job_id: str, request: Request, staged: bool = Query(default=False)) -> dict[str, Any]:
         store = store_from(request)
         return await store.git_diff_summary(job_id=job_id, staged=staged)
 
-    @app.get("/api/jobs/{job_id}/git/log")
+    @app.get("/api/jobs/{job_id}/git/log", dependencies=[Depends(spawns_subprocesses)])
     async def git_log(job_id: str, request: Request, n: int = Query(default=10, ge=1, le=100)) -> dict[str, Any]:
         store = store_from(request)
         return await store.git_log(job_id=job_id, n=n)
 
-    @app.post("/api/jobs/{job_id}/repo/snapshot")
+    @app.post("/api/jobs/{job_id}/repo/snapshot", dependencies=[Depends(spawns_subprocesses)])
     async def repo_snapshot(job_id: str, payload: RepoSnapshotInput, request: Request) -> dict[str, Any]:
         store = store_from(request)
         job = await store.get_job(job_id)
@@ -1061,107 +1707,216 @@ def create_app(*, db_path: Path | None = None) -> FastAPI:
             raise HTTPException(status_code=400, detail="repo_root is not set for this job")
         return await store.repo_snapshot(job_id=job_id, repo_root=repo_root, notes=payload.notes)
 
+    @app.get("/api/jobs/{job_id}/repo/snapshots/diff")
+    async def repo_snapshot_diff(
+        job_id: str,
+        request: Request,
+        from_snapshot_id: str | None = Query(default=None),
+        to_snapshot_id: str | None = Query(default=None),
+        format: str = Query(default="json"),
+        max_items: int = Query(default=200, ge=1, le=5000),
+    ) -> dict[str, Any]:
+        store = store_from(request)
+        return await store.repo_snapshot_diff(
+            job_id=job_id,
+            from_snapshot_id=from_snapshot_id,
+            to_snapshot_id=to_snapshot_id,
+            format=format,
+            max_items=max_items,
+        )
+
     @app.get("/api/jobs/{job_id}/repo/map")
     async def repo_map(job_id: str, request: Request, format: str = Query(default="json")) -> dict[str, Any]:
         store = store_from(request)
         return await store.repo_map_export(job_id=job_id, format=format)
 
+    @app.get("/api/jobs/{job_id}/repo/map/render")
+    async def repo_map_render(
+        job_id: str,
+        request: Request,
+        token_budget: int = Query(default=2000, ge=64, le=200_000),
+        snapshot_id: str | None = Query(default=None),
+    ) -> dict[str, Any]:
+        store = store_from(request)
+        return await store.repo_map_render(job_id=job_id, token_budget=token_budget, snapshot_id=snapshot_id)
+
+    @app.get("/api/jobs/{job_id}/repo/symbols")
+    async def repo_symbols(
+        job_id: str,
+        request: Request,
+        q: str = Query(..., min_length=1),
+        kind: str | None = Query(default=None),
+        fuzzy: bool = Query(default=False),
+        limit: int = Query(default=50, ge=1, le=500),
+    ) -> dict[str, Any]:
+        store = store_from(request)
+        return await store.repo_symbol_search(job_id=job_id, query=q, kind=kind, fuzzy=fuzzy, limit=limit)
+
     @app.patch("/api/jobs/{job_id}/repo/map")
     async def repo_map_update(job_id: str, payload: RepoMapUpdateInput, request: Request) -> dict[str, Any]:
         store = store_from(request)
-        return await store.repo_file_descriptions_update(job_id=job_id, updates=payload.updates)
+        return await store.repo_file_descriptions_update(
+            job_id=job_id,
+            updates=payload.updates,
+            validate_paths=payload.validate_paths,
+        )
+
+    @app.patch("/api/jobs/{job_id}/repo/map/stream")
+    async def repo_map_update_stream(
+        job_id: str,
+        request: Request,
+        validate_paths: bool = Query(default=False),
+    ) -> StreamingResponse:
+        """
+        NDJSON bulk update: one `{"path": ..., "description": ...}` object per request line.
+
+        The body is parsed as it arrives and written 500 rows per transaction;
+        only the per-path status lines are kept. They are streamed back once the
+        body is consumed (Starlette's disconnect listener shares `receive` with
+        the response), followed by a final `{"summary": {...}}`.
+        """
+        store = store_from(request)
+        await store.get_job(job_id)
+        bad_lines: list[dict[str, Any]] = []
+
+        async def pairs() -> AsyncIterator[tuple[str, str]]:
+            buffer = b""
+            line_no = 0
+
+            def parse(raw: bytes) -> tuple[str, str] | None:
+                if not raw.strip():
+                    return None
+                try:
+                    item = json.loads(raw)
+                    return (str(item["path"]), str(item["description"]))
+                except (ValueError, KeyError, TypeError) as exc:
+                    bad_lines.append({"line": line_no, "status": "invalid", "error": str(exc)})
+                    return None
+
+            async for chunk in request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for raw in lines:
+                    line_no += 1
+                    if (pair := parse(raw)) is not None:
+                        yield pair
+            line_no += 1
+            if (pair := parse(buffer)) is not None:
+                yield pair
+
+        results = [
+            result
+            async for result in store.repo_file_descriptions_stream(
+                job_id=job_id, items=pairs(), validate_paths=validate_paths
+            )
+        ]
+
+        async def gen() -> AsyncIterator[bytes]:
+            counts: dict[str, int] = {}
+
+            def emit(item: dict[str, Any]) -> bytes:
+                counts[item["status"]] = counts.get(item["status"], 0) + 1
+                return (json.dumps(item) + "\n").encode("utf-8")
+
+            for bad in bad_lines:
+                yield emit(bad)
+            for result in results:
+                yield emit(result)
+            yield (json.dumps({"summary": counts}) + "\n").encode("utf-8")
 
-    @app.get("/api/jobs/{job_id}/repo/hygiene")
-    async def repo_hygiene(job_id: str, request: Request, max_suggestions: int = Query(default=20, ge=1, le=100)) -> dict[str, Any]:
+        return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+    @app.get("/api/jobs/{job_id}/repo/hygiene", dependencies=[Depends(rate_limited)])
+    async def repo_hygiene(
+        job_id: str,
+        request: Request,
+        max_suggestions: int = Query(default=20, ge=1, le=100),
+        time_budget_s: float = Query(default=5.0, gt=0, le=120),
+    ) -> dict[str, Any]:
         store = store_from(request)
-        return await store.repo_hygiene_suggest(job_id=job_id, max_suggestions=max_suggestions)
+        return await store.repo_hygiene_suggest(
+            job_id=job_id, max_suggestions=max_suggestions, time_budget_s=time_budget_s
+        )
 
     # -------------------------------------------------------------------------
     # Export
     # -------------------------------------------------------------------------
 
-    @app.get("/api/jobs/{job_id}/export")
-    async def export(job_id: str, request: Request, format: str = Query(default="json")) -> dict[str, Any]:
+    @app.get("/api/jobs/{job_id}/export", dependencies=[Depends(rate_limited)])
+    async def export(job_id: str, request: Request, format: str = Query(default="json")) -> Response:
+        """
+        `json`/`md` return a summary document; `ndjson`, `tar.gz` and `tar.zst`
+        stream a restorable bundle (see `vibedev_mcp.bundle`, `POST /api/jobs/import`).
+        """
+        store = store_from(request)
+        if format not in bundle.EXPORT_MEDIA_TYPES:
+            return FastJSONResponse(await store.job_export_bundle(job_id=job_id, format=format))
+        media_type, extension = bundle.EXPORT_MEDIA_TYPES[format]
+        records = store.job_export_records(job_id=job_id)
+        if format == "ndjson":
+            chunks = bundle.ndjson_chunks(records)
+        else:
+            if format not in bundle.archive_formats():
+                raise ValueError(f"Unsupported archive format: {format} (install vibedev-mcp[zstd])")
+            chunks = bundle.archive_chunks(records, format)
+        return await _primed_stream(
+            chunks,
+            media_type,
+            headers={"Content-Disposition": f'attachment; filename="{job_id}.{extension}"'},
+        )
+
+    @app.post("/api/jobs/import", dependencies=[Depends(rate_limited)])
+    async def import_job(request: Request) -> dict[str, Any]:
+        """
+        Restore a job from an export bundle in the request body.
+
+        NDJSON bodies are parsed as they arrive; archives are spooled to a
+        temporary file (in memory up to a few MiB) and read part by part.
+        """
         store = store_from(request)
-        return await store.job_export_bundle(job_id=job_id, format=format)
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if content_type in {"application/x-ndjson", "application/jsonl", "application/json"}:
+            return await store.job_import_records(bundle.records_from_ndjson(request.stream()))
+        with tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_BYTES) as spool:
+            async for chunk in request.stream():
+                spool.write(chunk)
+            spool.seek(0)
+            return await store.job_import_records(bundle.aiter_records(bundle.records_from_archive(spool)))
 
     # -------------------------------------------------------------------------
     # SSE
     # -------------------------------------------------------------------------
 
-    @app.get("/api/jobs/{job_id}/events-poll")     
-    async def events(job_id: str, request: Request) -> StreamingResponse:
-        store = store_from(request)
-
-        async def gen() -> AsyncIterator[bytes]:
-            last_job_updated_at: str | None = None
-            last_phase: int | None = None
-            last_current_step_id: str | None = None
-            last_attempt_id: str | None = None
-            last_mistake_id: str | None = None
-            last_log_id: str | None = None
-
-            async def emit(evt_type: str, data: Any) -> bytes:
-                payload = json.dumps({"type": evt_type, "data": data}, default=str)
-                return f"data: {payload}\n\n".encode("utf-8")
-
-            # Prime state
-            job = await store.get_job(job_id)
-            last_job_updated_at = job.get("updated_at")
-            ui = await store.get_ui_state(job_id)
-            last_phase = ui.get("phase", {}).get("current_phase")
-            if ui.get("current_step"):
-                last_current_step_id = ui["current_step"]["step_id"]
-
-            yield await emit("job_updated", ui.get("job"))
+    @app.get("/api/jobs/{job_id}/events-poll")
+    async def events(
+        job_id: str,
+        request: Request,
+        reconcile: float = Query(default=0.0, ge=0.0, le=3600.0),
+    ) -> StreamingResponse:
+        """
+        Job change stream driven by store events.
 
-            while True:
-                if await request.is_disconnected():
-                    return
-
-                await asyncio.sleep(1.0)
-
-                job = await store.get_job(job_id)
-                if job.get("updated_at") != last_job_updated_at:
-                    last_job_updated_at = job.get("updated_at")
-                    yield await emit("job_updated", job)
-
-                ui = await store.get_ui_state(job_id)
-                phase_now = ui.get("phase", {}).get("current_phase")
-                if phase_now is not None and phase_now != last_phase:
-                    last_phase = phase_now
-                    yield await emit("phase_changed", ui.get("phase"))
-
-                current_step = ui.get("current_step")
-                current_step_id = current_step.get("step_id") if current_step else None
-                if current_step_id and current_step_id != last_current_step_id:
-                    last_current_step_id = current_step_id
-                    yield await emit("step_started", {"step_id": current_step_id})
-
-                attempts = await store.get_attempts(job_id, step_id=None, limit=1)
-                if attempts:
-                    if attempts[0]["attempt_id"] != last_attempt_id:
-                        last_attempt_id = attempts[0]["attempt_id"]
-                        yield await emit("attempt_submitted", attempts[0])
-
-                mistakes = await store.mistake_list(job_id=job_id, limit=1)
-                if mistakes:
-                    if mistakes[0]["mistake_id"] != last_mistake_id:
-                        last_mistake_id = mistakes[0]["mistake_id"]
-                        yield await emit("mistake_recorded", mistakes[0])
-
-                logs = await store.devlog_list(job_id=job_id, limit=1)
-                if logs:
-                    if logs[0]["log_id"] != last_log_id:
-                        last_log_id = logs[0]["log_id"]
-                        yield await emit("devlog_appended", logs[0])
-
-        return StreamingResponse(gen(), media_type="text/event-stream")
+        Queries only run when a relevant change is published; `reconcile` (seconds,
+        0 = off) adds a low-frequency full re-check for changes made by other processes.
+        """
+        store = store_from(request)
+        await store.get_job(job_id)
+        get_event_manager().check_capacity(job_id)
+        return StreamingResponse(
+            _job_change_stream(store, job_id, reconcile_s=reconcile),
+            media_type="text/event-stream",
+        )
 
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> Any:
+    # `vibedev_mcp.http_server:app` for uvicorn, built on first access so that
+    # importing this module (tests, scripts, `create_app` callers) stays cheap.
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def serve_main(argv: list[str] | None = None) -> None:
@@ -1170,6 +1925,22 @@ def serve_main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(prog="vibedev-mcp serve")
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=int(os.environ.get("VIBEDEV_HTTP_PORT", "8765")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("VIBEDEV_HTTP_WORKERS", "1")),
+        help="Worker processes; each opens its own store on the shared database",
+    )
     args = parser.parse_args(argv)
-
-    uvicorn.run("vibedev_mcp.http_server:app", host=args.host, port=args.port, reload=False)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+
+    # Workers are separate processes importing this module; they read the count from here.
+    os.environ["VIBEDEV_HTTP_WORKERS"] = str(args.workers)
+    uvicorn.run(
+        "vibedev_mcp.http_server:app",
+        host=args.host,
+        port=args.port,
+        reload=False,
+        workers=args.workers,
+    )
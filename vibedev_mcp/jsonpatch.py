@@ -0,0 +1,192 @@
+"""RFC 6902 JSON Patch support for incremental UI-state updates.
+
+`make_patch` diffs two JSON documents into `add` / `remove` / `replace`
+operations, `apply_patch` applies such a patch, and `SnapshotHistory` keeps a
+per-key version counter with a bounded window of recent snapshots so a client
+holding an older version can be sent only what changed since.
+"""
+
+from __future__ import annotations
+
+import copy
+import secrets
+from collections import OrderedDict, deque
+from typing import Any
+
+# Snapshots kept per key, and keys tracked before the least recently used is dropped.
+DEFAULT_HISTORY_DEPTH = 8
+DEFAULT_MAX_KEYS = 64
+
+
+class JsonPatchError(ValueError):
+    """A patch could not be applied to the given document."""
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff(old: Any, new: Any, path: str, ops: list[dict[str, Any]]) -> None:
+    if type(old) is not type(new):
+        ops.append({"op": "replace", "path": path, "value": new})
+        return
+
+    if isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(str(key))}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(str(key))}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+        return
+
+    if isinstance(old, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff(old[i], new[i], f"{path}/{i}", ops)
+        # Remove from the end so earlier indices stay valid while applying.
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/-", "value": new[i]})
+        return
+
+    if old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def make_patch(old: Any, new: Any) -> list[dict[str, Any]]:
+    """JSON Patch operations turning `old` into `new` (empty when equal)."""
+    ops: list[dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _parse_pointer(path: str) -> list[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def _list_index(container: list[Any], token: str, *, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def apply_patch(document: Any, patch: list[dict[str, Any]]) -> Any:
+    """Apply `add` / `remove` / `replace` operations to a copy of `document`."""
+    result = copy.deepcopy(document)
+    for op in patch:
+        kind = op.get("op")
+        if kind not in {"add", "remove", "replace"}:
+            raise JsonPatchError(f"Unsupported patch op: {kind!r}")
+        tokens = _parse_pointer(str(op.get("path", "")))
+        if not tokens:
+            if kind == "remove":
+                raise JsonPatchError("Cannot remove the document root")
+            result = copy.deepcopy(op.get("value"))
+            continue
+
+        parent = result
+        for token in tokens[:-1]:
+            try:
+                if isinstance(parent, list):
+                    parent = parent[_list_index(parent, token, allow_end=False)]
+                else:
+                    parent = parent[token]
+            except (KeyError, TypeError) as e:
+                raise JsonPatchError(f"Path not found: {op['path']}") from e
+
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = _list_index(parent, last, allow_end=kind == "add")
+            if kind == "add":
+                parent.insert(index, copy.deepcopy(op.get("value")))
+            elif kind == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op.get("value"))
+        elif isinstance(parent, dict):
+            if kind != "add" and last not in parent:
+                raise JsonPatchError(f"Path not found: {op['path']}")
+            if kind == "remove":
+                del parent[last]
+            else:
+                parent[last] = copy.deepcopy(op.get("value"))
+        else:
+            raise JsonPatchError(f"Path not found: {op['path']}")
+    return result
+
+
+class SnapshotHistory:
+    """Versioned snapshots per key with a bounded history.
+
+    `record` bumps the key's version only when the snapshot actually changed.
+    Versions are strings of the form `<epoch>.<n>`; the epoch is unique per
+    history instance, so a version issued before a server restart never
+    matches a different snapshot afterwards.
+    """
+
+    def __init__(self, *, depth: int = DEFAULT_HISTORY_DEPTH, max_keys: int = DEFAULT_MAX_KEYS) -> None:
+        if depth < 1:
+            raise ValueError("depth must be >= 1")
+        self.depth = depth
+        self.max_keys = max_keys
+        self.epoch = secrets.token_hex(4)
+        self._counters: dict[str, int] = {}
+        self._snapshots: OrderedDict[str, deque[tuple[str, Any]]] = OrderedDict()
+
+    def record(self, key: str, snapshot: Any) -> str:
+        """Store `snapshot` if it differs from the latest one and return its version."""
+        history = self._snapshots.get(key)
+        if history is not None:
+            self._snapshots.move_to_end(key)
+            version, latest = history[-1]
+            if latest == snapshot:
+                return version
+        else:
+            history = deque(maxlen=self.depth)
+            self._snapshots[key] = history
+            while len(self._snapshots) > self.max_keys:
+                self._snapshots.popitem(last=False)
+
+        self._counters[key] = self._counters.get(key, 0) + 1
+        version = f"{self.epoch}.{self._counters[key]}"
+        history.append((version, snapshot))
+        return version
+
+    def get(self, key: str, version: str) -> Any | None:
+        """The snapshot recorded as `version`, or None if it aged out."""
+        for recorded, snapshot in self._snapshots.get(key, ()):
+            if recorded == version:
+                return snapshot
+        return None
+
+    def delta(self, key: str, snapshot: Any, since: str | None = None) -> dict[str, Any]:
+        """
+        Record `snapshot` and describe it relative to `since`.
+
+        Returns `{version, base, patch}` when `since` is still in the history,
+        otherwise `{version, base: None, state}` with the full snapshot.
+        """
+        base = self.get(key, since) if since else None
+        version = self.record(key, snapshot)
+        if base is None:
+            return {"version": version, "base": None, "state": snapshot}
+        return {"version": version, "base": since, "patch": make_patch(base, snapshot)}
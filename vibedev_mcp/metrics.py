@@ -0,0 +1,391 @@
+"""Prometheus text-format metrics for VibeDev, with no external dependencies.
+
+Metric families are registered once at import; `labels()` children are cached,
+so recording on a hot path is a dict lookup plus a few integer adds. `render()`
+produces the text exposition format (version 0.0.4) served at `/metrics`.
+
+Each server worker process keeps its own values; scrape every worker, or
+aggregate with `sum by (...)`.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+# Latency buckets in seconds (request handlers, store calls, gates).
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, child in self._children.items():
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.value)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, n in zip((*self.bounds, float("inf")), child.counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose samples come from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        *,
+        collect: Callable[[], Iterable[tuple[tuple[str, ...], float]]],
+    ) -> None:
+        self.collect = collect
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> None:
+        return None
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in self.collect():
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _register(metric: Any) -> Any:
+    return REGISTRY.register(metric)
+
+
+HTTP_REQUEST_SECONDS: Histogram = _register(Histogram(
+    "vibedev_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+))
+STORE_CALL_SECONDS: Histogram = _register(Histogram(
+    "vibedev_store_call_duration_seconds",
+    "VibeDevStore method latency (count gives calls).",
+    ("method",),
+))
+STORE_CALL_ERRORS: Counter = _register(Counter(
+    "vibedev_store_call_errors_total",
+    "VibeDevStore method calls that raised.",
+    ("method", "error"),
+))
+SQLITE_QUERIES: Counter = _register(Counter(
+    "vibedev_sqlite_queries_total",
+    "SQL statements executed, by leading keyword.",
+    ("kind",),
+))
+SQLITE_BUSY_RETRIES: Counter = _register(Counter(
+    "vibedev_sqlite_busy_retries_total",
+    "Statements retried after SQLITE_BUSY.",
+))
+GATE_SECONDS: Histogram = _register(Histogram(
+    "vibedev_gate_duration_seconds",
+    "Gate evaluation time by gate type and outcome.",
+    ("gate_type", "passed"),
+))
+SUBPROCESS_SPAWNS: Counter = _register(Counter(
+    "vibedev_subprocess_spawns_total",
+    "Child processes started (git, shell gates).",
+    ("kind",),
+))
+SINGLEFLIGHT_CALLS: Counter = _register(Counter(
+    "vibedev_singleflight_calls_total",
+    "Coalesced reads: `leader` computed, `shared` joined an in-flight computation.",
+    ("route", "role"),
+))
+RATE_LIMITED: Counter = _register(Counter(
+    "vibedev_rate_limited_total",
+    "Requests refused with 429, by limiter (client, job, subprocess).",
+    ("scope",),
+))
+EVENTS_PUBLISHED: Counter = _register(Counter(
+    "vibedev_events_published_total",
+    "Store change events published to the in-process bus.",
+    ("event_type",),
+))
+
+
+def _sse_samples(key: str) -> Callable[[], list[tuple[tuple[str, ...], float]]]:
+    def collect() -> list[tuple[tuple[str, ...], float]]:
+        from vibedev_mcp.events import get_event_manager
+
+        return [((), float(get_event_manager().stats()[key]))]
+
+    return collect
+
+
+for _key, _doc in (
+    ("subscribers", "Open event subscriptions (SSE, events-poll, WebSocket)."),
+    ("queue_depth_total", "Events queued across all subscriptions."),
+    ("max_lag", "Deepest subscriber queue."),
+    ("bytes_sent_total", "Bytes written to event stream clients."),
+    ("dropped_total", "Events dropped by subscriber overflow policies."),
+    ("disconnected_total", "Subscribers disconnected as slow consumers."),
+    ("rejected_total", "Subscriptions refused by connection caps."),
+    ("reaped_total", "Subscriptions closed as idle."),
+):
+    _register(Gauge(f"vibedev_sse_{_key}", _doc, collect=_sse_samples(_key)))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# Gate types implemented by the store and `vibedev_mcp.gates`. Gate configs are
+# user input, so anything else is recorded as "other" to keep label values bounded.
+GATE_TYPES = frozenset({
+    "changed_files_allowlist",
+    "changed_files_minimum",
+    "command_exit_0",
+    "command_output_contains",
+    "command_output_regex",
+    "criteria_checklist_complete",
+    "diff_max_lines",
+    "diff_min_lines",
+    "evidence_bool_true",
+    "file_exists",
+    "file_not_exists",
+    "forbid_paths",
+    "human_approval",
+    "json_schema_valid",
+    "lint_passed",
+    "no_uncommitted_changes",
+    "patch_applies_cleanly",
+    "tests_passed",
+})
+
+
+def gate_type_label(gate_type: Any) -> str:
+    return gate_type if gate_type in GATE_TYPES else "other"
+
+
+def count_query(sql: str) -> None:
+    keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if keyword not in {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "WITH"}:
+        keyword = "OTHER"
+    SQLITE_QUERIES.labels(keyword.lower()).inc()
+
+
+class GateTimer:
+    """Times consecutive gates in an evaluation loop.
+
+    `start` closes the previous gate, so loops that `continue` out of a gate
+    still record it; `failures` is the running failure count, and a gate
+    passed if it did not add to it.
+    """
+
+    __slots__ = ("_current",)
+
+    def __init__(self) -> None:
+        self._current: tuple[str, int, float] | None = None
+
+    def start(self, gate_type: Any, failures: int) -> None:
+        self.stop(failures)
+        self._current = (gate_type_label(gate_type), failures, time.perf_counter())
+
+    def stop(self, failures: int) -> None:
+        if self._current is None:
+            return
+        gate_type, before, started = self._current
+        self._current = None
+        GATE_SECONDS.labels(gate_type, "true" if failures == before else "false").observe(
+            time.perf_counter() - started
+        )
+
+
+def instrument_methods(cls: type, *, exclude: Iterable[str] = ()) -> type:
+    """Wrap `cls`'s public coroutine methods to record STORE_CALL_SECONDS."""
+    skip = set(exclude)
+    for name, attr in list(vars(cls).items()):
+        if isinstance(attr, (classmethod, staticmethod)):
+            continue
+        if name.startswith("_") or name in skip or not inspect.iscoroutinefunction(attr):
+            continue
+        setattr(cls, name, _timed(attr, STORE_CALL_SECONDS.labels(name), name))
+    return cls
+
+
+def _timed(method: Callable[..., Any], child: _HistogramChild, name: str) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception as e:
+            STORE_CALL_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            child.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP_REQUEST_SECONDS per route template.
+
+    Unmatched paths share one `route` label so URLs cannot blow up cardinality.
+    Streaming responses are timed until the stream ends.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], path, status).observe(time.perf_counter() - started)
@@ -0,0 +1,196 @@
+"""Rate limiting and admission control for expensive HTTP endpoints.
+
+Repo scans, git commands, exports and gate-running step submissions can each
+take seconds of CPU or subprocess time. `AdmissionController` puts two token
+buckets in front of them (one per client address, one per job) and caps how
+many subprocess-spawning requests run at once; callers that do not get in
+are told when to retry (`RateLimited.retry_after`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from vibedev_mcp import metrics
+
+# Defaults (0 disables the limit); see AdmissionController.from_env.
+DEFAULT_CLIENT_RATE = 5.0
+DEFAULT_CLIENT_BURST = 30
+DEFAULT_JOB_RATE = 2.0
+DEFAULT_JOB_BURST = 20
+DEFAULT_SUBPROCESS_CONCURRENCY = max(2, os.cpu_count() or 1)
+# How long a request may queue for a subprocess slot before it is turned away.
+DEFAULT_SUBPROCESS_WAIT_S = 10.0
+# Buckets kept per limiter; the least recently used are forgotten (a forgotten
+# bucket comes back full, which only ever errs on the side of admitting).
+MAX_TRACKED_KEYS = 10_000
+
+
+class RateLimited(Exception):
+    """Request refused by a limiter; retry after `retry_after` seconds."""
+
+    def __init__(self, scope: str, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded ({scope}); retry in {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """`burst` tokens, refilled at `rate` per second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consume a token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets keyed by an arbitrary string (client address, job id)."""
+
+    def __init__(self, rate: float, burst: int, *, max_keys: int = MAX_TRACKED_KEYS) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def check(self, key: str, now: float | None = None) -> float:
+        """0 if `key` may proceed, else seconds to wait."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.take(now)
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate_per_s": self.rate,
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "allowed_total": self.allowed,
+            "rejected_total": self.rejected,
+        }
+
+
+class AdmissionController:
+    """Per-client and per-job rate limits plus a global subprocess concurrency cap."""
+
+    def __init__(
+        self,
+        *,
+        client_rate: float = DEFAULT_CLIENT_RATE,
+        client_burst: int = DEFAULT_CLIENT_BURST,
+        job_rate: float = DEFAULT_JOB_RATE,
+        job_burst: int = DEFAULT_JOB_BURST,
+        subprocess_concurrency: int = DEFAULT_SUBPROCESS_CONCURRENCY,
+        subprocess_wait: float = DEFAULT_SUBPROCESS_WAIT_S,
+    ) -> None:
+        self.clients = RateLimiter(client_rate, client_burst)
+        self.jobs = RateLimiter(job_rate, job_burst)
+        self.subprocess_concurrency = subprocess_concurrency
+        self.subprocess_wait = subprocess_wait
+        self._slots = asyncio.Semaphore(subprocess_concurrency) if subprocess_concurrency > 0 else None
+        self.subprocess_running = 0
+        self.subprocess_waiting = 0
+        self.subprocess_rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        env = os.environ.get
+        return cls(
+            client_rate=float(env("VIBEDEV_RATE_CLIENT", str(DEFAULT_CLIENT_RATE))),
+            client_burst=int(env("VIBEDEV_RATE_CLIENT_BURST", str(DEFAULT_CLIENT_BURST))),
+            job_rate=float(env("VIBEDEV_RATE_JOB", str(DEFAULT_JOB_RATE))),
+            job_burst=int(env("VIBEDEV_RATE_JOB_BURST", str(DEFAULT_JOB_BURST))),
+            subprocess_concurrency=int(
+                env("VIBEDEV_SUBPROCESS_CONCURRENCY", str(DEFAULT_SUBPROCESS_CONCURRENCY))
+            ),
+            subprocess_wait=float(env("VIBEDEV_SUBPROCESS_WAIT", str(DEFAULT_SUBPROCESS_WAIT_S))),
+        )
+
+    def admit(self, client: str | None, job_id: str | None) -> None:
+        """Charge one request to the client's and the job's buckets, or raise RateLimited."""
+        for scope, limiter, key in (("client", self.clients, client), ("job", self.jobs, job_id)):
+            if key is None:
+                continue
+            wait = limiter.check(key)
+            if wait:
+                metrics.RATE_LIMITED.labels(scope).inc()
+                raise RateLimited(scope, wait)
+
+    @asynccontextmanager
+    async def subprocess_slot(self) -> AsyncIterator[None]:
+        """Hold one of the subprocess slots, waiting up to `subprocess_wait` seconds for it."""
+        if self._slots is None:
+            yield
+            return
+        if self._slots.locked():
+            self.subprocess_waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.subprocess_wait)
+            except asyncio.TimeoutError:
+                self.subprocess_rejected += 1
+                metrics.RATE_LIMITED.labels("subprocess").inc()
+                raise RateLimited("subprocess", 1.0) from None
+            finally:
+                self.subprocess_waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.subprocess_running += 1
+        try:
+            yield
+        finally:
+            self.subprocess_running -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "client": self.clients.stats(),
+            "job": self.jobs.stats(),
+            "subprocess": {
+                "concurrency": self.subprocess_concurrency,
+                "wait_s": self.subprocess_wait,
+                "running": self.subprocess_running,
+                "waiting": self.subprocess_waiting,
+                "rejected_total": self.subprocess_rejected,
+            },
+        }
+
+
+def retry_after_header(retry_after: float) -> str:
+    """Whole seconds for the Retry-After header (at least 1)."""
+    return str(max(1, math.ceil(retry_after)))
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import ast
+import hashlib
+import math
 import os
+import posixpath
 import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Iterable
 
+from vibedev_mcp import metrics
 
 
 DEFAULT_IGNORE_DIRS = {
@@ -74,6 +83,40 @@ def snapshot_file_tree(
     return "\n".join(lines), key_files
 
 
+_STALE_TOKENS = {
+    "backup": "Filename suggests backup/copy artifact.",
+    "bak": "Filename suggests backup/copy artifact.",
+    "copy": "Filename suggests duplicated copy.",
+    "old": "Filename suggests legacy/old artifact.",
+    "orig": "Filename suggests merge/patch leftover.",
+    "deprecated": "Filename suggests deprecated artifact.",
+}
+_STALE_EXTENSIONS = {
+    ".bak": "Backup extension.",
+    ".tmp": "Temporary file extension.",
+    ".orig": "Merge/patch leftover extension.",
+    ".rej": "Rejected patch hunk.",
+    ".swp": "Editor swap file.",
+}
+_RE_NAME_TOKENS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def _stale_reason(fname: str) -> str | None:
+    if fname.endswith("~"):
+        return "Editor backup suffix."
+    lower = fname.lower()
+    for ext, why in _STALE_EXTENSIONS.items():
+        if lower.endswith(ext):
+            return why
+    # Whole-word tokens only: `old_config.py` and `fooCopy.ts` match, `folder.py` does not.
+    stem = fname.split(".", 1)[0] if not fname.startswith(".") else fname[1:]
+    for token in _RE_NAME_TOKENS.findall(stem):
+        why = _STALE_TOKENS.get(token.lower())
+        if why is not None:
+            return why
+    return None
+
+
 def find_stale_candidates(
     repo_root: str | Path,
     *,
@@ -83,31 +126,17 @@ def find_stale_candidates(
     """
     Heuristic "stale/bloat" detection.
 
-    This is intentionally conservative: it only flags obvious candidates by filename patterns.
+    This is intentionally conservative: it only flags obvious candidates by filename
+    patterns, matching whole name tokens rather than raw substrings.
     """
     root = Path(repo_root).resolve()
     ignores = DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs
 
-    patterns = [
-        ("backup", "Filename suggests backup/copy artifact."),
-        ("copy", "Filename suggests duplicated copy."),
-        ("old", "Filename suggests legacy/old artifact."),
-        ("deprecated", "Filename suggests deprecated artifact."),
-        (".bak", "Backup extension."),
-        (".tmp", "Temporary file extension."),
-        ("~", "Editor backup suffix."),
-    ]
-
     out: list[dict[str, str]] = []
     for dirpath, dirnames, filenames in os.walk(root):
         dirnames[:] = [d for d in dirnames if d not in ignores]
         for fname in filenames:
-            lower = fname.lower()
-            reason = None
-            for needle, why in patterns:
-                if needle in lower:
-                    reason = why
-                    break
+            reason = _stale_reason(fname)
             if reason is None:
                 continue
             rel = (Path(dirpath) / fname).resolve().relative_to(root)
@@ -169,3 +198,747 @@ def analyze_dependencies(
                 dependencies[rel_path] = sorted(list(deps))
 
     return dependencies
+
+
+def file_tree_paths(file_tree: str) -> list[str]:
+    """
+    Recover repo-relative file paths from a `snapshot_file_tree` rendering.
+
+    Directory lines end with `/` and are indented two spaces per level; files sit
+    one level below their directory. Truncation markers are skipped.
+    """
+    stack: list[str] = []
+    paths: list[str] = []
+    for line in file_tree.splitlines():
+        name = line.lstrip(" ")
+        if not name or name == "." or name.startswith("... "):
+            continue
+        level = (len(line) - len(name)) // 2
+        if name.endswith("/"):
+            stack = stack[: max(level - 1, 0)] + [name[:-1]]
+            continue
+        paths.append("/".join(stack[: max(level - 1, 0)] + [name]))
+    return paths
+
+
+def git_change_counts(repo_root: str | Path, *, max_commits: int = 200) -> dict[str, int]:
+    """
+    Count how often each path changed in the last `max_commits` commits.
+
+    Paths are relative to `repo_root` (even when it is a subdirectory of the
+    worktree). Returns an empty mapping when git is unavailable.
+    """
+    metrics.SUBPROCESS_SPAWNS.labels("git").inc()
+    try:
+        result = subprocess.run(
+            ["git", "log", f"-{max_commits}", "--relative", "--name-only", "--pretty=format:"],
+            cwd=str(repo_root),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    counts: dict[str, int] = {}
+    for line in result.stdout.splitlines():
+        path = line.strip()
+        if path:
+            counts[path] = counts.get(path, 0) + 1
+    return counts
+
+
+# Safety cap on manifest size; a manifest this long may have been cut short.
+MANIFEST_MAX_ENTRIES = 100_000
+
+
+def _walk_files_sorted(dirpath: str, prefix: str, ignores: set[str]) -> Iterable[tuple[str, os.DirEntry[str]]]:
+    """`(relpath, entry)` for every file under `dirpath`, in plain string order of relpath."""
+    try:
+        with os.scandir(dirpath) as it:
+            children: list[tuple[str, os.DirEntry[str]]] = []
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and entry.is_dir():
+                        continue  # symlinked directory: listed by os.walk as a dir, never descended
+                except OSError:
+                    continue
+                if is_dir and entry.name in ignores:
+                    continue
+                # "/" after directory names makes the depth-first walk match the
+                # order of full paths ("a.txt" < "a/b" < "a0").
+                children.append((entry.name + "/" if is_dir else entry.name, entry))
+    except OSError:
+        return
+    children.sort(key=lambda child: child[0])
+    for key, entry in children:
+        if key.endswith("/"):
+            yield from _walk_files_sorted(entry.path, prefix + key, ignores)
+        else:
+            yield prefix + key, entry
+
+
+def scan_manifest(
+    repo_root: str | Path,
+    *,
+    ignore_dirs: set[str] | None = None,
+    max_entries: int = MANIFEST_MAX_ENTRIES,
+) -> list[list[Any]]:
+    """
+    Full file manifest for a snapshot: `[[relpath, size, mtime_ns], ...]` sorted by path.
+
+    Unlike `snapshot_file_tree` this is not depth- or count-limited (beyond a
+    safety cap), so it can be diffed between snapshots. The tree is walked in
+    path order, so a capped manifest is always the first `max_entries` paths,
+    whatever order the filesystem lists directories in.
+    """
+    root = Path(repo_root).resolve()
+    ignores = DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs
+    entries: list[list[Any]] = []
+    for rel, entry in _walk_files_sorted(str(root), "", ignores):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        entries.append([rel, st.st_size, st.st_mtime_ns])
+        if len(entries) >= max_entries:
+            break
+    return entries
+
+
+def manifest_is_capped(manifest: list[list[Any]], max_entries: int = MANIFEST_MAX_ENTRIES) -> bool:
+    return len(manifest) >= max_entries
+
+
+def diff_manifests(
+    old: list[list[Any]],
+    new: list[list[Any]],
+    *,
+    upto: str | None = None,
+) -> dict[str, list[str]]:
+    """
+    Linear merge of two path-sorted manifests.
+
+    A file counts as modified when its size or mtime changed. Entries may omit
+    size/mtime (legacy snapshots), in which case only added/removed are reported.
+    Pass `upto` to ignore paths after it (see `manifest_is_capped`).
+    """
+    if upto is not None:
+        old = [entry for entry in old if entry[0] <= upto]
+        new = [entry for entry in new if entry[0] <= upto]
+    added: list[str] = []
+    removed: list[str] = []
+    modified: list[str] = []
+    i = j = 0
+    while i < len(old) and j < len(new):
+        a, b = old[i], new[j]
+        if a[0] == b[0]:
+            if len(a) > 1 and len(b) > 1 and a[1:] != b[1:]:
+                modified.append(a[0])
+            i += 1
+            j += 1
+        elif a[0] < b[0]:
+            removed.append(a[0])
+            i += 1
+        else:
+            added.append(b[0])
+            j += 1
+    removed.extend(entry[0] for entry in old[i:])
+    added.extend(entry[0] for entry in new[j:])
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def diff_dependency_edges(
+    old: dict[str, list[str]],
+    new: dict[str, list[str]],
+) -> dict[str, list[dict[str, str]]]:
+    """Linear merge of sorted `(source, import)` edge lists into gained/lost edges."""
+    old_edges = sorted((src, dep) for src, deps in old.items() for dep in deps)
+    new_edges = sorted((src, dep) for src, deps in new.items() for dep in deps)
+    gained: list[dict[str, str]] = []
+    lost: list[dict[str, str]] = []
+    i = j = 0
+    while i < len(old_edges) and j < len(new_edges):
+        a, b = old_edges[i], new_edges[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            lost.append({"from": a[0], "to": a[1]})
+            i += 1
+        else:
+            gained.append({"from": b[0], "to": b[1]})
+            j += 1
+    lost.extend({"from": a[0], "to": a[1]} for a in old_edges[i:])
+    gained.extend({"from": b[0], "to": b[1]} for b in new_edges[j:])
+    return {"gained": gained, "lost": lost}
+
+
+# =============================================================================
+# Repo map ranking + token-budgeted rendering
+# =============================================================================
+
+_JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for code and English prose)."""
+    return (len(text) + 3) // 4
+
+
+def _python_module_index(files: Iterable[str]) -> dict[str, str]:
+    """Map dotted module names (and unambiguous suffixes) to `.py` paths."""
+    full: dict[str, str] = {}
+    suffixes: dict[str, str | None] = {}
+    for path in files:
+        if not path.endswith(".py"):
+            continue
+        parts = path[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        if not parts:
+            continue
+        full.setdefault(".".join(parts), path)
+        # Suffixes let `import pkg.mod` resolve under src/ layouts.
+        for i in range(1, len(parts)):
+            key = ".".join(parts[i:])
+            suffixes[key] = path if key not in suffixes else None
+    index = {k: v for k, v in suffixes.items() if v is not None}
+    index.update(full)
+    return index
+
+
+def _resolve_python_import(name: str, src: str, modules: dict[str, str]) -> str | None:
+    if name.startswith("."):
+        level = len(name) - len(name.lstrip("."))
+        package = src.split("/")[:-1]
+        if level > 1:
+            package = package[: len(package) - (level - 1)]
+        rest = name[level:]
+        name = ".".join(package + ([rest] if rest else []))
+    parts = name.split(".")
+    # `from pkg.mod import thing` captures `pkg.mod`; `import pkg.mod.func` style
+    # references fall back to the longest importable prefix.
+    while parts:
+        target = modules.get(".".join(parts))
+        if target is not None:
+            return target
+        parts.pop()
+    return None
+
+
+def _resolve_js_import(name: str, src: str, files: set[str]) -> str | None:
+    if not name.startswith("."):
+        return None
+    base = posixpath.normpath(posixpath.join(posixpath.dirname(src), name))
+    candidates = [base]
+    candidates.extend(base + ext for ext in _JS_EXTENSIONS)
+    candidates.extend(f"{base}/index{ext}" for ext in _JS_EXTENSIONS)
+    for candidate in candidates:
+        if candidate in files:
+            return candidate
+    return None
+
+
+def resolve_internal_imports(
+    files: Iterable[str],
+    dependencies: dict[str, list[str]],
+) -> dict[str, set[str]]:
+    """
+    Resolve raw import strings from `analyze_dependencies` to repo-internal files.
+
+    Returns `{importer_path: {imported_path, ...}}`; third-party imports are dropped.
+    """
+    file_set = set(files) | set(dependencies)
+    modules = _python_module_index(file_set)
+    edges: dict[str, set[str]] = {}
+    for src, imports in dependencies.items():
+        targets: set[str] = set()
+        for name in imports:
+            if src.endswith(".py"):
+                target = _resolve_python_import(name, src, modules)
+            else:
+                target = _resolve_js_import(name, src, file_set)
+            if target is not None and target != src:
+                targets.add(target)
+        if targets:
+            edges[src] = targets
+    return edges
+
+
+def rank_repo_files(
+    files: Iterable[str],
+    dependencies: dict[str, list[str]],
+    change_counts: dict[str, int] | None = None,
+    *,
+    centrality_weight: float = 0.6,
+) -> list[dict[str, Any]]:
+    """
+    Rank files by import centrality (in-degree) blended with recent churn.
+
+    Both signals are normalized to [0, 1]; churn is log-scaled so one noisy file
+    does not flatten everything else. Ties break by path for stable output.
+    """
+    universe = set(files) | set(dependencies)
+    edges = resolve_internal_imports(universe, dependencies)
+    importers: dict[str, int] = {}
+    for targets in edges.values():
+        for target in targets:
+            importers[target] = importers.get(target, 0) + 1
+
+    churn = {p: n for p, n in (change_counts or {}).items() if p in universe}
+    max_in = max(importers.values(), default=0)
+    max_churn = max(churn.values(), default=0)
+
+    ranked: list[dict[str, Any]] = []
+    for path in universe:
+        in_degree = importers.get(path, 0)
+        changes = churn.get(path, 0)
+        centrality = in_degree / max_in if max_in else 0.0
+        recency = math.log1p(changes) / math.log1p(max_churn) if max_churn else 0.0
+        score = centrality_weight * centrality + (1.0 - centrality_weight) * recency
+        ranked.append(
+            {"path": path, "score": round(score, 4), "importers": in_degree, "changes": changes}
+        )
+    ranked.sort(key=lambda item: (-item["score"], item["path"]))
+    return ranked
+
+
+_RE_PY_SIGNATURE = re.compile(r"^(?:async\s+def|def|class)\s+[^\W_]\w*")
+_RE_JS_SIGNATURE = re.compile(
+    r"^export\s+(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(?:function\*?|class|const|let|var|interface|type|enum)\s+[\w$]+"
+)
+
+
+def extract_signatures(
+    repo_root: str | Path,
+    path: str,
+    *,
+    max_signatures: int = 8,
+    max_length: int = 120,
+) -> list[str]:
+    """
+    Grab top-level definition lines (Python defs/classes, JS/TS exports) from a file.
+
+    Cheap line-based scan intended for repo map rendering, not full parsing.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".py":
+        pattern = _RE_PY_SIGNATURE
+    elif ext in _JS_EXTENSIONS:
+        pattern = _RE_JS_SIGNATURE
+    else:
+        return []
+    try:
+        content = (Path(repo_root) / path).read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return []
+
+    out: list[str] = []
+    for line in content.splitlines():
+        if not pattern.match(line):
+            continue
+        sig = line.rstrip().rstrip("{").rstrip()
+        if ext == ".py":
+            sig = sig.rstrip(":")
+        if len(sig) > max_length:
+            sig = sig[: max_length - 3] + "..."
+        out.append(sig)
+        if len(out) >= max_signatures:
+            break
+    return out
+
+
+def render_repo_map(
+    ranked: list[dict[str, Any]],
+    *,
+    token_budget: int,
+    descriptions: dict[str, str],
+    signatures_for: Callable[[str], list[str]],
+) -> dict[str, Any]:
+    """
+    Pack ranked files (description + signatures) into a markdown map under a token budget.
+
+    Entries that do not fit are skipped so smaller, lower-ranked entries can still
+    use the remaining budget. `signatures_for` is only called for files that made
+    it into the map.
+    """
+    header = f"# Repo Map (ranked, ~{token_budget} token budget)"
+    lines = [header, ""]
+    used = estimate_tokens(header) + 1
+    included = 0
+
+    for item in ranked:
+        remaining = token_budget - used
+        if remaining < 8:
+            break
+        path = item["path"]
+        description = descriptions.get(path)
+        entry = f"- `{path}`" + (f" — {description}" if description else "")
+        cost = estimate_tokens(entry) + 1
+        if cost > remaining:
+            continue
+        lines.append(entry)
+        used += cost
+        included += 1
+        for sig in signatures_for(path):
+            sig_line = f"  - `{sig}`"
+            sig_cost = estimate_tokens(sig_line) + 1
+            if used + sig_cost > token_budget:
+                break
+            lines.append(sig_line)
+            used += sig_cost
+
+    return {
+        "content": "\n".join(lines),
+        "estimated_tokens": used,
+        "files_included": included,
+        "files_ranked": len(ranked),
+    }
+
+
+# =============================================================================
+# Symbol extraction (Python via ast, JS/TS via a line-oriented scanner)
+# =============================================================================
+
+SYMBOL_SOURCE_EXTENSIONS = {".py", *_JS_EXTENSIONS}
+
+
+def scan_source_files(
+    repo_root: str | Path,
+    *,
+    ignore_dirs: set[str] | None = None,
+) -> dict[str, tuple[int, int]]:
+    """Return `{relpath: (size, mtime_ns)}` for files the symbol extractor understands."""
+    root = Path(repo_root).resolve()
+    ignores = DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs
+    out: dict[str, tuple[int, int]] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in ignores]
+        for fname in filenames:
+            if os.path.splitext(fname)[1].lower() not in SYMBOL_SOURCE_EXTENSIONS:
+                continue
+            fpath = Path(dirpath) / fname
+            try:
+                st = fpath.stat()
+            except OSError:
+                continue
+            rel = str(fpath.relative_to(root)).replace("\\", "/")
+            out[rel] = (st.st_size, st.st_mtime_ns)
+    return out
+
+
+def _clip_signature(sig: str, max_length: int = 160) -> str:
+    sig = " ".join(sig.split())
+    return sig if len(sig) <= max_length else sig[: max_length - 3] + "..."
+
+
+def _python_def_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> str:
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    sig = f"{prefix} {node.name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        sig += f" -> {ast.unparse(node.returns)}"
+    return _clip_signature(sig)
+
+
+def _python_class_signature(node: ast.ClassDef) -> str:
+    bases = [ast.unparse(b) for b in node.bases] + [ast.unparse(k) for k in node.keywords]
+    return _clip_signature(f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}")
+
+
+def _extract_python_symbols(text: str) -> list[dict[str, Any]]:
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return []
+
+    out: list[dict[str, Any]] = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            out.append(
+                {"name": node.name, "kind": "function", "line": node.lineno,
+                 "signature": _python_def_signature(node), "parent": None}
+            )
+        elif isinstance(node, ast.ClassDef):
+            out.append(
+                {"name": node.name, "kind": "class", "line": node.lineno,
+                 "signature": _python_class_signature(node), "parent": None}
+            )
+            for member in node.body:
+                if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    out.append(
+                        {"name": member.name, "kind": "method", "line": member.lineno,
+                         "signature": _python_def_signature(member), "parent": node.name}
+                    )
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    out.append(
+                        {"name": target.id, "kind": "variable", "line": node.lineno,
+                         "signature": _clip_signature(ast.get_source_segment(text, node) or target.id),
+                         "parent": None}
+                    )
+    return out
+
+
+_JS_TOP_LEVEL = [
+    (re.compile(r"^(?:export\s+)?(?:default\s+)?(?:async\s+)?function\*?\s+([A-Za-z_$][\w$]*)"), "function"),
+    (re.compile(r"^(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)"), "class"),
+    (re.compile(r"^(?:export\s+)?(?:declare\s+)?interface\s+([A-Za-z_$][\w$]*)"), "interface"),
+    (re.compile(r"^(?:export\s+)?(?:declare\s+)?type\s+([A-Za-z_$][\w$]*)\s*(?:<[^=]*>)?\s*="), "type"),
+    (re.compile(r"^(?:export\s+)?(?:declare\s+)?(?:const\s+)?enum\s+([A-Za-z_$][\w$]*)"), "enum"),
+    (
+        re.compile(
+            r"^(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*(?::[^=]+)?=\s*"
+            r"(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|[A-Za-z_$][\w$]*\s*=>)"
+        ),
+        "function",
+    ),
+    (re.compile(r"^(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)"), "variable"),
+]
+_JS_EXPORT_LIST = re.compile(r"^export\s*(?:type\s*)?\{([^}]*)\}")
+_JS_METHOD = re.compile(
+    r"^\s+(?:(?:public|private|protected|static|async|readonly|override|get|set)\s+)*"
+    r"([A-Za-z_$][\w$]*)\s*(?:<[^>]*>)?\s*\([^)]*\)?\s*(?::[^{]*)?(?:\{\s*\}?)?\s*$"
+)
+_JS_NOT_METHODS = {"if", "for", "while", "switch", "catch", "return", "function", "with", "else"}
+_JS_STRING_OR_COMMENT = re.compile(r"//.*$|'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|`(?:\\.|[^`\\])*`")
+
+
+def _extract_js_symbols(text: str) -> list[dict[str, Any]]:
+    """
+    Line-oriented JS/TS symbol scan.
+
+    Tracks brace depth (ignoring string literals and line comments) so only
+    top-level declarations and direct class members are reported.
+    """
+    out: list[dict[str, Any]] = []
+    depth = 0
+    class_name: str | None = None
+    class_depth = 0
+    in_block_comment = False
+
+    for lineno, raw in enumerate(text.splitlines(), start=1):
+        line = raw
+        if in_block_comment:
+            end = line.find("*/")
+            if end == -1:
+                continue
+            line = line[end + 2 :]
+            in_block_comment = False
+        start = line.find("/*")
+        if start != -1 and line.find("*/", start) == -1:
+            line = line[:start]
+            in_block_comment = True
+
+        if depth == 0:
+            exported = _JS_EXPORT_LIST.match(line)
+            if exported:
+                for item in exported.group(1).split(","):
+                    name = item.split(" as ")[-1].strip()
+                    if name:
+                        out.append({"name": name, "kind": "export", "line": lineno,
+                                    "signature": _clip_signature(line.strip()), "parent": None})
+            else:
+                for pattern, kind in _JS_TOP_LEVEL:
+                    m = pattern.match(line)
+                    if m:
+                        out.append({"name": m.group(1), "kind": kind, "line": lineno,
+                                    "signature": _clip_signature(line.strip().rstrip("{").strip()),
+                                    "parent": None})
+                        if kind == "class":
+                            class_name, class_depth = m.group(1), depth
+                        break
+        elif class_name is not None and depth == class_depth + 1:
+            m = _JS_METHOD.match(line)
+            if m and m.group(1) not in _JS_NOT_METHODS:
+                out.append({"name": m.group(1), "kind": "method", "line": lineno,
+                            "signature": _clip_signature(line.strip().rstrip("{").strip()),
+                            "parent": class_name})
+
+        stripped = _JS_STRING_OR_COMMENT.sub("", line)
+        depth = max(depth + stripped.count("{") - stripped.count("}"), 0)
+        if class_name is not None and depth <= class_depth and "}" in stripped:
+            class_name = None
+    return out
+
+
+def extract_symbols(path: str, text: str) -> list[dict[str, Any]]:
+    """
+    Extract `{name, kind, line, signature, parent}` records from a source file.
+
+    Python uses the stdlib `ast` (module-level functions, classes, methods and
+    assignments). JS/TS uses a lightweight scanner that handles the common
+    declaration forms without a full parser.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".py":
+        return _extract_python_symbols(text)
+    if ext in _JS_EXTENSIONS:
+        return _extract_js_symbols(text)
+    return []
+
+
+# =============================================================================
+# File health scan (duplicates, large files, binaries)
+# =============================================================================
+
+
+# Extensions treated as binary without reading the file; files that are read
+# anyway (size collisions) are also sniffed for NUL bytes.
+_BINARY_EXTENSIONS = {
+    ".bin", ".dat", ".db", ".sqlite", ".sqlite3", ".exe", ".dll", ".so", ".dylib", ".a", ".o", ".obj",
+    ".class", ".jar", ".war", ".pyc", ".pyo", ".whl", ".egg",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar", ".tar",
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tif", ".tiff", ".psd",
+    ".mp3", ".mp4", ".wav", ".ogg", ".flac", ".mov", ".avi", ".mkv", ".webm",
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".wasm",
+}
+
+
+def _read_head(path: Path, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(size)
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_file_health(
+    repo_root: str | Path,
+    *,
+    cache: dict[str, dict[str, Any]] | None = None,
+    time_budget_s: float = 5.0,
+    large_file_bytes: int = 1 << 20,
+    partial_bytes: int = 16 << 10,
+    max_workers: int = 8,
+    max_stale: int = 50,
+    ignore_dirs: set[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Find duplicate, large, binary and stale files in one bounded, parallel pass.
+
+    The walk only stats files. Duplicates use size buckets first, then a hash
+    of the first `partial_bytes` only for size collisions, then a full hash only
+    for partial collisions. Binary files are recognised by extension, and by a
+    NUL byte in any head that is read anyway. Stale-looking names
+    (`find_stale_candidates` rules, up to `max_stale`) come from the same walk.
+    `cache` maps path -> prior record and is trusted while size and mtime are
+    unchanged. Work, including the walk, stops at the time budget; `complete`
+    is False when results may be partial, and `records` then covers only the
+    files reached.
+    """
+    root = Path(repo_root).resolve()
+    ignores = DEFAULT_IGNORE_DIRS if ignore_dirs is None else ignore_dirs
+    cache = cache or {}
+    started = time.monotonic()
+    deadline = started + time_budget_s
+    complete = True
+
+    records: dict[str, dict[str, Any]] = {}
+    stale: list[dict[str, str]] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if time.monotonic() >= deadline:
+            complete = False
+            break
+        dirnames[:] = [d for d in dirnames if d not in ignores]
+        for fname in filenames:
+            fpath = Path(dirpath) / fname
+            try:
+                st = fpath.stat()
+            except OSError:
+                continue
+            rel = str(fpath.relative_to(root)).replace("\\", "/")
+            if len(stale) < max_stale and (reason := _stale_reason(fname)) is not None:
+                stale.append({"path": rel, "reason": reason})
+            prior = cache.get(rel)
+            if prior and prior.get("size") == st.st_size and prior.get("mtime_ns") == st.st_mtime_ns:
+                records[rel] = dict(prior)
+            else:
+                records[rel] = {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "partial_hash": None,
+                    "content_hash": None,
+                    "is_binary": os.path.splitext(fname)[1].lower() in _BINARY_EXTENSIONS,
+                }
+
+    buckets: dict[int, list[str]] = {}
+    for rel, rec in records.items():
+        if rec["size"] > 0:
+            buckets.setdefault(rec["size"], []).append(rel)
+    colliding = {rel for paths in buckets.values() if len(paths) > 1 for rel in paths}
+
+    def head_pass(rel: str) -> None:
+        nonlocal complete
+        if time.monotonic() > deadline:
+            complete = False
+            return
+        rec = records[rel]
+        try:
+            head = _read_head(root / rel, partial_bytes)
+        except OSError:
+            return
+        rec["is_binary"] = bool(rec["is_binary"]) or b"\x00" in head[:8192]
+        rec["partial_hash"] = hashlib.sha1(head).hexdigest()
+        if rec["size"] <= partial_bytes:
+            rec["content_hash"] = rec["partial_hash"]
+
+    def full_pass(rel: str) -> None:
+        nonlocal complete
+        if time.monotonic() > deadline:
+            complete = False
+            return
+        try:
+            records[rel]["content_hash"] = _hash_file(root / rel)
+        except OSError:
+            return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        todo = [rel for rel in colliding if records[rel]["partial_hash"] is None]
+        list(pool.map(head_pass, todo))
+
+        partial_groups: dict[tuple[int, str], list[str]] = {}
+        for rel in colliding:
+            rec = records[rel]
+            if rec["partial_hash"] is not None:
+                partial_groups.setdefault((rec["size"], rec["partial_hash"]), []).append(rel)
+        todo = [
+            rel
+            for paths in partial_groups.values()
+            if len(paths) > 1
+            for rel in paths
+            if records[rel]["content_hash"] is None
+        ]
+        list(pool.map(full_pass, todo))
+
+    groups: dict[str, list[str]] = {}
+    for rel in colliding:
+        digest = records[rel]["content_hash"]
+        if digest is not None:
+            groups.setdefault(digest, []).append(rel)
+    duplicates = sorted(sorted(paths) for paths in groups.values() if len(paths) > 1)
+
+    return {
+        "records": records,
+        "duplicates": duplicates,
+        "large_files": sorted(
+            ({"path": rel, "size": rec["size"]} for rel, rec in records.items() if rec["size"] >= large_file_bytes),
+            key=lambda item: -item["size"],
+        ),
+        "binary_files": sorted(rel for rel, rec in records.items() if rec["is_binary"]),
+        "stale": stale,
+        "complete": complete,
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
@@ -15,7 +15,6 @@ from pydantic import BaseModel, ConfigDict, Field
 from vibedev_mcp.conductor import compute_next_questions
 from vibedev_mcp.models import ModelClaim
 from vibedev_mcp.store import VibeDevStore
-from vibedev_mcp.events import EVENT_JOB_UPDATED, create_job_event, get_event_manager
 from vibedev_mcp.templates import get_template, list_templates
 
 
@@ -695,11 +694,47 @@ async def repo_snapshot(params: RepoSnapshotInput, ctx: Context) -> dict[str, An
     return await store.repo_snapshot(job_id=params.job_id, repo_root=params.repo_root, notes=params.notes)
 
 
+class RepoSnapshotDiffInput(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    job_id: str = Field(..., min_length=1)
+    from_snapshot_id: str | None = Field(default=None, description="Defaults to the snapshot before `to`")
+    to_snapshot_id: str | None = Field(default=None, description="Defaults to the latest snapshot")
+    format: str = Field(default="json", description="json | md")
+    max_items: int = Field(default=200, ge=1, le=5000)
+
+
+@mcp.tool(
+    name="repo_snapshot_diff",
+    annotations={
+        "title": "Diff two repo snapshots (files + import edges)",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def repo_snapshot_diff(params: RepoSnapshotDiffInput, ctx: Context) -> dict[str, Any]:
+    """What changed since the last checkpoint: files added/removed/modified and import edges."""
+    store = ctx.request_context.lifespan_context.store
+    return await store.repo_snapshot_diff(
+        job_id=params.job_id,
+        from_snapshot_id=params.from_snapshot_id,
+        to_snapshot_id=params.to_snapshot_id,
+        format=params.format,
+        max_items=params.max_items,
+    )
+
+
 class RepoFileDescriptionsUpdateInput(BaseModel):
     model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
 
     job_id: str = Field(..., min_length=1)
     updates: dict[str, str] = Field(..., description="Mapping of repo-relative path -> one-line description")
+    validate_paths: bool = Field(
+        default=False,
+        description="Skip paths unknown to the latest repo snapshot (status unknown_path)",
+    )
 
 
 @mcp.tool(
@@ -714,7 +749,11 @@ class RepoFileDescriptionsUpdateInput(BaseModel):
 )
 async def repo_file_descriptions_update(params: RepoFileDescriptionsUpdateInput, ctx: Context) -> dict[str, Any]:
     store = ctx.request_context.lifespan_context.store
-    return await store.repo_file_descriptions_update(job_id=params.job_id, updates=params.updates)
+    return await store.repo_file_descriptions_update(
+        job_id=params.job_id,
+        updates=params.updates,
+        validate_paths=params.validate_paths,
+    )
 
 
 class RepoMapExportInput(BaseModel):
@@ -739,6 +778,68 @@ async def repo_map_export(params: RepoMapExportInput, ctx: Context) -> dict[str,
     return await store.repo_map_export(job_id=params.job_id, format=params.format)
 
 
+class RepoMapRenderInput(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    job_id: str = Field(..., min_length=1)
+    token_budget: int = Field(default=2000, ge=64, le=200_000, description="Approximate token budget")
+    snapshot_id: str | None = Field(default=None, description="Defaults to the latest snapshot")
+
+
+@mcp.tool(
+    name="repo_map_render",
+    annotations={
+        "title": "Render a ranked repo map that fits a token budget",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def repo_map_render(params: RepoMapRenderInput, ctx: Context) -> dict[str, Any]:
+    store = ctx.request_context.lifespan_context.store
+    return await store.repo_map_render(
+        job_id=params.job_id,
+        token_budget=params.token_budget,
+        snapshot_id=params.snapshot_id,
+    )
+
+
+class RepoSymbolSearchInput(BaseModel):
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    job_id: str = Field(..., min_length=1)
+    query: str = Field(..., min_length=1, description="Symbol name or prefix")
+    kind: str | None = Field(
+        default=None,
+        description="function | class | method | variable | interface | type | enum | export",
+    )
+    fuzzy: bool = Field(default=False, description="Match the query as a scattered subsequence")
+    limit: int = Field(default=50, ge=1, le=500)
+
+
+@mcp.tool(
+    name="repo_symbol_search",
+    annotations={
+        "title": "Search the repo symbol index (functions, classes, exports)",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    },
+)
+async def repo_symbol_search(params: RepoSymbolSearchInput, ctx: Context) -> dict[str, Any]:
+    """Locate definitions by name. The index is refreshed by repo_snapshot."""
+    store = ctx.request_context.lifespan_context.store
+    return await store.repo_symbol_search(
+        job_id=params.job_id,
+        query=params.query,
+        kind=params.kind,
+        fuzzy=params.fuzzy,
+        limit=params.limit,
+    )
+
+
 class RepoFindStaleCandidatesInput(BaseModel):
     model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
 
@@ -912,8 +1013,6 @@ async def workflow_unified_set_flow_fields(
         description=params.description,
         global_context=params.global_context,
     )
-    event_manager = get_event_manager()
-    await event_manager.publish(create_job_event(EVENT_JOB_UPDATED, params.job_id))
     return result
 
 
@@ -934,8 +1033,6 @@ class UnifiedWorkflowUpsertStepInput(UnifiedWorkflowPhaseInput):
 async def workflow_unified_upsert_step(params: UnifiedWorkflowUpsertStepInput, ctx: Context) -> dict[str, Any]:
     store = ctx.request_context.lifespan_context.store
     result = await store.unified_workflow_upsert_step(job_id=params.job_id, phase=params.phase, step=params.step)
-    event_manager = get_event_manager()
-    await event_manager.publish(create_job_event(EVENT_JOB_UPDATED, params.job_id))
     return result
 
 
@@ -956,8 +1053,6 @@ class UnifiedWorkflowDeleteStepInput(UnifiedWorkflowPhaseInput):
 async def workflow_unified_delete_step(params: UnifiedWorkflowDeleteStepInput, ctx: Context) -> dict[str, Any]:
     store = ctx.request_context.lifespan_context.store
     result = await store.unified_workflow_delete_step(job_id=params.job_id, phase=params.phase, step_id=params.step_id)
-    event_manager = get_event_manager()
-    await event_manager.publish(create_job_event(EVENT_JOB_UPDATED, params.job_id))
     return result
 
 
@@ -986,8 +1081,6 @@ async def workflow_unified_connect(params: UnifiedWorkflowConnectInput, ctx: Con
         to_step_id=params.to_step_id,
         edge=params.edge,
     )
-    event_manager = get_event_manager()
-    await event_manager.publish(create_job_event(EVENT_JOB_UPDATED, params.job_id))
     return result
 
 
@@ -1325,6 +1418,7 @@ class RepoHygieneSuggestInput(BaseModel):
 
     job_id: str = Field(..., min_length=1)
     max_suggestions: int = Field(default=20, ge=1, le=100)
+    time_budget_s: float = Field(default=5.0, gt=0, le=120, description="Bound on the content-hash scan")
 
 
 @mcp.tool(
@@ -1341,10 +1435,14 @@ async def repo_hygiene_suggest(params: RepoHygieneSuggestInput, ctx: Context) ->
     """
     Analyze the repository and suggest hygiene improvements.
 
-    Returns suggestions for stale files, undescribed files, etc.
+    Returns suggestions for duplicate, stale, large, binary and undescribed files.
     """
     store = ctx.request_context.lifespan_context.store
-    return await store.repo_hygiene_suggest(job_id=params.job_id, max_suggestions=params.max_suggestions)
+    return await store.repo_hygiene_suggest(
+        job_id=params.job_id,
+        max_suggestions=params.max_suggestions,
+        time_budget_s=params.time_budget_s,
+    )
 
 
 def _openapi_main(argv: list[str]) -> int:
@@ -0,0 +1,51 @@
+"""Single-flight coalescing for identical concurrent reads.
+
+Callers that ask for the same key while a computation for it is running await
+that computation instead of starting their own, and all get its result (or its
+exception). Nothing is cached: once the computation finishes the key is free,
+so callers that need fresh data put a version (e.g. the job revision) in the key.
+
+Results are shared objects; callers must not mutate them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from vibedev_mcp import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: tuple[Any, ...], fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return `await fn()`, sharing one in-flight call per `key`.
+
+        `key[0]` labels the `vibedev_singleflight_calls_total` metric. The
+        computation runs in its own task, so a caller that is cancelled (e.g.
+        its client disconnected) does not cancel it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+            role = "leader"
+        else:
+            role = "shared"
+        metrics.SINGLEFLIGHT_CALLS.labels(key[0], role).inc()
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
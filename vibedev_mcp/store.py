@@ -7,22 +7,175 @@ and repository snapshots.
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import fnmatch
 import json
+import os
+import random
 import re
 import secrets
+import sqlite3
 import string
 import subprocess
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable
 
 import aiosqlite
 
-from vibedev_mcp.repo import analyze_dependencies, find_stale_candidates, snapshot_file_tree
+from vibedev_mcp.events import (
+    EVENT_ATTEMPT_SUBMITTED,
+    EVENT_CONTEXT_ADDED,
+    EVENT_CONTEXT_DELETED,
+    EVENT_CONTEXT_UPDATED,
+    EVENT_DEVLOG_APPENDED,
+    EVENT_JOB_CREATED,
+    EVENT_JOB_STATUS_CHANGED,
+    EVENT_JOB_UPDATED,
+    EVENT_MISTAKE_RECORDED,
+    EVENT_STEP_COMPLETED,
+    EVENT_STEP_FAILED,
+    EVENT_STEP_STARTED,
+    SSEEvent,
+    get_event_manager,
+)
+from vibedev_mcp import metrics
+from vibedev_mcp.bundle import BUNDLE_FORMAT, BUNDLE_VERSION
+from vibedev_mcp.jsonpatch import SnapshotHistory
+from vibedev_mcp.repo import (
+    analyze_dependencies,
+    diff_dependency_edges,
+    diff_manifests,
+    extract_signatures,
+    extract_symbols,
+    file_tree_paths,
+    find_stale_candidates,
+    git_change_counts,
+    manifest_is_capped,
+    rank_repo_files,
+    render_repo_map,
+    scan_file_health,
+    scan_manifest,
+    scan_source_files,
+    snapshot_file_tree,
+)
 from vibedev_mcp.templates import CHECKPOINT_STEP_TEMPLATE, list_templates, get_template as get_builtin_template
 
 
+# Event log retention: keep this many most-recent events (pruned every N emits).
+EVENT_LOG_RETENTION = 10_000
+_EVENT_PRUNE_EVERY = 256
+
+# `git status` results are reused for this long while `.git/index` and `.git/HEAD`
+# are unchanged (working-tree edits only show up once the entry expires).
+GIT_STATUS_TTL_S = 2.0
+
+# Tags events written by this process. Every store in a process publishes to the
+# same in-process event manager, so the tailer only forwards foreign events.
+_PROCESS_ORIGIN = f"{os.getpid()}-{secrets.token_hex(4)}"
+
+
+# Several server workers share one database file. busy_timeout makes SQLite wait
+# for the write lock itself; these retries cover what still surfaces as BUSY.
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_BUSY_RETRIES = 5
+_BUSY_BACKOFF_S = 0.05
+
+
+def _is_busy_error(exc: BaseException) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+class _PendingCursor:
+    """Awaitable / async-context result of `_BusyRetryConnection.execute`,
+    mirroring how `aiosqlite.Connection.execute` can be used either way."""
+
+    __slots__ = ("_coro", "_cursor")
+
+    def __init__(self, coro: Awaitable[aiosqlite.Cursor]) -> None:
+        self._coro = coro
+        self._cursor: aiosqlite.Cursor | None = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> aiosqlite.Cursor:
+        self._cursor = await self._coro
+        return self._cursor
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._cursor is not None:
+            await self._cursor.close()
+
+
+class _BusyRetryConnection:
+    """
+    Proxy for `aiosqlite.Connection` that retries statements failing with
+    SQLITE_BUSY ("database is locked") with jittered exponential backoff.
+
+    A statement that fails with BUSY has not run, so re-executing it (or a
+    COMMIT) is safe; `executescript` is not retried because it commits first
+    and may have run part of the script. Everything else is delegated.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection, *, retries: int = SQLITE_BUSY_RETRIES) -> None:
+        self._conn = conn
+        self.retries = retries
+        self.busy_retries = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    async def _retry(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.retries + 1):
+            try:
+                return await operation()
+            except sqlite3.OperationalError as e:
+                if attempt >= self.retries or not _is_busy_error(e):
+                    raise
+                self.busy_retries += 1
+                metrics.SQLITE_BUSY_RETRIES.inc()
+                await asyncio.sleep(_BUSY_BACKOFF_S * (2**attempt) * (0.5 + random.random()))
+
+    def execute(self, sql: str, parameters: Any = None) -> _PendingCursor:
+        metrics.count_query(sql)
+        return _PendingCursor(self._retry(lambda: self._conn.execute(sql, parameters)))
+
+    def executemany(self, sql: str, parameters: Any) -> _PendingCursor:
+        metrics.count_query(sql)
+        return _PendingCursor(self._retry(lambda: self._conn.executemany(sql, parameters)))
+
+    async def commit(self) -> None:
+        await self._retry(self._conn.commit)
+
+
+class _TransactionConnection(_BusyRetryConnection):
+    """Connection for `VibeDevStore.transaction`: store methods' own commits
+    are no-ops, so everything lands in one transaction until `commit_transaction`."""
+
+    async def commit(self) -> None:
+        return None
+
+    async def commit_transaction(self) -> None:
+        await super().commit()
+
+
+class _BufferedPublisher:
+    """Holds a transaction's change events until it commits."""
+
+    def __init__(self) -> None:
+        self.pending: list[SSEEvent] = []
+
+    async def publish(self, event: SSEEvent) -> None:
+        self.pending.append(event)
+
+
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -75,26 +228,267 @@ def _matches_any_glob(path: str, patterns: list[str]) -> bool:
     return any(_glob_to_regex(pattern).match(normalized) for pattern in patterns)
 
 
+
+# Cursor-paginated listings (attempts, devlog, mistakes), newest first, keyed on
+# (timestamp column, id column). `fields` maps each output field to its column;
+# `json` names fields stored as JSON text and their empty default; `default`
+# is the field set returned when the caller does not project.
+_LISTINGS: dict[str, dict[str, Any]] = {
+    "attempts": {
+        "table": "attempts",
+        "ts": "timestamp",
+        "id": "attempt_id",
+        "fields": {
+            "attempt_id": "attempt_id",
+            "job_id": "job_id",
+            "step_id": "step_id",
+            "timestamp": "timestamp",
+            "model_claim": "model_claim",
+            "summary": "summary",
+            "evidence": "evidence_json",
+            "outcome": "outcome",
+            "rejection_reasons": "rejection_reasons_json",
+            "missing_fields": "missing_fields_json",
+            "devlog_line": "devlog_line",
+            "commit_hash": "commit_hash",
+        },
+        "json": {"evidence": "{}", "rejection_reasons": "[]", "missing_fields": "[]"},
+        "default": None,
+    },
+    "devlog": {
+        "table": "logs",
+        "ts": "created_at",
+        "id": "log_id",
+        "fields": {
+            "log_id": "log_id",
+            "log_type": "log_type",
+            "content": "content",
+            "created_at": "created_at",
+            "step_id": "step_id",
+            "commit_hash": "commit_hash",
+        },
+        "json": {},
+        "default": None,
+    },
+    "mistakes": {
+        "table": "mistakes",
+        "ts": "created_at",
+        "id": "mistake_id",
+        "fields": {
+            "mistake_id": "mistake_id",
+            "title": "title",
+            "what_happened": "what_happened",
+            "why": "why",
+            "lesson": "lesson",
+            "avoid_next_time": "avoid_next_time",
+            "tags": "tags_json",
+            "created_at": "created_at",
+            "related_step_id": "related_step_id",
+        },
+        "json": {"tags": "[]"},
+        "default": ("mistake_id", "title", "lesson", "avoid_next_time", "tags", "created_at", "related_step_id"),
+    },
+}
+
+# Rows fetched per round trip when streaming a listing.
+_STREAM_CHUNK = 256
+
+# Tables in a job bundle (vibedev_mcp.bundle), in restore order: parents before
+# children. Repo caches (snapshots, maps, symbols) and the event log are
+# derived state and are not exported.
+_BUNDLE_TABLES: dict[str, str] = {
+    "jobs": "job_id = ?",
+    "steps": "job_id = ?",
+    "attempts": "job_id = ?",
+    "gate_results": "attempt_id IN (SELECT attempt_id FROM attempts WHERE job_id = ?)",
+    "logs": "job_id = ?",
+    "mistakes": "job_id = ?",
+    "context_blocks": "job_id = ?",
+    "job_ui_state": "job_id = ?",
+}
+
+
+def encode_page_cursor(ts: str, row_id: str) -> str:
+    """Opaque `next_cursor` token for the row at (ts, row_id)."""
+    raw = json.dumps([ts, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        if not isinstance(ts, str) or not isinstance(row_id, str):
+            raise TypeError
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return ts, row_id
+
+
+def _listing_query(
+    listing: dict[str, Any],
+    *,
+    filters: dict[str, Any],
+    cursor: str | None,
+    fields: list[str] | tuple[str, ...] | None,
+    ascending: bool = False,
+) -> tuple[str, list[Any], list[str]]:
+    """SQL, parameters and output fields for one listing query (no LIMIT)."""
+    available = listing["fields"]
+    out_fields = list(fields or listing["default"] or available)
+    unknown = [f for f in out_fields if f not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+
+    ts, row_id = listing["ts"], listing["id"]
+    columns = dict.fromkeys([*(available[f] for f in out_fields), ts, row_id])
+    where = [f"{column} = ?" for column in filters]
+    params = list(filters.values())
+    if cursor is not None:
+        where.append(f"({ts}, {row_id}) {'>' if ascending else '<'} (?, ?)")
+        params.extend(decode_page_cursor(cursor))
+    order = "ASC" if ascending else "DESC"
+    sql = (
+        f"SELECT {', '.join(columns)} FROM {listing['table']} WHERE {' AND '.join(where)} "
+        f"ORDER BY {ts} {order}, {row_id} {order}"
+    )
+    return sql, params, out_fields
+
+
+def _listing_item(listing: dict[str, Any], row: Any, out_fields: list[str]) -> dict[str, Any]:
+    item: dict[str, Any] = {}
+    for name in out_fields:
+        value = row[listing["fields"][name]]
+        if name in listing["json"]:
+            value = json.loads(value or listing["json"][name])
+        item[name] = value
+    return item
+
+
+def _git_stat_fingerprint(repo_root: str) -> tuple[Any, ...]:
+    """Cheap change marker for a repo: stat of `.git/index` and `.git/HEAD`."""
+    out: list[Any] = []
+    for name in ("index", "HEAD"):
+        try:
+            st = os.stat(os.path.join(repo_root, ".git", name))
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+def _run_git_status(repo_root: str) -> dict[str, Any]:
+    """`git status --porcelain` parsed into modified/added/deleted (runs in a worker thread)."""
+    try:
+        metrics.SUBPROCESS_SPAWNS.labels("git").inc()
+        result = subprocess.run(
+            ["git", "status", "--porcelain"],
+            cwd=repo_root,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": "git status timed out"}
+    except FileNotFoundError:
+        return {"ok": False, "error": "git not found"}
+    if result.returncode != 0:
+        return {"ok": False, "error": result.stderr}
+
+    lines = result.stdout.splitlines() if result.stdout else []
+    modified: list[str] = []
+    added: list[str] = []
+    deleted: list[str] = []
+
+    for line in lines:
+        if not line or len(line) < 4:
+            continue
+        status = line[:2]
+        path = line[3:]
+        if " -> " in path:
+            _, path = path.split(" -> ", 1)
+        if status == "??":
+            added.append(path)
+        elif "D" in status:
+            deleted.append(path)
+        elif "A" in status:
+            added.append(path)
+        else:
+            modified.append(path)
+
+    return {
+        "ok": True,
+        "clean": len(lines) == 0,
+        "modified": modified,
+        "added": added,
+        "deleted": deleted,
+        "raw": result.stdout,
+    }
+
+
 class VibeDevStore:
     def __init__(self, db_path: Path, conn: aiosqlite.Connection) -> None:
         self._db_path = db_path
         self._conn = conn
+        self.event_retention = EVENT_LOG_RETENTION
+        self._emits_since_prune = 0
+        self.events = get_event_manager()
+        self.origin = _PROCESS_ORIGIN
+        self.ui_history = SnapshotHistory()
+        # repo_root -> (fetched at, .git stat fingerprint, git status result)
+        self._git_status_cache: dict[str, tuple[float, tuple[Any, ...], dict[str, Any]]] = {}
 
     @classmethod
     async def open(cls, db_path: Path) -> "VibeDevStore":
         db_path = Path(db_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        conn = await aiosqlite.connect(db_path)
-        conn.row_factory = aiosqlite.Row
-        await conn.execute("PRAGMA journal_mode = WAL;")
-        await conn.execute("PRAGMA busy_timeout = 5000;")
-        await conn.execute("PRAGMA foreign_keys = ON;")
-
+        conn = await cls._connect(db_path, _BusyRetryConnection)
         store = cls(db_path=db_path, conn=conn)
         await store._init_schema()
         return store
 
+    @staticmethod
+    async def _connect(db_path: Path, wrapper: type[_BusyRetryConnection]) -> _BusyRetryConnection:
+        raw_conn = await aiosqlite.connect(db_path)
+        raw_conn.row_factory = aiosqlite.Row
+        conn = wrapper(raw_conn)
+        # Set the busy timeout first: switching to WAL needs a lock that other
+        # workers opening the same file may briefly hold.
+        await conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS};")
+        await conn.execute("PRAGMA journal_mode = WAL;")
+        await conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["VibeDevStore"]:
+        """
+        A store on its own connection whose writes commit atomically on exit.
+
+        Holds the database write lock from entry (BEGIN IMMEDIATE), so keep the
+        body short. Change events are published only after the commit; on an
+        exception everything is rolled back and no events are sent. Side
+        effects outside SQLite (git, gate subprocesses) are not undone.
+        """
+        conn = await self._connect(self._db_path, _TransactionConnection)
+        tx = type(self)(db_path=self._db_path, conn=conn)
+        tx.events = _BufferedPublisher()
+        tx.ui_history = self.ui_history
+        tx._git_status_cache = self._git_status_cache
+        tx.event_retention = self.event_retention
+        try:
+            await conn.execute("BEGIN IMMEDIATE;")
+            try:
+                yield tx
+            except BaseException:
+                await conn.rollback()
+                raise
+            await conn.commit_transaction()
+            for event in tx.events.pending:
+                await self.events.publish(event)
+        finally:
+            await conn.close()
+
     async def close(self) -> None:
         await self._conn.close()
 
@@ -103,6 +497,141 @@ class VibeDevStore:
         async with self._conn.execute("SELECT 1;") as cursor:
             await cursor.fetchone()
 
+    # =========================================================================
+    # Event log
+    # =========================================================================
+
+    async def _emit(self, event_type: str, job_id: str, **data: Any) -> None:
+        """Record a typed change event with the caller's writes, commit, then publish it.
+
+        Mutating methods leave their writes uncommitted and call this last: the
+        event row, the job's `revision` bump and the change itself land in one
+        commit, so replay (`events_tail`), ETags and revision-keyed caches never
+        disagree with the data. Live subscribers (SSE streams, events-poll) are
+        told only after that commit.
+        """
+        await self._emit_all(job_id, [(event_type, data)])
+
+    async def _emit_all(self, job_id: str, events: list[tuple[str, dict[str, Any]]]) -> None:
+        """`_emit` for several events of one change: one commit, one revision bump."""
+        now = _utc_now_iso()
+        published: list[SSEEvent] = []
+        try:
+            for event_type, data in events:
+                payload = {"job_id": job_id, **data}
+                cursor = await self._conn.execute(
+                    "INSERT INTO events (job_id, event_type, data_json, created_at, origin) VALUES (?, ?, ?, ?, ?);",
+                    (job_id, event_type, json.dumps(payload, default=str), now, self.origin),
+                )
+                published.append(
+                    SSEEvent(
+                        event_type=event_type, data=payload, job_id=job_id, timestamp=now, event_id=cursor.lastrowid
+                    )
+                )
+            await self._conn.execute(
+                "UPDATE jobs SET revision = revision + ? WHERE job_id = ?;",
+                (len(events), job_id),
+            )
+            await self._conn.commit()
+        except BaseException:
+            # Never leave a change pending without its event for a later commit to pick up.
+            await self._conn.rollback()
+            raise
+
+        self._emits_since_prune += 1
+        if self._emits_since_prune >= _EVENT_PRUNE_EVERY:
+            await self.events_prune()
+
+        for event in published:
+            await self.events.publish(event)
+
+    @staticmethod
+    def _event_from_row(row: aiosqlite.Row) -> SSEEvent:
+        return SSEEvent(
+            event_type=row["event_type"],
+            data=json.loads(row["data_json"]),
+            job_id=row["job_id"],
+            timestamp=row["created_at"],
+            event_id=row["event_id"],
+        )
+
+    async def events_replay(
+        self,
+        *,
+        after_id: int,
+        job_id: str | None = None,
+        limit: int = 500,
+    ) -> dict[str, Any]:
+        """
+        Logged events with id > `after_id` (oldest first, at most `limit`).
+
+        `truncated` is True when retention already removed events the caller
+        has not seen, i.e. replay alone cannot bring it up to date.
+        """
+        async with self._conn.execute("SELECT MIN(event_id) AS lo FROM events;") as cursor:
+            row = await cursor.fetchone()
+        oldest = row["lo"] if row else None
+        truncated = oldest is not None and after_id < oldest - 1
+
+        sql = "SELECT * FROM events WHERE event_id > ?"
+        params: list[Any] = [after_id]
+        if job_id:
+            sql += " AND job_id = ?"
+            params.append(job_id)
+        sql += " ORDER BY event_id ASC LIMIT ?;"
+        params.append(limit)
+        async with self._conn.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+
+        return {"events": [self._event_from_row(r) for r in rows], "truncated": truncated}
+
+    async def events_tail(self, *, poll_interval: float = 0.02) -> None:
+        """
+        Forward events committed by other processes to this process's subscribers.
+
+        Runs until cancelled. `PRAGMA data_version` only changes when another
+        connection commits, so idle polling never touches the events table;
+        rows written by this process (same origin) were already published.
+        """
+        async with self._conn.execute("SELECT COALESCE(MAX(event_id), 0) AS hi FROM events;") as cursor:
+            row = await cursor.fetchone()
+        last_id = int(row["hi"])
+        version = await self._data_version()
+        while True:
+            await asyncio.sleep(poll_interval)
+            try:
+                current = await self._data_version()
+                if current == version:
+                    continue
+                version = current
+                async with self._conn.execute(
+                    "SELECT * FROM events WHERE event_id > ? ORDER BY event_id ASC;",
+                    (last_id,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+            except aiosqlite.Error:
+                continue  # e.g. busy; retry on the next tick
+            for row in rows:
+                last_id = row["event_id"]
+                if row["origin"] != self.origin:
+                    await self.events.publish(self._event_from_row(row))
+
+    async def _data_version(self) -> int:
+        async with self._conn.execute("PRAGMA data_version;") as cursor:
+            row = await cursor.fetchone()
+        return int(row[0])
+
+    async def events_prune(self, *, keep: int | None = None) -> int:
+        """Truncate the event log to the `keep` most recent events; returns rows removed."""
+        keep = self.event_retention if keep is None else keep
+        self._emits_since_prune = 0
+        cursor = await self._conn.execute(
+            "DELETE FROM events WHERE event_id <= (SELECT MAX(event_id) FROM events) - ?;",
+            (max(1, keep),),
+        )
+        await self._conn.commit()
+        return cursor.rowcount
+
     async def _init_schema(self) -> None:
         await self._conn.executescript(
             """
@@ -204,6 +733,58 @@ class VibeDevStore:
               FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
             );
 
+            CREATE TABLE IF NOT EXISTS repo_map_renders (
+              snapshot_id TEXT NOT NULL,
+              token_budget INTEGER NOT NULL,
+              entries_stamp TEXT NOT NULL,
+              content TEXT NOT NULL,
+              estimated_tokens INTEGER NOT NULL,
+              files_included INTEGER NOT NULL,
+              files_ranked INTEGER NOT NULL,
+              created_at TEXT NOT NULL,
+              PRIMARY KEY (snapshot_id, token_budget),
+              FOREIGN KEY (snapshot_id) REFERENCES repo_snapshots(snapshot_id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS repo_file_index (
+              job_id TEXT NOT NULL,
+              path TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              mtime_ns INTEGER NOT NULL,
+              indexed_at TEXT NOT NULL,
+              PRIMARY KEY (job_id, path),
+              FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS repo_file_hashes (
+              job_id TEXT NOT NULL,
+              path TEXT NOT NULL,
+              size INTEGER NOT NULL,
+              mtime_ns INTEGER NOT NULL,
+              partial_hash TEXT,
+              content_hash TEXT,
+              is_binary INTEGER,
+              scanned_at TEXT NOT NULL,
+              PRIMARY KEY (job_id, path),
+              FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS repo_symbols (
+              job_id TEXT NOT NULL,
+              path TEXT NOT NULL,
+              name TEXT NOT NULL COLLATE NOCASE,
+              kind TEXT NOT NULL,
+              line INTEGER NOT NULL,
+              signature TEXT NOT NULL,
+              parent TEXT,
+              FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS idx_repo_symbols_name ON repo_symbols(job_id, name);
+            CREATE INDEX IF NOT EXISTS idx_repo_symbols_path ON repo_symbols(job_id, path);
+            CREATE INDEX IF NOT EXISTS idx_attempts_job_time ON attempts(job_id, timestamp, attempt_id);
+            CREATE INDEX IF NOT EXISTS idx_logs_job_time ON logs(job_id, created_at, log_id);
+            CREATE INDEX IF NOT EXISTS idx_mistakes_job_time ON mistakes(job_id, created_at, mistake_id);
+
             CREATE TABLE IF NOT EXISTS templates (
               template_id TEXT PRIMARY KEY,
               title TEXT NOT NULL,
@@ -218,6 +799,16 @@ class VibeDevStore:
               FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE
             );
 
+            CREATE TABLE IF NOT EXISTS events (
+              event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+              job_id TEXT,
+              event_type TEXT NOT NULL,
+              data_json TEXT NOT NULL,
+              created_at TEXT NOT NULL,
+              origin TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_job ON events(job_id, event_id);
+
             CREATE TABLE IF NOT EXISTS gate_results (
               result_id TEXT PRIMARY KEY,
               attempt_id TEXT NOT NULL,
@@ -231,6 +822,9 @@ class VibeDevStore:
             );
             """
         )
+        # Column migrations check-then-ALTER; hold the write lock so server
+        # workers opening the same database concurrently run them one at a time.
+        await self._conn.execute("BEGIN IMMEDIATE;")
         await self._ensure_jobs_columns(
             [
                 ("deliverables_json", "TEXT"),
@@ -241,6 +835,7 @@ class VibeDevStore:
                 ("pending_new_thread", "INTEGER DEFAULT 0"),
                 ("planning_answers_json", "TEXT"),
                 ("failure_reason", "TEXT"),
+                ("revision", "INTEGER NOT NULL DEFAULT 0"),
             ]
         )
         await self._ensure_steps_columns(
@@ -267,6 +862,8 @@ class VibeDevStore:
         await self._ensure_snapshot_columns(
             [
                 ("dependencies_json", "TEXT"),
+                ("change_counts_json", "TEXT"),
+                ("manifest_json", "TEXT"),
             ]
         )
         await self._conn.commit()
@@ -347,7 +944,7 @@ class VibeDevStore:
                 json.dumps({}),
             ),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_CREATED, job_id, title=title, status="PLANNING")
         return job_id
 
     async def get_job(self, job_id: str) -> dict[str, Any]:
@@ -369,6 +966,17 @@ class VibeDevStore:
         data["planning_answers"] = json.loads(data.pop("planning_answers_json") or "{}")
         return data
 
+    async def job_revision(self, job_id: str) -> int:
+        """Monotonic per-job change counter, bumped by every store mutation."""
+        async with self._conn.execute(
+            "SELECT revision FROM jobs WHERE job_id = ?;",
+            (job_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            raise KeyError(f"Unknown job_id: {job_id}")
+        return int(row["revision"])
+
     async def job_update_policies(
         self,
         *,
@@ -387,7 +995,7 @@ class VibeDevStore:
             "UPDATE jobs SET policies_json = ?, updated_at = ? WHERE job_id = ?;",
             (json.dumps(policies), _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="policies", update=update, policies=policies)
         return await self.get_job(job_id)
 
     async def get_gate_results(self, *, attempt_id: str) -> list[dict[str, Any]]:
@@ -423,7 +1031,7 @@ class VibeDevStore:
             "UPDATE jobs SET planning_answers_json = ?, repo_root = ?, updated_at = ? WHERE job_id = ?;",
             (json.dumps(merged), repo_root, _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="planning_answers")
         return merged
 
     async def context_add_block(
@@ -444,7 +1052,14 @@ class VibeDevStore:
             """,
             (context_id, job_id, block_type, content, json.dumps(tags), _utc_now_iso(), step_id),
         )
-        await self._conn.commit()
+        await self._emit(
+            EVENT_CONTEXT_ADDED,
+            job_id,
+            context_id=context_id,
+            block_type=block_type,
+            tags=tags,
+            step_id=step_id,
+        )
         return context_id
 
     async def context_get_block(self, *, job_id: str, context_id: str) -> dict[str, Any]:
@@ -482,7 +1097,13 @@ class VibeDevStore:
             """,
             (next_block_type, next_content, json.dumps(next_tags), job_id, context_id),
         )
-        await self._conn.commit()
+        await self._emit(
+            EVENT_CONTEXT_UPDATED,
+            job_id,
+            context_id=context_id,
+            block_type=next_block_type,
+            tags=next_tags,
+        )
         return await self.context_get_block(job_id=job_id, context_id=context_id)
 
     async def context_delete_block(self, *, job_id: str, context_id: str) -> None:
@@ -493,7 +1114,7 @@ class VibeDevStore:
             "DELETE FROM context_blocks WHERE job_id = ? AND context_id = ?;",
             (job_id, context_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_CONTEXT_DELETED, job_id, context_id=context_id)
 
     async def context_search(self, *, job_id: str, query: str, limit: int = 20) -> list[dict[str, Any]]:
         like = f"%{query}%"
@@ -537,7 +1158,7 @@ class VibeDevStore:
             """,
             (log_id, job_id, log_type, content, _utc_now_iso(), step_id, commit_hash),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_DEVLOG_APPENDED, job_id, log_id=log_id, step_id=step_id, log_type=log_type)
         return log_id
 
     async def mistake_record(
@@ -573,27 +1194,93 @@ class VibeDevStore:
                 related_step_id,
             ),
         )
-        await self._conn.commit()
+        await self._emit(
+            EVENT_MISTAKE_RECORDED,
+            job_id,
+            mistake_id=mistake_id,
+            related_step_id=related_step_id,
+            tags=tags,
+            title=title,
+        )
         return mistake_id
 
+    async def _list_page(
+        self,
+        kind: str,
+        *,
+        filters: dict[str, Any],
+        limit: int,
+        cursor: str | None,
+        fields: list[str] | tuple[str, ...] | None,
+    ) -> dict[str, Any]:
+        """One newest-first page of a `_LISTINGS` table plus the cursor for the next one."""
+        listing = _LISTINGS[kind]
+        sql, params, out_fields = _listing_query(listing, filters=filters, cursor=cursor, fields=fields)
+        async with self._conn.execute(f"{sql} LIMIT ?;", (*params, limit + 1)) as cursor_:
+            rows = await cursor_.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_page_cursor(last[listing["ts"]], last[listing["id"]])
+        return {
+            "entries": [_listing_item(listing, row, out_fields) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    async def _iter_listing(
+        self,
+        kind: str,
+        *,
+        job_id: str,
+        filters: dict[str, Any],
+        cursor: str | None,
+        fields: list[str] | tuple[str, ...] | None,
+        chronological: bool,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Every matching row, fetched `_STREAM_CHUNK` at a time from one DB cursor."""
+        listing = _LISTINGS[kind]
+        sql, params, out_fields = _listing_query(
+            listing, filters=filters, cursor=cursor, fields=fields, ascending=chronological
+        )
+        await self.job_revision(job_id)  # KeyError for unknown jobs, before anything is yielded
+        async with self._conn.execute(f"{sql};", params) as cursor_:
+            while rows := await cursor_.fetchmany(_STREAM_CHUNK):
+                for row in rows:
+                    yield _listing_item(listing, row, out_fields)
+
+    async def mistakes_page(
+        self,
+        *,
+        job_id: str,
+        limit: int = 50,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Newest-first mistakes after `cursor`; returns `{entries, next_cursor}`."""
+        return await self._list_page(
+            "mistakes", filters={"job_id": job_id}, limit=limit, cursor=cursor, fields=fields
+        )
+
     async def mistake_list(self, *, job_id: str, limit: int = 50) -> list[dict[str, Any]]:
-        async with self._conn.execute(
-            """
-            SELECT mistake_id, title, lesson, avoid_next_time, tags_json, created_at, related_step_id
-            FROM mistakes
-            WHERE job_id = ?
-            ORDER BY created_at DESC
-            LIMIT ?;
-            """,
-            (job_id, limit),
-        ) as cursor:
-            rows = await cursor.fetchall()
-        out: list[dict[str, Any]] = []
-        for row in rows:
-            item = dict(row)
-            item["tags"] = json.loads(item.pop("tags_json") or "[]")
-            out.append(item)
-        return out
+        return (await self.mistakes_page(job_id=job_id, limit=limit))["entries"]
+
+    def iter_mistakes(
+        self,
+        *,
+        job_id: str,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+        chronological: bool = False,
+    ) -> AsyncIterator[dict[str, Any]]:
+        return self._iter_listing(
+            "mistakes",
+            job_id=job_id,
+            filters={"job_id": job_id},
+            cursor=cursor,
+            fields=fields,
+            chronological=chronological,
+        )
 
     async def repo_snapshot(
         self,
@@ -605,12 +1292,16 @@ class VibeDevStore:
     ) -> dict[str, Any]:
         file_tree, key_files = snapshot_file_tree(repo_root)
         dependencies = analyze_dependencies(repo_root)
+        change_counts = git_change_counts(repo_root)
+        manifest = scan_manifest(repo_root)
+        symbols = await self.repo_symbols_refresh(job_id=job_id, repo_root=repo_root)
         snapshot_id = _new_id("SNP", length=6)
         await self._conn.execute(
             """
             INSERT INTO repo_snapshots (
-              snapshot_id, job_id, timestamp, repo_root, file_tree, key_files_json, dependencies_json, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+              snapshot_id, job_id, timestamp, repo_root, file_tree, key_files_json, dependencies_json,
+              notes, change_counts_json, manifest_json
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
             """,
             (
                 snapshot_id,
@@ -621,50 +1312,513 @@ class VibeDevStore:
                 json.dumps(key_files),
                 json.dumps(dependencies),
                 notes,
+                json.dumps(change_counts),
+                json.dumps(manifest, separators=(",", ":")),
             ),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="repo_snapshot", snapshot_id=snapshot_id)
         excerpt = "\n".join(file_tree.splitlines()[:200])
         return {
             "snapshot_id": snapshot_id,
             "file_tree_excerpt": excerpt,
             "key_files": key_files,
-            "dependencies": dependencies
+            "dependencies": dependencies,
+            "symbol_index": symbols,
+        }
+
+
+    @staticmethod
+    def _snapshot_manifest(row: aiosqlite.Row) -> list[list[Any]]:
+        """
+        Path-sorted `[[path, size, mtime_ns], ...]` for a snapshot row.
+
+        Snapshots taken before manifests existed fall back to path-only entries
+        recovered from the (capped) file tree and key files.
+        """
+        if row["manifest_json"]:
+            return json.loads(row["manifest_json"])
+        paths = set(file_tree_paths(row["file_tree"]))
+        paths.update(json.loads(row["key_files_json"] or "[]"))
+        return [[path] for path in sorted(paths)]
+
+    async def _repo_known_paths(self, *, job_id: str) -> tuple[str | None, set[str] | None]:
+        """
+        Paths (files and their parent directories) known from the latest snapshot.
+
+        Returns `(None, None)` when the job has no snapshot, i.e. nothing to validate against.
+        """
+        async with self._conn.execute(
+            "SELECT * FROM repo_snapshots WHERE job_id = ? ORDER BY timestamp DESC LIMIT 1;",
+            (job_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None, None
+
+        files = {entry[0] for entry in self._snapshot_manifest(row)}
+        files.update(json.loads(row["dependencies_json"] or "{}"))
+        if not row["manifest_json"]:
+            # Legacy snapshots only carry the capped tree; the source-file index helps.
+            async with self._conn.execute(
+                "SELECT path FROM repo_file_index WHERE job_id = ?;",
+                (job_id,),
+            ) as cursor:
+                files.update([r["path"] async for r in cursor])
+
+        known = set(files)
+        for path in files:
+            parts = path.split("/")[:-1]
+            for i in range(1, len(parts) + 1):
+                known.add("/".join(parts[:i]))
+        return row["snapshot_id"], known
+
+    async def _repo_descriptions_upsert(
+        self,
+        *,
+        job_id: str,
+        items: list[tuple[str, str]],
+        known: set[str] | None,
+    ) -> list[dict[str, str]]:
+        """Classify and write one batch of (path, description) pairs in a single transaction."""
+        normalized: list[tuple[str, str, str]] = []
+        for raw_path, description in items:
+            path = str(raw_path).strip().replace("\\", "/")
+            while path.startswith("./"):
+                path = path[2:]
+            path = path.rstrip("/") or path
+            normalized.append((str(raw_path), path, str(description).strip()))
+
+        # Only look up the rows this batch touches, chunked under SQLite's variable limit.
+        existing: dict[str, str] = {}
+        lookup = sorted({path for _, path, _ in normalized if path})
+        for i in range(0, len(lookup), 500):
+            chunk = lookup[i : i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            async with self._conn.execute(
+                f"SELECT path, description FROM repo_map_entries WHERE job_id = ? AND path IN ({placeholders});",
+                (job_id, *chunk),
+            ) as cursor:
+                existing.update({row["path"]: row["description"] async for row in cursor})
+
+        now = _utc_now_iso()
+        results: list[dict[str, str]] = []
+        rows: list[tuple[str, str, str, str]] = []
+        for raw_path, path, description in normalized:
+            if not path:
+                status = "invalid"
+            elif known is not None and path not in known:
+                status = "unknown_path"
+            elif existing.get(path) == description:
+                status = "unchanged"
+            else:
+                status = "updated" if path in existing else "inserted"
+                existing[path] = description
+                rows.append((job_id, path, description, now))
+            results.append({"path": path or raw_path, "status": status})
+
+        if rows:
+            await self._conn.executemany(
+                """
+                INSERT INTO repo_map_entries (job_id, path, description, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(job_id, path) DO UPDATE SET
+                  description=excluded.description,
+                  updated_at=excluded.updated_at;
+                """,
+                rows,
+            )
+            await self._emit(EVENT_JOB_UPDATED, job_id, change="repo_map", written=len(rows))
+        return results
+
+    async def repo_file_descriptions_update(
+        self,
+        *,
+        job_id: str,
+        updates: dict[str, str],
+        validate_paths: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Bulk upsert repo map descriptions in one transaction.
+
+        With `validate_paths`, paths the latest snapshot does not know about are
+        skipped with status `unknown_path`. Every path gets one of: inserted,
+        updated, unchanged, unknown_path, invalid (empty path). `updated` counts
+        every path whose stored description now matches the request, as it
+        always has; rows that are already up to date are not rewritten.
+        """
+        snapshot_id, known = await self._repo_known_paths(job_id=job_id) if validate_paths else (None, None)
+        results = await self._repo_descriptions_upsert(
+            job_id=job_id,
+            items=list(updates.items()),
+            known=known,
+        )
+        counts: dict[str, int] = {}
+        for item in results:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {
+            "updated": counts.get("inserted", 0) + counts.get("updated", 0) + counts.get("unchanged", 0),
+            "validated_against": snapshot_id,
+            "counts": counts,
+            "results": results,
         }
 
+    async def repo_file_descriptions_stream(
+        self,
+        *,
+        job_id: str,
+        items: AsyncIterator[tuple[str, str]],
+        validate_paths: bool = False,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict[str, str]]:
+        """
+        Streaming variant of `repo_file_descriptions_update` for very large maps.
+
+        `items` is consumed `batch_size` pairs at a time; each batch is written in
+        its own transaction and its per-path results are yielded as soon as it
+        commits, so only one batch is held in memory.
+        """
+        _, known = await self._repo_known_paths(job_id=job_id) if validate_paths else (None, None)
+        batch: list[tuple[str, str]] = []
+        async for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                for result in await self._repo_descriptions_upsert(job_id=job_id, items=batch, known=known):
+                    yield result
+                batch = []
+        if batch:
+            for result in await self._repo_descriptions_upsert(job_id=job_id, items=batch, known=known):
+                yield result
+
+    async def repo_map_export(self, *, job_id: str, format: str = "md") -> dict[str, Any]:
+        async with self._conn.execute(
+            "SELECT path, description, updated_at FROM repo_map_entries WHERE job_id = ? ORDER BY path ASC;",
+            (job_id,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        entries = [dict(r) for r in rows]
+        if format == "json":
+            return {"format": "json", "entries": entries}
+
+        lines = ["# Repo Map", ""]
+        for e in entries:
+            lines.append(f"- `{e['path']}` — {e['description']}")
+        return {"format": "md", "content": "\n".join(lines)}
+
+    async def _get_repo_snapshot_row(self, *, job_id: str, snapshot_id: str | None = None) -> aiosqlite.Row:
+        """Fetch a snapshot row for a job (the latest one when `snapshot_id` is None)."""
+        if snapshot_id is None:
+            sql = "SELECT rowid, * FROM repo_snapshots WHERE job_id = ? ORDER BY timestamp DESC, rowid DESC LIMIT 1;"
+            args: tuple[Any, ...] = (job_id,)
+        else:
+            sql = "SELECT rowid, * FROM repo_snapshots WHERE job_id = ? AND snapshot_id = ?;"
+            args = (job_id, snapshot_id)
+        async with self._conn.execute(sql, args) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            if snapshot_id is not None:
+                raise KeyError(f"Unknown snapshot_id: {snapshot_id}")
+            raise ValueError(f"Job {job_id} has no repo snapshot; call repo_snapshot first")
+        return row
+
+    async def repo_map_render(
+        self,
+        *,
+        job_id: str,
+        token_budget: int = 2000,
+        snapshot_id: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Render a ranked repo map that fits within `token_budget` (estimated tokens).
+
+        Files are ranked by import centrality and recent git churn captured in the
+        snapshot, then packed with their descriptions and top-level signatures.
+        Output is cached per (snapshot, budget) and invalidated when descriptions change.
+        """
+        if token_budget < 1:
+            raise ValueError("token_budget must be positive")
+        snap = await self._get_repo_snapshot_row(job_id=job_id, snapshot_id=snapshot_id)
+        snapshot_id = snap["snapshot_id"]
+
+        async with self._conn.execute(
+            "SELECT path, description, updated_at FROM repo_map_entries WHERE job_id = ?;",
+            (job_id,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        descriptions = {row["path"]: row["description"] for row in rows}
+        entries_stamp = f"{len(rows)}:{max((row['updated_at'] for row in rows), default='')}"
+
+        async with self._conn.execute(
+            "SELECT * FROM repo_map_renders WHERE snapshot_id = ? AND token_budget = ?;",
+            (snapshot_id, token_budget),
+        ) as cursor:
+            cached = await cursor.fetchone()
+        if cached is not None and cached["entries_stamp"] == entries_stamp:
+            return {
+                "snapshot_id": snapshot_id,
+                "token_budget": token_budget,
+                "estimated_tokens": cached["estimated_tokens"],
+                "files_included": cached["files_included"],
+                "files_ranked": cached["files_ranked"],
+                "content": cached["content"],
+                "cached": True,
+            }
+
+        dependencies = json.loads(snap["dependencies_json"] or "{}")
+        change_counts = json.loads(snap["change_counts_json"] or "{}")
+        files = {entry[0] for entry in self._snapshot_manifest(snap)}
+        # Descriptions only annotate files; described directories or since-deleted
+        # paths must not take up budget as entries of their own.
+        async with self._conn.execute(
+            "SELECT path FROM repo_file_index WHERE job_id = ?;",
+            (job_id,),
+        ) as cursor:
+            files.update([row["path"] async for row in cursor])
+        ranked = rank_repo_files(files, dependencies, change_counts)
+
+        signatures: dict[str, list[str]] = {}
+        async with self._conn.execute(
+            """
+            SELECT path, signature FROM repo_symbols
+            WHERE job_id = ? AND kind != 'method' AND name NOT LIKE '\\_%' ESCAPE '\\'
+            ORDER BY path, line;
+            """,
+            (job_id,),
+        ) as cursor:
+            async for row in cursor:
+                signatures.setdefault(row["path"], []).append(row["signature"])
+
+        repo_root = snap["repo_root"]
+
+        def signatures_for(path: str) -> list[str]:
+            # Jobs indexed before the symbol table existed fall back to a disk scan.
+            if signatures:
+                return signatures.get(path, [])[:8]
+            return extract_signatures(repo_root, path)
+
+        rendered = render_repo_map(
+            ranked,
+            token_budget=token_budget,
+            descriptions=descriptions,
+            signatures_for=signatures_for,
+        )
+        await self._conn.execute(
+            """
+            INSERT OR REPLACE INTO repo_map_renders (
+              snapshot_id, token_budget, entries_stamp, content, estimated_tokens,
+              files_included, files_ranked, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+            """,
+            (
+                snapshot_id,
+                token_budget,
+                entries_stamp,
+                rendered["content"],
+                rendered["estimated_tokens"],
+                rendered["files_included"],
+                rendered["files_ranked"],
+                _utc_now_iso(),
+            ),
+        )
+        await self._conn.commit()
+        return {"snapshot_id": snapshot_id, "token_budget": token_budget, **rendered, "cached": False}
+
+    async def repo_snapshot_diff(
+        self,
+        *,
+        job_id: str,
+        from_snapshot_id: str | None = None,
+        to_snapshot_id: str | None = None,
+        format: str = "json",
+        max_items: int = 200,
+    ) -> dict[str, Any]:
+        """
+        Compare two snapshots: files added/removed/modified and import edges gained/lost.
 
-    async def repo_file_descriptions_update(self, *, job_id: str, updates: dict[str, str]) -> dict[str, Any]:
-        now = _utc_now_iso()
-        count = 0
-        for path, description in updates.items():
-            await self._conn.execute(
+        Defaults to the latest snapshot versus the one before it. Both sides are
+        path-sorted, so each comparison is a single linear merge.
+        """
+        to_row = await self._get_repo_snapshot_row(job_id=job_id, snapshot_id=to_snapshot_id)
+        if from_snapshot_id is not None:
+            from_row = await self._get_repo_snapshot_row(job_id=job_id, snapshot_id=from_snapshot_id)
+        else:
+            async with self._conn.execute(
                 """
-                INSERT INTO repo_map_entries (job_id, path, description, updated_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(job_id, path) DO UPDATE SET
-                  description=excluded.description,
-                  updated_at=excluded.updated_at;
+                SELECT rowid, * FROM repo_snapshots
+                WHERE job_id = ? AND (timestamp < ? OR (timestamp = ? AND rowid < ?))
+                ORDER BY timestamp DESC, rowid DESC LIMIT 1;
                 """,
-                (job_id, path, description, now),
+                (job_id, to_row["timestamp"], to_row["timestamp"], to_row["rowid"]),
+            ) as cursor:
+                from_row = await cursor.fetchone()
+            if from_row is None:
+                raise ValueError(f"Snapshot {to_row['snapshot_id']} has no earlier snapshot to diff against")
+
+        old_manifest = self._snapshot_manifest(from_row)
+        new_manifest = self._snapshot_manifest(to_row)
+        # A capped manifest only covers a path-ordered prefix of its tree; compare
+        # the common prefix rather than report everything past the cap as removed/added.
+        capped = manifest_is_capped(old_manifest) or manifest_is_capped(new_manifest)
+        upto = min(m[-1][0] for m in (old_manifest, new_manifest) if m) if capped else None
+        files = diff_manifests(old_manifest, new_manifest, upto=upto)
+        edges = diff_dependency_edges(
+            json.loads(from_row["dependencies_json"] or "{}"),
+            json.loads(to_row["dependencies_json"] or "{}"),
+        )
+        counts = {
+            "added": len(files["added"]),
+            "removed": len(files["removed"]),
+            "modified": len(files["modified"]),
+            "edges_gained": len(edges["gained"]),
+            "edges_lost": len(edges["lost"]),
+        }
+        truncated = any(len(v) > max_items for v in (*files.values(), *edges.values()))
+        out: dict[str, Any] = {
+            "from_snapshot_id": from_row["snapshot_id"],
+            "to_snapshot_id": to_row["snapshot_id"],
+            "from_timestamp": from_row["timestamp"],
+            "to_timestamp": to_row["timestamp"],
+            # Legacy snapshots have no sizes/mtimes, so modifications are invisible.
+            "modified_tracked": bool(from_row["manifest_json"] and to_row["manifest_json"]),
+            # Set when a manifest hit the size cap: paths after this one were not compared.
+            "compared_upto": upto,
+            "counts": counts,
+            "truncated": truncated,
+        }
+        if format == "md":
+            lines = [f"# Repo changes {from_row['snapshot_id']} → {to_row['snapshot_id']}", ""]
+            lines.append(
+                f"{counts['added']} added, {counts['removed']} removed, {counts['modified']} modified; "
+                f"{counts['edges_gained']} import edges gained, {counts['edges_lost']} lost."
             )
-            count += 1
-        await self._conn.commit()
-        return {"updated": count}
+            for label, key in (("Added", "added"), ("Removed", "removed"), ("Modified", "modified")):
+                if files[key]:
+                    lines.extend(["", f"## {label}"])
+                    lines.extend(f"- `{path}`" for path in files[key][:max_items])
+            for label, key in (("Imports gained", "gained"), ("Imports lost", "lost")):
+                if edges[key]:
+                    lines.extend(["", f"## {label}"])
+                    lines.extend(f"- `{e['from']}` → `{e['to']}`" for e in edges[key][:max_items])
+            if truncated:
+                lines.extend(["", f"_Lists truncated to {max_items} items._"])
+            out["format"] = "md"
+            out["content"] = "\n".join(lines)
+            return out
+
+        out["format"] = "json"
+        out["files"] = {k: v[:max_items] for k, v in files.items()}
+        out["dependencies"] = {k: v[:max_items] for k, v in edges.items()}
+        return out
 
-    async def repo_map_export(self, *, job_id: str, format: str = "md") -> dict[str, Any]:
+    async def repo_symbols_refresh(self, *, job_id: str, repo_root: str) -> dict[str, Any]:
+        """
+        Incrementally rebuild the symbol index for a job's repo.
+
+        Only files whose size or mtime changed since the last refresh are re-parsed;
+        files that disappeared have their symbols dropped.
+        """
+        on_disk = scan_source_files(repo_root)
         async with self._conn.execute(
-            "SELECT path, description, updated_at FROM repo_map_entries WHERE job_id = ? ORDER BY path ASC;",
+            "SELECT path, size, mtime_ns FROM repo_file_index WHERE job_id = ?;",
             (job_id,),
         ) as cursor:
-            rows = await cursor.fetchall()
-        entries = [dict(r) for r in rows]
-        if format == "json":
-            return {"format": "json", "entries": entries}
+            indexed = {row["path"]: (row["size"], row["mtime_ns"]) async for row in cursor}
 
-        lines = ["# Repo Map", ""]
-        for e in entries:
-            lines.append(f"- `{e['path']}` — {e['description']}")
-        return {"format": "md", "content": "\n".join(lines)}
+        changed = [path for path, stat in on_disk.items() if indexed.get(path) != stat]
+        removed = [path for path in indexed if path not in on_disk]
+
+        rows: list[tuple[Any, ...]] = []
+        parsed: list[str] = []
+        for path in changed:
+            try:
+                text = (Path(repo_root) / path).read_text(encoding="utf-8", errors="ignore")
+            except OSError:
+                # Leave the index row stale so the next refresh retries this file.
+                continue
+            parsed.append(path)
+            for sym in extract_symbols(path, text):
+                rows.append(
+                    (job_id, path, sym["name"], sym["kind"], sym["line"], sym["signature"], sym["parent"])
+                )
+
+        stale = [(job_id, path) for path in parsed + removed]
+        now = _utc_now_iso()
+        await self._conn.executemany("DELETE FROM repo_symbols WHERE job_id = ? AND path = ?;", stale)
+        await self._conn.executemany(
+            """
+            INSERT INTO repo_symbols (job_id, path, name, kind, line, signature, parent)
+            VALUES (?, ?, ?, ?, ?, ?, ?);
+            """,
+            rows,
+        )
+        await self._conn.executemany(
+            "DELETE FROM repo_file_index WHERE job_id = ? AND path = ?;",
+            [(job_id, path) for path in removed],
+        )
+        await self._conn.executemany(
+            """
+            INSERT INTO repo_file_index (job_id, path, size, mtime_ns, indexed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(job_id, path) DO UPDATE SET
+              size=excluded.size,
+              mtime_ns=excluded.mtime_ns,
+              indexed_at=excluded.indexed_at;
+            """,
+            [(job_id, path, *on_disk[path], now) for path in parsed],
+        )
+        await self._conn.commit()
+        return {
+            "files_scanned": len(on_disk),
+            "files_reindexed": len(parsed),
+            "files_removed": len(removed),
+            "symbols_added": len(rows),
+        }
+
+    async def repo_symbol_search(
+        self,
+        *,
+        job_id: str,
+        query: str,
+        kind: str | None = None,
+        fuzzy: bool = False,
+        limit: int = 50,
+    ) -> dict[str, Any]:
+        """
+        Search the symbol index by name.
+
+        Prefix mode uses the (job_id, name) index. Fuzzy mode matches the query as a
+        case-insensitive subsequence and ranks exact > prefix > substring > scattered.
+        """
+        query = query.strip()
+        if not query:
+            raise ValueError("query must be non-empty")
+
+        def _escape(text: str) -> str:
+            return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+        prefix = _escape(query) + "%"
+        pattern = "%" + "%".join(_escape(ch) for ch in query) + "%" if fuzzy else prefix
+
+        sql = "SELECT path, name, kind, line, signature, parent FROM repo_symbols WHERE job_id = ? AND name LIKE ? ESCAPE '\\'"
+        args: list[Any] = [job_id, pattern]
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        # Rank before LIMIT so exact/prefix hits are never cut off by scattered matches.
+        sql += """
+            ORDER BY
+              CASE
+                WHEN name = ? THEN 0
+                WHEN name LIKE ? ESCAPE '\\' THEN 1
+                WHEN instr(lower(name), lower(?)) > 0 THEN 2
+                ELSE 3
+              END,
+              length(name), path, line
+            LIMIT ?;
+        """
+        args.extend([query, prefix, query, limit])
+        async with self._conn.execute(sql, tuple(args)) as cursor:
+            items = [dict(row) for row in await cursor.fetchall()]
+        return {"query": query, "fuzzy": fuzzy, "count": len(items), "items": items}
 
     async def repo_find_stale_candidates(self, *, job_id: str, max_results: int = 50) -> dict[str, Any]:
         job = await self.get_job(job_id)
@@ -719,33 +1873,169 @@ class VibeDevStore:
 
         return {"format": "json", "job": job, "steps": steps}
 
+    async def job_export_records(self, *, job_id: str) -> AsyncIterator[dict[str, Any]]:
+        """
+        Walk every row of a job as bundle records (see `vibedev_mcp.bundle`).
+
+        Rows are raw table rows, read `_STREAM_CHUNK` at a time, so exporting
+        a large job never holds more than one chunk. All tables are read in
+        one read transaction on a dedicated connection, so writes that land
+        while the bundle streams never split it (WAL readers do not block
+        writers).
+        """
+        conn = await self._connect(self._db_path, _BusyRetryConnection)
+        try:
+            await conn.execute("BEGIN;")
+            # The first read fixes the snapshot; unknown jobs raise KeyError before anything is yielded.
+            async with conn.execute("SELECT 1 FROM jobs WHERE job_id = ?;", (job_id,)) as cursor:
+                if await cursor.fetchone() is None:
+                    raise KeyError(f"Unknown job_id: {job_id}")
+            yield {
+                "type": "header",
+                "format": BUNDLE_FORMAT,
+                "version": BUNDLE_VERSION,
+                "job_id": job_id,
+                "exported_at": _utc_now_iso(),
+            }
+            counts: dict[str, int] = {}
+            for table, where in _BUNDLE_TABLES.items():
+                async with conn.execute(f"SELECT * FROM {table} WHERE {where};", (job_id,)) as cursor:
+                    while rows := await cursor.fetchmany(_STREAM_CHUNK):
+                        counts[table] = counts.get(table, 0) + len(rows)
+                        for row in rows:
+                            yield {"type": "row", "table": table, "row": dict(row)}
+            yield {"type": "end", "counts": counts}
+        finally:
+            await conn.close()
+
+    async def job_import_records(self, records: AsyncIterator[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Restore a job from bundle records, e.g. one exported from another database.
+
+        Rows are inserted in batches as they arrive, inside one `transaction()`
+        that commits only once the `end` record confirms the bundle is
+        complete; anything invalid, truncated or clashing with existing rows
+        rolls the whole import back. Columns this schema does not have are
+        ignored, and columns a row omits take their schema defaults. The write lock is held while records arrive, so feed this
+        from a local file or a request body rather than a slow producer.
+        """
+        header = await anext(records, None)
+        if not header or header.get("type") != "header" or header.get("format") != BUNDLE_FORMAT:
+            raise ValueError("Not a VibeDev job bundle (missing header record)")
+        if not isinstance(header.get("version"), int) or header["version"] > BUNDLE_VERSION:
+            raise ValueError(f"Unsupported bundle version: {header.get('version')!r}")
+        job_id = header.get("job_id")
+        if not isinstance(job_id, str) or not job_id:
+            raise ValueError("Bundle header has no job_id")
+
+        try:
+            async with self.transaction() as tx:
+                counts = await tx._import_bundle_rows(job_id, records)
+                await tx._emit(EVENT_JOB_CREATED, job_id, imported=True)
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Bundle conflicts with existing rows: {e}") from None
+        except sqlite3.OperationalError as e:
+            if _is_busy_error(e):
+                raise
+            raise ValueError(f"Invalid bundle rows: {e}") from None
+        return {"ok": True, "job_id": job_id, "counts": counts}
+
+    async def _import_bundle_rows(self, job_id: str, records: AsyncIterator[dict[str, Any]]) -> dict[str, int]:
+        try:
+            await self.job_revision(job_id)
+        except KeyError:
+            pass
+        else:
+            raise ValueError(f"Job {job_id} already exists")
+
+        columns: dict[str, set[str]] = {}
+        for table in _BUNDLE_TABLES:
+            async with self._conn.execute(f"PRAGMA table_info({table});") as cursor:
+                columns[table] = {row["name"] for row in await cursor.fetchall()}
+
+        counts: dict[str, int] = {}
+        attempt_ids: set[str] = set()
+        # Rows are batched per table and column set, so each INSERT names only
+        # the columns its rows carry and the rest keep their schema defaults.
+        pending: list[dict[str, Any]] = []
+        pending_table = ""
+        pending_names: tuple[str, ...] = ()
+
+        async def flush() -> None:
+            if not pending:
+                return
+            await self._conn.executemany(
+                f"INSERT INTO {pending_table} ({', '.join(pending_names)}) "
+                f"VALUES ({', '.join('?' for _ in pending_names)});",
+                [tuple(row[c] for c in pending_names) for row in pending],
+            )
+            counts[pending_table] = counts.get(pending_table, 0) + len(pending)
+            pending.clear()
+
+        end: dict[str, Any] | None = None
+        async for record in records:
+            kind = record.get("type")
+            if kind == "end":
+                end = record
+                break
+            if kind != "row":
+                raise ValueError(f"Unexpected bundle record type: {kind!r}")
+            table, row = record.get("table"), record.get("row")
+            if table not in _BUNDLE_TABLES or not isinstance(row, dict):
+                raise ValueError(f"Invalid bundle row for table {table!r}")
+            names = tuple(sorted(row.keys() & columns[table]))
+            if not names:
+                raise ValueError(f"Bundle {table} row has no known columns")
+            if any(not (row[c] is None or isinstance(row[c], (str, int, float))) for c in names):
+                raise ValueError(f"Bundle {table} row has a non-scalar value")
+            if "job_id" in columns[table] and row.get("job_id") != job_id:
+                raise ValueError(f"Bundle {table} row belongs to another job")
+            if table == "attempts":
+                attempt_ids.add(row.get("attempt_id"))
+            elif table == "gate_results" and row.get("attempt_id") not in attempt_ids:
+                raise ValueError("Bundle gate_results row belongs to an attempt outside the bundle")
+            if (table, names) != (pending_table, pending_names) or len(pending) >= _STREAM_CHUNK:
+                await flush()
+                pending_table, pending_names = table, names
+            pending.append(row)
+        await flush()
+
+        if end is None:
+            raise ValueError("Truncated bundle (no end record)")
+        if counts.get("jobs") != 1:
+            raise ValueError("Bundle must contain exactly one job")
+        expected = end.get("counts") or {}
+        if any(counts.get(table, 0) != expected.get(table, 0) for table in {*counts, *expected}):
+            raise ValueError(f"Bundle row counts {counts} do not match its end record {expected}")
+        return counts
+
     async def job_archive(self, *, job_id: str) -> None:
         await self._conn.execute(
             "UPDATE jobs SET status = 'ARCHIVED', updated_at = ? WHERE job_id = ?;",
             (_utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="ARCHIVED")
 
     async def plan_set_deliverables(self, job_id: str, deliverables: list[str]) -> None:
         await self._conn.execute(
             "UPDATE jobs SET deliverables_json = ?, updated_at = ? WHERE job_id = ?;",
             (json.dumps(deliverables), _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="deliverables")
 
     async def plan_set_invariants(self, job_id: str, invariants: list[str]) -> None:
         await self._conn.execute(
             "UPDATE jobs SET invariants_json = ?, updated_at = ? WHERE job_id = ?;",
             (json.dumps(invariants), _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="invariants")
 
     async def plan_set_definition_of_done(self, job_id: str, definition_of_done: list[str]) -> None:
         await self._conn.execute(
             "UPDATE jobs SET definition_of_done_json = ?, updated_at = ? WHERE job_id = ?;",
             (json.dumps(definition_of_done), _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="definition_of_done")
 
     async def template_list(self) -> list[dict[str, Any]]:
         builtin = list_templates()
@@ -826,7 +2116,7 @@ class VibeDevStore:
                 "UPDATE jobs SET step_order_json = ?, current_step_index = 0, updated_at = ? WHERE job_id = ?;",
                 (json.dumps([]), _utc_now_iso(), job_id),
             )
-            await self._conn.commit()
+            await self._emit(EVENT_JOB_UPDATED, job_id, change="steps", step_count=0)
             return []
 
         # 1. Get policy to see if we should inject checkpoints.
@@ -897,7 +2187,7 @@ class VibeDevStore:
             "UPDATE jobs SET step_order_json = ?, current_step_index = 0, updated_at = ? WHERE job_id = ?;",
             (json.dumps(step_ids), _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="steps", step_count=len(step_ids))
         return normalized
 
     # =========================================================================
@@ -1212,7 +2502,7 @@ class VibeDevStore:
             "UPDATE jobs SET step_order_json = ?, current_step_index = 0, pending_new_thread = 0, updated_at = ? WHERE job_id = ?;",
             (json.dumps(step_ids), _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="steps", step_count=len(step_ids))
 
         # Persist gate results if any
         if gate_results:
@@ -1286,12 +2576,15 @@ class VibeDevStore:
                 changed_files_from_git = None
 
         failures: list[str] = []
+        timer = metrics.GateTimer()
         for gate in gates:
             if not isinstance(gate, dict):
+                timer.stop(len(failures))
                 failures.append("Gate evaluation failed: invalid gate entry (must be an object).")
                 continue
 
             gate_type = gate.get("type")
+            timer.start(gate_type or "unknown", len(failures))
             params = gate.get("parameters") or {}
 
             if gate_type == "tests_passed":
@@ -1460,6 +2753,7 @@ class VibeDevStore:
                 try:
                     totals: list[int] = []
                     for cmd in (["git", "diff", "--numstat"], ["git", "diff", "--numstat", "--staged"]):
+                        metrics.SUBPROCESS_SPAWNS.labels("git").inc()
                         result = subprocess.run(
                             cmd,
                             cwd=job["repo_root"],
@@ -1499,6 +2793,7 @@ class VibeDevStore:
                     continue
 
                 try:
+                    metrics.SUBPROCESS_SPAWNS.labels("git").inc()
                     result = subprocess.run(
                         ["git", "apply", "--check", "--whitespace=nowarn", "-"],
                         cwd=job["repo_root"],
@@ -1557,6 +2852,7 @@ class VibeDevStore:
 
                 cwd = job.get("repo_root") or None
                 try:
+                    metrics.SUBPROCESS_SPAWNS.labels("shell").inc()
                     result = subprocess.run(
                         command,
                         shell=True,
@@ -1626,6 +2922,7 @@ class VibeDevStore:
                 case_insensitive = params.get("case_insensitive", False)
                 cwd = job.get("repo_root") or None
                 try:
+                    metrics.SUBPROCESS_SPAWNS.labels("shell").inc()
                     result = subprocess.run(
                         command,
                         shell=True,
@@ -1705,6 +3002,7 @@ class VibeDevStore:
 
                 cwd = job.get("repo_root") or None
                 try:
+                    metrics.SUBPROCESS_SPAWNS.labels("shell").inc()
                     result = subprocess.run(
                         command,
                         shell=True,
@@ -1827,6 +3125,7 @@ class VibeDevStore:
             else:
                 failures.append(f"Unknown gate type: {gate_type!r}.")     
 
+        timer.stop(len(failures))
         return failures
 
     async def _persist_gate_results(self, attempt_id: str, gate_results: list[dict[str, Any]]) -> None:
@@ -1873,7 +3172,7 @@ class VibeDevStore:
             "UPDATE jobs SET status = 'READY', updated_at = ? WHERE job_id = ?;",
             (_utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="READY")
         job = await self.get_job(job_id)
         return {"ready": True, "missing": [], "job": job}
 
@@ -1905,7 +3204,7 @@ class VibeDevStore:
                 "UPDATE jobs SET status = 'EXECUTING', updated_at = ? WHERE job_id = ?;",
                 (_utc_now_iso(), job_id),
             )
-            await self._conn.commit()
+            await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="EXECUTING")
 
         return {"ok": True, "job_id": job_id}
 
@@ -1955,7 +3254,7 @@ class VibeDevStore:
             """,
             (run_started_at, job_id, step_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_STEP_STARTED, job_id, step_id=step_id)
 
         required_evidence = {"required": list(step["required_evidence"])}
         invariants = job["invariants"] if job["invariants"] is not None else []
@@ -2351,7 +3650,9 @@ class VibeDevStore:
                     "UPDATE jobs SET current_step_index = ?, pending_new_thread = ?, updated_at = ? WHERE job_id = ?;",
                     (next_idx, pending_new_thread, now, job_id),
                 )
-            await self._conn.commit()
+            # Otherwise the step advance commits with the attempt's events below.
+            if next_action == "JOB_COMPLETE":
+                await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="COMPLETE")
 
             # Record a compact per-step summary for the UI log pane (if provided).
             step_summary = evidence.get("step_summary")
@@ -2377,7 +3678,6 @@ class VibeDevStore:
             "UPDATE steps SET run_state = ? WHERE job_id = ? AND step_id = ?;",
             ("DONE" if accepted else "FAILED", job_id, step_id),
         )
-        await self._conn.commit()
 
         attempt_id = _new_id("ATT", length=6)
         await self._conn.execute(
@@ -2403,7 +3703,20 @@ class VibeDevStore:
                 commit_hash,
             ),
         )
-        await self._conn.commit()
+        await self._emit_all(
+            job_id,
+            [
+                (
+                    EVENT_ATTEMPT_SUBMITTED,
+                    {"step_id": step_id, "attempt_id": attempt_id, "accepted": accepted, "summary": summary},
+                ),
+                (
+                    (EVENT_STEP_COMPLETED, {"step_id": step_id, "next_step_id": next_step_id_for_result})
+                    if accepted
+                    else (EVENT_STEP_FAILED, {"step_id": step_id, "rejection_reasons": rejection_reasons})
+                ),
+            ],
+        )
 
         return {
             "accepted": accepted,
@@ -2455,7 +3768,7 @@ class VibeDevStore:
             "UPDATE steps SET human_approved = 1 WHERE job_id = ? AND step_id = ?;",
             (job_id, step_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="step_approval", step_id=step_id, human_approved=True)
 
         return {"ok": True, "job_id": job_id, "step_id": step_id, "human_approved": True}
 
@@ -2472,48 +3785,52 @@ class VibeDevStore:
             "UPDATE steps SET human_approved = 0 WHERE job_id = ? AND step_id = ?;",
             (job_id, step_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="step_approval", step_id=step_id, human_approved=False)
 
         return {"ok": True, "job_id": job_id, "step_id": step_id, "human_approved": False}
 
+    async def attempts_page(
+        self,
+        *,
+        job_id: str,
+        step_id: str | None = None,
+        limit: int = 20,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Newest-first attempts after `cursor`; returns `{entries, next_cursor}`.
+
+        Leaving `evidence` out of `fields` skips decoding the evidence JSON.
+        """
+        filters = {"job_id": job_id, "step_id": step_id} if step_id else {"job_id": job_id}
+        return await self._list_page("attempts", filters=filters, limit=limit, cursor=cursor, fields=fields)
+
     async def get_attempts(self, job_id: str, step_id: str | None = None, limit: int = 20) -> list[dict[str, Any]]:
         """Get attempts for a job, optionally filtered by step."""
-        if step_id:
-            async with self._conn.execute(
-                """
-                SELECT * FROM attempts
-                WHERE job_id = ? AND step_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?;
-                """,
-                (job_id, step_id, limit),
-            ) as cursor:
-                rows = await cursor.fetchall()
-        else:
-            async with self._conn.execute(
-                """
-                SELECT * FROM attempts
-                WHERE job_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?;
-                """,
-                (job_id, limit),
-            ) as cursor:
-                rows = await cursor.fetchall()
+        return (await self.attempts_page(job_id=job_id, step_id=step_id, limit=limit))["entries"]
 
-        attempts: list[dict[str, Any]] = []
-        for row in rows:
-            attempt = dict(row)
-            attempt["evidence"] = json.loads(attempt.pop("evidence_json") or "{}")
-            attempt["rejection_reasons"] = json.loads(attempt.pop("rejection_reasons_json") or "[]")
-            attempt["missing_fields"] = json.loads(attempt.pop("missing_fields_json") or "[]")
-            attempts.append(attempt)
-        return attempts
-
-    async def get_ui_state(self, job_id: str) -> dict[str, Any]:
+    def iter_attempts(
+        self,
+        *,
+        job_id: str,
+        step_id: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+        chronological: bool = False,
+    ) -> AsyncIterator[dict[str, Any]]:
+        filters = {"job_id": job_id, "step_id": step_id} if step_id else {"job_id": job_id}
+        return self._iter_listing(
+            "attempts", job_id=job_id, filters=filters, cursor=cursor, fields=fields, chronological=chronological
+        )
+
+    async def get_ui_state(self, job_id: str, *, git_state: dict[str, Any] | None = None) -> dict[str, Any]:
         """
         Get complete UI state for a job.
 
+        `git_state` supplies an already fetched `git_status` (e.g. the one an
+        ETag was computed from); otherwise a recent cached one is used.
+
         This is the primary endpoint for the GUI, bundling all relevant
         state into a single response optimized for rendering.
         """
@@ -2568,10 +3885,11 @@ class VibeDevStore:
         repo_map = await self.repo_map_export(job_id=job_id, format="json")
 
         # Get git status if repo exists
-        git_state = None
-        if job.get("repo_root"):
+        if not job.get("repo_root"):
+            git_state = None
+        elif git_state is None:
             try:
-                git_state = await self.git_status(job_id=job_id)
+                git_state = await self.git_status_cached(job_id=job_id)
             except Exception:
                 git_state = {"ok": False, "error": "Could not get git status"}
 
@@ -2638,6 +3956,7 @@ class VibeDevStore:
                 "current_step_index": job.get("current_step_index", 0),
                 "total_steps": len(steps),
                 "failure_reason": job.get("failure_reason"),
+                "revision": job.get("revision", 0),
             },
             "phase": phase_summary,
             "steps": step_statuses,
@@ -2652,6 +3971,18 @@ class VibeDevStore:
             "flow_state": flow_state,
         }
 
+    async def get_ui_state_delta(self, job_id: str, since: str | None = None) -> dict[str, Any]:
+        """
+        UI state as an RFC 6902 JSON Patch against a previously issued version.
+
+        Returns `{version, base, patch}` when `since` is one of the recent
+        versions kept for this job, otherwise `{version, base: None, state}`
+        with the full snapshot. An unchanged state keeps its version and
+        yields an empty patch.
+        """
+        state = await self.get_ui_state(job_id)
+        return self.ui_history.delta(job_id, state, since=since)
+
     async def save_flow_state(self, job_id: str, graph_state: dict[str, Any]) -> None:
         """Save the FlowCanvas graph state."""
         state_json = json.dumps(graph_state)
@@ -2666,7 +3997,7 @@ class VibeDevStore:
             """,
             (job_id, state_json, now),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_UPDATED, job_id, change="flow_state", graph_state_updated=True)
 
     async def get_flow_state(self, job_id: str) -> dict[str, Any] | None:
         """Get the saved FlowCanvas graph state."""
@@ -2885,54 +4216,68 @@ class VibeDevStore:
 
     async def job_export_markdown(self, job_id: str) -> str:
         """Export job history and state to a comprehensive Markdown report."""
+        return "\n".join([line async for line in self.job_export_markdown_lines(job_id)])
+
+    async def job_export_markdown_lines(self, job_id: str) -> AsyncIterator[str]:
+        """`job_export_markdown` line by line; attempts come from one cursor over the job."""
         ui_state = await self.get_ui_state(job_id)
         job = ui_state["job"]
         steps = ui_state["steps"]
         phase = ui_state["phase"]
 
-        md = []
-        md.append(f"# Job Report: {job['title']}")
-        md.append(f"\n**Status:** {job['status']}")
-        md.append(f"\n**Goal:**\n{job['goal']}")
-        
+        yield f"# Job Report: {job['title']}"
+        yield f"\n**Status:** {job['status']}"
+        yield f"\n**Goal:**\n{job['goal']}"
+
         if job.get('repo_root'):
-            md.append(f"\n**Repository:** `{job['repo_root']}`")
+            yield f"\n**Repository:** `{job['repo_root']}`"
 
-        md.append("\n## Policies")
+        yield "\n## Policies"
         policies = job.get('policies', {})
         if policies:
             for k, v in policies.items():
-                md.append(f"- **{k}:** {v}")
+                yield f"- **{k}:** {v}"
         else:
-            md.append("*No specific policies defined.*")
-
-        md.append("\n## Progress")
-        md.append(f"Phase: {phase['current_phase_name']} ({phase['current_phase']}/{phase['total_phases']})")
-        md.append(f"Steps: {ui_state['total_steps']} total")
-
-        md.append("\n## Timeline")
-        for idx, step in enumerate(steps):
-            status_icon = "✅" if step["status"] == "DONE" else "🔄" if step["status"] == "ACTIVE" else "⏳"
-            md.append(f"\n### {idx + 1}. {status_icon} {step['title']}")
-            md.append(f"**Instruction:** {step['instruction_prompt']}")
-            
-            # Get attempts for this step
-            async with self._conn.execute(
-                "SELECT model_claim, summary, evidence_json, accepted, created_at FROM step_attempts WHERE step_id = ? ORDER BY created_at ASC",
-                (step["step_id"],)
-            ) as cursor:
-                attempts = await cursor.fetchall()
-                if attempts:
-                    md.append("\n#### Attempts")
-                    for a_idx, (claim, summary, evidence_json, accepted, created_at) in enumerate(attempts):
-                        acc_str = "✅ Accepted" if accepted else "❌ Rejected"
-                        md.append(f"\n**Attempt {a_idx + 1}** ({created_at}) - *{acc_str}*")
-                        md.append(f"> **Model Claim:** {claim}")
-                        md.append(f"> **Summary:** {summary}")
-                else:
-                    md.append("\n*No attempts yet.*")
+            yield "*No specific policies defined.*"
+
+        yield "\n## Progress"
+        yield f"Phase: {phase['current_phase_name']} ({phase['current_phase']}/{len(phase['phases'])})"
+        yield f"Steps: {job['total_steps']} total"
 
-        return "\n".join(md)
+        yield "\n## Timeline"
+        async with self._conn.execute(
+            """
+            SELECT a.step_id, a.model_claim, a.summary, a.outcome, a.timestamp
+            FROM attempts a JOIN steps s ON s.job_id = a.job_id AND s.step_id = a.step_id
+            WHERE a.job_id = ?
+            ORDER BY s.order_index ASC, a.timestamp ASC;
+            """,
+            (job_id,),
+        ) as cursor:
+            rows: list[Any] = []
+            for idx, step in enumerate(steps):
+                status_icon = "✅" if step["status"] == "DONE" else "🔄" if step["status"] == "ACTIVE" else "⏳"
+                yield f"\n### {idx + 1}. {status_icon} {step['title']}"
+                yield f"**Instruction:** {step['instruction_prompt']}"
+
+                a_idx = 0
+                while True:
+                    if not rows:
+                        rows = list(await cursor.fetchmany(_STREAM_CHUNK))
+                        if not rows:
+                            break
+                    if rows[0]["step_id"] != step["step_id"]:
+                        break
+                    attempt = rows.pop(0)
+                    if a_idx == 0:
+                        yield "\n#### Attempts"
+                    a_idx += 1
+                    acc_str = "✅ Accepted" if attempt["outcome"] == "accepted" else "❌ Rejected"
+                    yield f"\n**Attempt {a_idx}** ({attempt['timestamp']}) - *{acc_str}*"
+                    yield f"> **Model Claim:** {attempt['model_claim']}"
+                    yield f"> **Summary:** {attempt['summary']}"
+                if a_idx == 0:
+                    yield "\n*No attempts yet.*"
 
     # =========================================================================
     # Job Lifecycle Methods
@@ -2948,7 +4293,7 @@ class VibeDevStore:
             "UPDATE jobs SET status = 'PAUSED', updated_at = ? WHERE job_id = ?;",
             (_utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="PAUSED")
         return {"ok": True, "job_id": job_id, "status": "PAUSED"}
 
     async def job_resume(self, job_id: str) -> dict[str, Any]:
@@ -2961,7 +4306,7 @@ class VibeDevStore:
             "UPDATE jobs SET status = 'EXECUTING', updated_at = ? WHERE job_id = ?;",
             (_utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="EXECUTING")
         return {"ok": True, "job_id": job_id, "status": "EXECUTING"}
 
     async def job_fail(self, job_id: str, reason: str) -> dict[str, Any]:
@@ -2974,7 +4319,7 @@ class VibeDevStore:
             "UPDATE jobs SET status = 'FAILED', failure_reason = ?, updated_at = ? WHERE job_id = ?;",
             (reason, _utc_now_iso(), job_id),
         )
-        await self._conn.commit()
+        await self._emit(EVENT_JOB_STATUS_CHANGED, job_id, status="FAILED", reason=reason)
 
         # Record the failure as a mistake entry
         await self.mistake_record(
@@ -3151,6 +4496,19 @@ class VibeDevStore:
     # Devlog Operations
     # =========================================================================
 
+    async def devlog_page(
+        self,
+        *,
+        job_id: str,
+        log_type: str | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Newest-first devlog entries after `cursor`; returns `{entries, next_cursor}`."""
+        filters = {"job_id": job_id, "log_type": log_type} if log_type else {"job_id": job_id}
+        return await self._list_page("devlog", filters=filters, limit=limit, cursor=cursor, fields=fields)
+
     async def devlog_list(
         self,
         *,
@@ -3159,32 +4517,27 @@ class VibeDevStore:
         limit: int = 100,
     ) -> list[dict[str, Any]]:
         """List devlog entries for a job."""
-        if log_type:
-            async with self._conn.execute(
-                """
-                SELECT log_id, log_type, content, created_at, step_id, commit_hash
-                FROM logs
-                WHERE job_id = ? AND log_type = ?
-                ORDER BY created_at DESC
-                LIMIT ?;
-                """,
-                (job_id, log_type, limit),
-            ) as cursor:
-                rows = await cursor.fetchall()
-        else:
-            async with self._conn.execute(
-                """
-                SELECT log_id, log_type, content, created_at, step_id, commit_hash
-                FROM logs
-                WHERE job_id = ?
-                ORDER BY created_at DESC
-                LIMIT ?;
-                """,
-                (job_id, limit),
-            ) as cursor:
-                rows = await cursor.fetchall()
+        return (await self.devlog_page(job_id=job_id, log_type=log_type, limit=limit))["entries"]
+
+    def iter_devlog(
+        self,
+        *,
+        job_id: str,
+        log_type: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+        chronological: bool = False,
+    ) -> AsyncIterator[dict[str, Any]]:
+        filters = {"job_id": job_id, "log_type": log_type} if log_type else {"job_id": job_id}
+        return self._iter_listing(
+            "devlog", job_id=job_id, filters=filters, cursor=cursor, fields=fields, chronological=chronological
+        )
 
-        return [dict(row) for row in rows]
+    @staticmethod
+    def _devlog_markdown_line(log: dict[str, Any]) -> str:
+        step_info = f" [{log['step_id']}]" if log.get("step_id") else ""
+        commit_info = f" ({log['commit_hash'][:8]})" if log.get("commit_hash") else ""
+        return f"- **{log['created_at']}**{step_info}{commit_info}: {log['content']}"
 
     async def devlog_export(
         self,
@@ -3192,7 +4545,7 @@ class VibeDevStore:
         job_id: str,
         format: str = "md",
     ) -> dict[str, Any]:
-        """Export devlog entries for a job."""
+        """Export the latest 1000 devlog entries for a job (see `devlog_export_stream` for all)."""
         logs = await self.devlog_list(job_id=job_id, limit=1000)
         logs.reverse()  # Chronological order
 
@@ -3204,13 +4557,28 @@ class VibeDevStore:
             f"# Dev Log: {job.get('title', '(untitled)')} ({job_id})",
             "",
         ]
-        for log in logs:
-            step_info = f" [{log['step_id']}]" if log.get("step_id") else ""
-            commit_info = f" ({log['commit_hash'][:8]})" if log.get("commit_hash") else ""
-            lines.append(f"- **{log['created_at']}**{step_info}{commit_info}: {log['content']}")
+        lines.extend(self._devlog_markdown_line(log) for log in logs)
 
         return {"format": "md", "content": "\n".join(lines)}
 
+    async def devlog_export_stream(self, *, job_id: str, format: str = "md") -> AsyncIterator[str]:
+        """
+        Every devlog entry of a job in chronological order, one line at a time.
+
+        `format` is "md" (same layout as `devlog_export`) or "ndjson". Rows are
+        read through a DB cursor, so memory stays flat however long the log is.
+        """
+        if format not in ("md", "ndjson"):
+            raise ValueError(f"Unsupported devlog stream format: {format!r} (use 'md' or 'ndjson')")
+        job = await self.get_job(job_id)
+        if format == "md":
+            yield f"# Dev Log: {job.get('title', '(untitled)')} ({job_id})\n\n"
+        async for log in self.iter_devlog(job_id=job_id, chronological=True):
+            if format == "md":
+                yield self._devlog_markdown_line(log) + "\n"
+            else:
+                yield json.dumps(log, ensure_ascii=False) + "\n"
+
     # =========================================================================
     # Git Integration
     # =========================================================================
@@ -3220,52 +4588,40 @@ class VibeDevStore:
         job = await self.get_job(job_id)
         repo_root = job.get("repo_root")
         if not repo_root:
-            raise ValueError(f"Job {job_id} has no repo_root set")        
-
-        try:
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=repo_root,
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if result.returncode != 0:
-                return {"ok": False, "error": result.stderr}
-
-            lines = result.stdout.splitlines() if result.stdout else []
-            modified: list[str] = []
-            added: list[str] = []
-            deleted: list[str] = []
+            raise ValueError(f"Job {job_id} has no repo_root set")
+        fingerprint = _git_stat_fingerprint(repo_root)
+        state = await asyncio.to_thread(_run_git_status, repo_root)
+        self._git_status_cache[repo_root] = (time.monotonic(), fingerprint, state)
+        return state
 
-            for line in lines:
-                if not line or len(line) < 4:
-                    continue
-                status = line[:2]
-                path = line[3:]
-                if " -> " in path:
-                    _, path = path.split(" -> ", 1)
-                if status == "??":
-                    added.append(path)
-                elif "D" in status:
-                    deleted.append(path)
-                elif "A" in status:
-                    added.append(path)
-                else:
-                    modified.append(path)
+    async def git_status_cached(
+        self,
+        *,
+        job_id: str,
+        max_age_s: float = GIT_STATUS_TTL_S,
+        slot: Callable[[], AsyncContextManager[Any]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        `git_status`, reused while younger than `max_age_s` and `.git/index`/`HEAD` are unchanged.
 
-            return {
-                "ok": True,
-                "clean": len(lines) == 0,
-                "modified": modified,
-                "added": added,
-                "deleted": deleted,
-                "raw": result.stdout,
-            }
-        except subprocess.TimeoutExpired:
-            return {"ok": False, "error": "git status timed out"}
-        except FileNotFoundError:
-            return {"ok": False, "error": "git not found"}
+        `slot` (e.g. `AdmissionController.subprocess_slot`) is held only when
+        `git` actually has to run.
+        """
+        job = await self.get_job(job_id)
+        repo_root = job.get("repo_root")
+        if not repo_root:
+            raise ValueError(f"Job {job_id} has no repo_root set")
+        cached = self._git_status_cache.get(repo_root)
+        if (
+            cached is not None
+            and time.monotonic() - cached[0] < max_age_s
+            and cached[1] == _git_stat_fingerprint(repo_root)
+        ):
+            return cached[2]
+        if slot is None:
+            return await self.git_status(job_id=job_id)
+        async with slot():
+            return await self.git_status(job_id=job_id)
 
     async def git_diff_summary(self, *, job_id: str, staged: bool = False) -> dict[str, Any]:
         """Get git diff summary for a job's repo."""
@@ -3279,6 +4635,7 @@ class VibeDevStore:
             if staged:
                 cmd.append("--staged")
 
+            metrics.SUBPROCESS_SPAWNS.labels("git").inc()
             result = subprocess.run(
                 cmd,
                 cwd=repo_root,
@@ -3312,6 +4669,7 @@ class VibeDevStore:
             raise ValueError(f"Job {job_id} has no repo_root set")
 
         try:
+            metrics.SUBPROCESS_SPAWNS.labels("git").inc()
             result = subprocess.run(
                 ["git", "log", f"-{n}", "--oneline"],
                 cwd=repo_root,
@@ -3346,32 +4704,116 @@ class VibeDevStore:
         *,
         job_id: str,
         max_suggestions: int = 20,
+        time_budget_s: float = 5.0,
+        large_file_bytes: int = 1 << 20,
     ) -> dict[str, Any]:
         """
         Suggest repo hygiene improvements.
 
         Returns suggestions for:
+        - Duplicate files (identical content)
         - Stale/backup files
-        - Files without descriptions in repo map
         - Large files
-        - Files not in any import graph (if detectable)
+        - Binary files
+        - Files without descriptions in repo map
         """
         job = await self.get_job(job_id)
         repo_root = job.get("repo_root")
         if not repo_root:
             raise ValueError(f"Job {job_id} has no repo_root set")
 
+        async with self._conn.execute(
+            "SELECT path, size, mtime_ns, partial_hash, content_hash, is_binary FROM repo_file_hashes WHERE job_id = ?;",
+            (job_id,),
+        ) as cursor:
+            cache = {
+                row["path"]: {
+                    "size": row["size"],
+                    "mtime_ns": row["mtime_ns"],
+                    "partial_hash": row["partial_hash"],
+                    "content_hash": row["content_hash"],
+                    "is_binary": None if row["is_binary"] is None else bool(row["is_binary"]),
+                }
+                async for row in cursor
+            }
+        health = await asyncio.to_thread(
+            scan_file_health,
+            repo_root,
+            cache=cache,
+            time_budget_s=time_budget_s,
+            large_file_bytes=large_file_bytes,
+            max_stale=max_suggestions // 2,
+        )
+        records = health["records"]
+        now = _utc_now_iso()
+        if health["complete"]:
+            # A walk cut short by the time budget did not see every file; keep their rows.
+            await self._conn.executemany(
+                "DELETE FROM repo_file_hashes WHERE job_id = ? AND path = ?;",
+                [(job_id, path) for path in cache if path not in records],
+            )
+        await self._conn.executemany(
+            """
+            INSERT INTO repo_file_hashes (
+              job_id, path, size, mtime_ns, partial_hash, content_hash, is_binary, scanned_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id, path) DO UPDATE SET
+              size=excluded.size,
+              mtime_ns=excluded.mtime_ns,
+              partial_hash=excluded.partial_hash,
+              content_hash=excluded.content_hash,
+              is_binary=excluded.is_binary,
+              scanned_at=excluded.scanned_at;
+            """,
+            [
+                (
+                    job_id,
+                    path,
+                    rec["size"],
+                    rec["mtime_ns"],
+                    rec["partial_hash"],
+                    rec["content_hash"],
+                    None if rec["is_binary"] is None else int(rec["is_binary"]),
+                    now,
+                )
+                for path, rec in records.items()
+                if cache.get(path) != rec
+            ],
+        )
+        await self._conn.commit()
+
         suggestions: list[dict[str, str]] = []
 
-        # Get stale candidates
-        stale = find_stale_candidates(repo_root, max_results=max_suggestions // 2)
-        for item in stale:
+        for group in health["duplicates"]:
+            keep, *copies = group
+            for path in copies:
+                suggestions.append({
+                    "type": "duplicate_file",
+                    "path": path,
+                    "suggestion": f"Identical content to `{keep}`; consider removing or deduplicating",
+                })
+
+        for item in health["stale"]:
             suggestions.append({
                 "type": "stale_file",
                 "path": item["path"],
                 "suggestion": f"Consider removing: {item['reason']}",
             })
 
+        for item in health["large_files"]:
+            suggestions.append({
+                "type": "large_file",
+                "path": item["path"],
+                "suggestion": f"Large file ({item['size'] // 1024} KiB); consider Git LFS or excluding it",
+            })
+
+        for path in health["binary_files"]:
+            suggestions.append({
+                "type": "binary_file",
+                "path": path,
+                "suggestion": "Binary file tracked in the repo; confirm it belongs here",
+            })
+
         # Get files without descriptions
         async with self._conn.execute(
             "SELECT path FROM repo_map_entries WHERE job_id = ?;",
@@ -3400,4 +4842,13 @@ class VibeDevStore:
         return {
             "count": len(suggestions),
             "suggestions": suggestions[:max_suggestions],
+            "scan": {
+                "files_scanned": len(records),
+                "complete": health["complete"],
+                "elapsed_ms": health["elapsed_ms"],
+            },
         }
+
+
+# `events_tail` runs for the server's lifetime; its latency is meaningless.
+metrics.instrument_methods(VibeDevStore, exclude=("events_tail",))
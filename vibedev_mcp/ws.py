@@ -0,0 +1,286 @@
+"""WebSocket transport for VibeDev.
+
+One `/api/ws` connection multiplexes event subscriptions and request/response
+calls into the store, so the Studio UI and editor extensions do not pay an
+HTTP round trip per action. Frames are JSON text messages.
+
+Client -> server::
+
+    {"id": 1, "op": "call", "method": "get_ui_state", "params": {"job_id": "JOB-1"}}
+    {"id": 2, "op": "subscribe", "job_id": "JOB-1", "types": [...], "steps": [...],
+     "fields": [...], "last_event_id": 41}
+    {"id": 3, "op": "unsubscribe", "sub": "sub-1"}
+    {"id": 4, "op": "ping"}
+
+Server -> client::
+
+    {"id": 1, "ok": true, "result": {...}}
+    {"id": 1, "ok": false, "error": {"error": "not_found", "detail": "..."}}
+        (error is one of bad_request, not_found, rate_limited [+ retry_after],
+        too_many_subscribers, internal_error)
+    {"type": "event", "sub": "sub-1", "id": 42, "event": {"type": ..., "data": ..., ...}}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+from contextlib import AsyncExitStack
+from typing import Any
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from vibedev_mcp.events import (
+    EVENT_RESYNC,
+    EventFilter,
+    SSEEvent,
+    SubscriberLimitExceeded,
+    Subscription,
+    SubscriptionClosed,
+    get_event_manager,
+)
+from vibedev_mcp.ratelimit import AdmissionController, RateLimited
+from vibedev_mcp.store import VibeDevStore
+
+# Store operations callable over the socket (all take keyword arguments).
+WS_RPC_METHODS = frozenset({
+    "get_job",
+    "job_list",
+    "get_ui_state",
+    "get_ui_state_delta",
+    "get_steps",
+    "get_attempts",
+    "attempts_page",
+    "job_start",
+    "job_pause",
+    "job_resume",
+    "job_next_step_prompt",
+    "job_submit_step_result",
+    "approve_step",
+    "devlog_append",
+    "devlog_list",
+    "devlog_page",
+    "mistake_record",
+    "mistake_list",
+    "mistakes_page",
+    "context_add_block",
+    "context_get_block",
+    "context_search",
+    "repo_map_render",
+    "repo_symbol_search",
+})
+
+# Calls charged to the same admission control as their HTTP counterparts
+# (`rate_limited` / `spawns_subprocesses` in http_server): True also takes a
+# subprocess slot (gates run shell and git commands).
+WS_ADMITTED_METHODS: dict[str, bool] = {
+    "job_submit_step_result": True,
+    "job_start": False,
+    "repo_map_render": False,
+}
+
+_REPLAY_PAGE = 500
+# Idle subscriptions re-mark themselves alive this often (see SSEEventManager.reap_idle).
+_TOUCH_INTERVAL_S = 30.0
+
+
+def _error(kind: str, detail: str) -> dict[str, Any]:
+    return {"error": kind, "detail": detail}
+
+
+class WebSocketSession:
+    """Serves one `/api/ws` connection until the client goes away."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        store: VibeDevStore,
+        limits: AdmissionController | None = None,
+    ) -> None:
+        self.websocket = websocket
+        self.store = store
+        self.limits = limits
+        self._send_lock = asyncio.Lock()
+        self._subscriptions: dict[str, asyncio.Task[None]] = {}
+        self._calls: set[asyncio.Task[None]] = set()
+        self._next_sub = 0
+
+    async def run(self) -> None:
+        await self.websocket.accept()
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("text") is None:
+                    await self._reply(None, error=_error("bad_request", "Binary frames are not supported"))
+                    continue
+                await self._dispatch(message["text"])
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in [*self._subscriptions.values(), *self._calls]:
+                task.cancel()
+            await asyncio.gather(*self._subscriptions.values(), *self._calls, return_exceptions=True)
+
+    async def _send(self, text: str) -> None:
+        async with self._send_lock:
+            await self.websocket.send_text(text)
+
+    async def _reply(self, msg_id: Any, *, result: Any = None, error: dict[str, Any] | None = None) -> None:
+        frame: dict[str, Any] = {"id": msg_id, "ok": error is None}
+        if error is None:
+            frame["result"] = result
+        else:
+            frame["error"] = error
+        await self._send(json.dumps(frame, default=str))
+
+    async def _dispatch(self, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+            if not isinstance(message, dict):
+                raise ValueError("message must be a JSON object")
+        except ValueError as e:
+            await self._reply(None, error=_error("bad_request", f"Invalid frame: {e}"))
+            return
+
+        msg_id = message.get("id")
+        op = message.get("op")
+        try:
+            if op == "call":
+                # Calls run concurrently so a slow one never stalls event delivery.
+                task = asyncio.create_task(self._call(msg_id, message))
+                self._calls.add(task)
+                task.add_done_callback(self._calls.discard)
+            elif op == "subscribe":
+                await self._reply(msg_id, result={"sub": await self._subscribe(message)})
+            elif op == "unsubscribe":
+                task = self._subscriptions.pop(str(message.get("sub")), None)
+                if task is None:
+                    raise KeyError(f"Unknown subscription: {message.get('sub')}")
+                task.cancel()
+                await self._reply(msg_id, result={"sub": message.get("sub")})
+            elif op == "ping":
+                await self._reply(msg_id, result="pong")
+            else:
+                raise ValueError(f"Unknown op: {op}")
+        except KeyError as e:
+            await self._reply(msg_id, error=_error("not_found", str(e)))
+        except ValueError as e:
+            await self._reply(msg_id, error=_error("bad_request", str(e)))
+        except SubscriberLimitExceeded as e:
+            await self._reply(msg_id, error=_error("too_many_subscribers", str(e)))
+
+    async def _call(self, msg_id: Any, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        try:
+            if method not in WS_RPC_METHODS:
+                raise ValueError(f"Unknown method: {method}")
+            if not isinstance(params, dict):
+                raise ValueError("params must be an object")
+            fn = getattr(self.store, method)
+            try:
+                inspect.signature(fn).bind(**params)
+            except TypeError as e:
+                raise ValueError(f"Invalid params for {method}: {e}") from None
+            async with AsyncExitStack() as stack:
+                if self.limits is not None and method in WS_ADMITTED_METHODS:
+                    client = self.websocket.client.host if self.websocket.client else None
+                    job_id = params.get("job_id")
+                    self.limits.admit(client, None if job_id is None else str(job_id))
+                    if WS_ADMITTED_METHODS[method]:
+                        await stack.enter_async_context(self.limits.subprocess_slot())
+                result = await fn(**params)
+        except RateLimited as e:
+            error = _error("rate_limited", str(e))
+            error["retry_after"] = e.retry_after
+            await self._reply(msg_id, error=error)
+        except KeyError as e:
+            await self._reply(msg_id, error=_error("not_found", str(e)))
+        except ValueError as e:
+            await self._reply(msg_id, error=_error("bad_request", str(e)))
+        except Exception as e:
+            # Every call gets a reply; the client would otherwise wait forever.
+            await self._reply(msg_id, error=_error("internal_error", f"{type(e).__name__}: {e}"))
+        else:
+            await self._reply(msg_id, result=result)
+
+    async def _subscribe(self, message: dict[str, Any]) -> str:
+        def names(key: str) -> list[str] | None:
+            value = message.get(key)
+            if value is None:
+                return None
+            if isinstance(value, str):
+                value = value.split(",")
+            return [str(v).strip() for v in value if str(v).strip()]
+
+        job_id = message.get("job_id")
+        if job_id is not None:
+            job_id = str(job_id)
+            await self.store.get_job(job_id)
+        event_filter = None
+        if names("types") or names("steps") or names("fields"):
+            event_filter = EventFilter(types=names("types"), steps=names("steps"), fields=names("fields"))
+        last_event_id = message.get("last_event_id")
+        if last_event_id is not None and not isinstance(last_event_id, int):
+            raise ValueError("last_event_id must be an integer")
+
+        self._next_sub += 1
+        sub = f"sub-{self._next_sub}"
+        queue = await get_event_manager().subscribe(job_id, event_filter=event_filter, label="ws")
+        self._subscriptions[sub] = asyncio.create_task(
+            self._pump(sub, queue, job_id, event_filter, last_event_id)
+        )
+        return sub
+
+    async def _push(self, sub: str, queue: Subscription, event: SSEEvent) -> None:
+        # Splice the event's cached JSON payload instead of re-encoding it per socket.
+        event_id = "null" if event.event_id is None else str(event.event_id)
+        payload = event.to_json_bytes(queue.fields).decode("utf-8")
+        frame = f'{{"type": "event", "sub": "{sub}", "id": {event_id}, "event": {payload}}}'
+        await self._send(frame)
+        queue.sent(len(frame))
+
+    async def _pump(
+        self,
+        sub: str,
+        queue: Subscription,
+        job_id: str | None,
+        event_filter: EventFilter | None,
+        last_event_id: int | None,
+    ) -> None:
+        manager = get_event_manager()
+        try:
+            replayed_upto = 0
+            if last_event_id is not None:
+                after = last_event_id
+                while True:
+                    replay = await self.store.events_replay(after_id=after, job_id=job_id, limit=_REPLAY_PAGE)
+                    if after == last_event_id and replay["truncated"]:
+                        await self._push(
+                            sub,
+                            queue,
+                            SSEEvent(event_type=EVENT_RESYNC, data={"reason": "event_log_truncated"}, job_id=job_id),
+                        )
+                    for event in replay["events"]:
+                        after = replayed_upto = event.event_id or after
+                        if event_filter is None or event_filter.matches(event):
+                            await self._push(sub, queue, event)
+                    if len(replay["events"]) < _REPLAY_PAGE:
+                        break
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=_TOUCH_INTERVAL_S)
+                except asyncio.TimeoutError:
+                    # The session's receive loop notices disconnects; quiet is not idle.
+                    queue.touch()
+                    continue
+                if event.event_id is not None and event.event_id <= replayed_upto:
+                    continue
+                await self._push(sub, queue, event)
+        except SubscriptionClosed:
+            await self._send(json.dumps({"type": "subscription_closed", "sub": sub, "reason": "slow_consumer"}))
+        finally:
+            await manager.unsubscribe(queue, job_id)